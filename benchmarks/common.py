@@ -0,0 +1,39 @@
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+from typing import Optional
+
+from database.db_manager import DatabaseManager
+
+
+@contextmanager
+def bench_database(customers: int = 1000, profile: Optional[str] = None, stock: int = 10 ** 9,
+                   budget: float = 10.0 ** 12, directory: Optional[str] = None):
+    """DatabaseManager on a fresh database in a temporary directory
+
+    DatabaseManager is a process-wide singleton on ./user_database.db, so a
+    benchmark gets one database per process. Products and customers come
+    from the demo fixtures with enough stock and budget that placement
+    never fails. The temporary directory is created in `directory` (default:
+    the system temp dir) and removed afterwards.
+    """
+    previous_dir = os.getcwd()
+    work_dir = tempfile.mkdtemp(prefix="oms-bench-", dir=directory)
+    os.chdir(work_dir)
+    try:
+        DatabaseManager.SEED_EMPTY_DB = False
+        if profile:
+            DatabaseManager.DB_PROFILE = profile
+        db_manager = DatabaseManager()
+        db_manager.load_fixtures(customers=customers)
+        db_manager.execute_transaction(
+            lambda conn: (conn.execute("UPDATE products SET stock = ?", (stock,)),
+                          conn.execute("UPDATE customers SET budget = ?", (budget,))))
+        try:
+            yield db_manager
+        finally:
+            db_manager.log_writer.close()
+    finally:
+        os.chdir(previous_dir)
+        shutil.rmtree(work_dir, ignore_errors=True)
@@ -0,0 +1,79 @@
+import argparse
+import json
+import random
+import subprocess
+import sys
+import threading
+import time
+from typing import Dict, Optional
+
+from benchmarks.common import bench_database
+from database.profiles import PRAGMA_PROFILES
+
+
+def measure(profile: str, orders: int, threads: int, bulk_size: int, directory: Optional[str]) -> Dict:
+    """Order placement TPS on a fresh database with one PRAGMA profile"""
+    with bench_database(profile=profile, directory=directory) as db_manager:
+        product_ids = [product["product_id"] for product in db_manager.get_all_products()]
+        customer_ids = [customer["customer_id"] for customer in db_manager.get_all_customers()]
+
+        # One transaction per order: commit cost (synchronous level) dominates
+        per_thread = orders // threads
+
+        def place(seed: int):
+            rng = random.Random(seed)
+            for _ in range(per_thread):
+                db_manager.place_order(rng.choice(customer_ids), rng.choice(product_ids), 1)
+
+        workers = [threading.Thread(target=place, args=(seed,)) for seed in range(threads)]
+        started = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        single_tps = per_thread * threads / (time.perf_counter() - started)
+
+        # place_orders_bulk: many orders per transaction
+        rng = random.Random(threads)
+        batch = [(rng.choice(customer_ids), rng.choice(product_ids), 1) for _ in range(bulk_size)]
+        started = time.perf_counter()
+        for _ in range(max(1, orders // bulk_size)):
+            db_manager.place_orders_bulk(batch)
+        bulk_tps = max(1, orders // bulk_size) * bulk_size / (time.perf_counter() - started)
+
+    return {"profile": profile, "single": single_tps, "bulk": bulk_tps}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Order placement TPS per database PRAGMA profile")
+    parser.add_argument("--profiles", nargs="+", default=list(PRAGMA_PROFILES), choices=sorted(PRAGMA_PROFILES),
+                        help="profiles to compare (default: all)")
+    parser.add_argument("--orders", type=int, default=5000, help="orders placed per measurement (default: 5000)")
+    parser.add_argument("--threads", type=int, default=4, help="placing threads (default: 4)")
+    parser.add_argument("--bulk-size", type=int, default=500,
+                        help="orders per place_orders_bulk call (default: 500)")
+    parser.add_argument("--dir", default=None,
+                        help="directory for the database files; use the deployment disk, "
+                             "fsync cost depends on it (default: system temp dir)")
+    parser.add_argument("--single", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.single:
+        # Child process: DatabaseManager is a singleton, one profile per process
+        print(json.dumps(measure(args.single, args.orders, args.threads, args.bulk_size, args.dir)))
+        return
+
+    print(f"{'profile':<12}{'single tx/s':>12}{'bulk orders/s':>15}")
+    for profile in args.profiles:
+        command = [sys.executable, "-m", "benchmarks.profile_tps", "--single", profile,
+                   "--orders", str(args.orders), "--threads", str(args.threads),
+                   "--bulk-size", str(args.bulk_size)]
+        if args.dir:
+            command += ["--dir", args.dir]
+        output = subprocess.run(command, capture_output=True, text=True, check=True).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        print(f"{profile:<12}{result['single']:>12.0f}{result['bulk']:>15.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+import argparse
+import random
+import threading
+import time
+from typing import Dict
+
+from benchmarks.common import bench_database
+
+
+def run_mix(db_manager, readers: int, writers: int, duration: float, read_path: str) -> Dict[str, float]:
+    """Readers refresh products and customers while writers place orders, returns ops/s"""
+    if read_path == "immediate":
+        # Getters through the write path (BEGIN IMMEDIATE), as before execute_read existed
+        db_manager.execute_read = db_manager.execute_transaction
+    counts = {"reads": 0, "writes": 0}
+    lock = threading.Lock()
+    stop = threading.Event()
+    product_ids = [product["product_id"] for product in db_manager.get_all_products()]
+    customer_ids = [customer["customer_id"] for customer in db_manager.get_all_customers()]
+
+    def reader():
+        done = 0
+        while not stop.is_set():
+            db_manager.get_all_products()
+            db_manager.get_all_customers()
+            done += 1
+        with lock:
+            counts["reads"] += done
+
+    def writer(seed: int):
+        rng = random.Random(seed)
+        done = 0
+        while not stop.is_set():
+            if db_manager.place_order(rng.choice(customer_ids), rng.choice(product_ids), 1):
+                done += 1
+        with lock:
+            counts["writes"] += done
+
+    threads = ([threading.Thread(target=reader) for _ in range(readers)] +
+               [threading.Thread(target=writer, args=(seed,)) for seed in range(writers)])
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    time.sleep(duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    if read_path == "immediate":
+        del db_manager.execute_read
+    return {"reads": counts["reads"] / elapsed, "writes": counts["writes"] / elapsed}
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Read/write throughput with N concurrent readers (panel refreshes) and order writers")
+    parser.add_argument("--readers", type=int, nargs="+", default=[0, 1, 2, 4, 8],
+                        help="reader thread counts to measure (default: 0 1 2 4 8)")
+    parser.add_argument("--writers", type=int, default=1, help="order placing threads (default: 1)")
+    parser.add_argument("--duration", type=float, default=3.0, help="seconds per measurement (default: 3)")
+    parser.add_argument("--customers", type=int, default=1000, help="customers read per refresh (default: 1000)")
+    parser.add_argument("--read-path", default="both", choices=["both", "snapshot", "immediate"],
+                        help="snapshot: execute_read, immediate: reads take the write lock (default: both)")
+    args = parser.parse_args()
+
+    read_paths = ["snapshot", "immediate"] if args.read_path == "both" else [args.read_path]
+    with bench_database(customers=args.customers) as db_manager:
+        print(f"{'read path':<12}{'readers':>8}{'reads/s':>10}{'writes/s':>10}")
+        for read_path in read_paths:
+            for readers in args.readers:
+                result = run_mix(db_manager, readers, args.writers, args.duration, read_path)
+                print(f"{read_path:<12}{readers:>8}{result['reads']:>10.0f}{result['writes']:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
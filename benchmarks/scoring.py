@@ -0,0 +1,136 @@
+import argparse
+import heapq
+import random
+import time
+from typing import Callable, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from processing.batch_scoring import score_batch, scoring_arrays, top_k, top_pending_orders
+from processing.priority import priority_score
+
+# (order_id, customer_type, wait_time, quantity)
+Row = Tuple[int, str, float, int]
+
+
+def synthetic_rows(count: int, premium_share: float = 0.3, max_wait: float = 86400.0,
+                   seed: int = 1) -> List[Row]:
+    rng = random.Random(seed)
+    return [(order_id, "Premium" if rng.random() < premium_share else "Standard",
+             float(rng.randint(0, int(max_wait))), rng.randint(1, 20))
+            for order_id in range(1, count + 1)]
+
+
+def per_order_top(rows: Sequence[Row], k: int) -> List[int]:
+    """The scalar path: priority_score per order, then sort"""
+    scored = [(priority_score(customer_type, wait_time, quantity), order_id)
+              for order_id, customer_type, wait_time, quantity in rows]
+    scored.sort(key=lambda item: (-item[0], item[1]))
+    return [order_id for _, order_id in scored[:k]]
+
+
+def heap_top(rows: Sequence[Row], k: int) -> List[int]:
+    """The scalar path with heapq.nsmallest instead of a full sort"""
+    scored = ((-priority_score(customer_type, wait_time, quantity), order_id)
+              for order_id, customer_type, wait_time, quantity in rows)
+    return [order_id for _, order_id in heapq.nsmallest(k, scored)]
+
+
+def vectorized_top(rows: Sequence[Row], k: int) -> List[int]:
+    """score_batch + top_k on columnar arrays"""
+    order_ids = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+    is_premium = np.fromiter((row[1] == "Premium" for row in rows), dtype=bool, count=len(rows))
+    wait_times = np.fromiter((row[2] for row in rows), dtype=np.float64, count=len(rows))
+    quantities = np.fromiter((row[3] for row in rows), dtype=np.float64, count=len(rows))
+    return order_ids[top_k(score_batch(is_premium, wait_times, quantities), k)].tolist()
+
+
+def best_of(function: Callable, repeat: int, *args) -> Tuple[float, object]:
+    """Fastest of `repeat` runs in ms, and the result"""
+    best = None
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function(*args)
+        elapsed = (time.perf_counter() - started) * 1000.0
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def run_in_memory(sizes: Sequence[int], k: int, repeat: int) -> List[Dict]:
+    results = []
+    for size in sizes:
+        rows = synthetic_rows(size)
+        per_order_ms, expected = best_of(per_order_top, repeat, rows, k)
+        heap_ms, heap_result = best_of(heap_top, repeat, rows, k)
+        vectorized_ms, result = best_of(vectorized_top, repeat, rows, k)
+        # Arrays already columnar, as scoring_arrays returns them
+        is_premium = np.array([row[1] == "Premium" for row in rows])
+        wait_times = np.array([row[2] for row in rows])
+        quantities = np.array([row[3] for row in rows], dtype=np.float64)
+        numpy_ms, _ = best_of(lambda: top_k(score_batch(is_premium, wait_times, quantities), k), repeat)
+        results.append({
+            "orders": size, "per_order_ms": per_order_ms, "heap_ms": heap_ms,
+            "vectorized_ms": vectorized_ms, "numpy_ms": numpy_ms,
+            "same_top": result == expected == heap_result,
+        })
+    return results
+
+
+def run_from_db(k: int, repeat: int) -> Dict:
+    """End to end on the pending orders in the database, fetch included"""
+    from database.db_manager import DatabaseManager
+    DatabaseManager.SEED_EMPTY_DB = False
+    db_manager = DatabaseManager()
+    try:
+        def scalar_path():
+            orders = db_manager.get_pending_orders()
+            rows = [(order[0], order[2], order[7], order[5]) for order in orders]
+            return per_order_top(rows, k)
+
+        def array_path():
+            return top_pending_orders(db_manager, k)
+
+        pending = len(db_manager.get_pending_order_scoring_rows())
+        scalar_ms, expected = best_of(scalar_path, repeat)
+        vectorized_ms, result = best_of(array_path, repeat)
+        sql_ms, sql_result = best_of(db_manager.get_prioritized_pending_order_ids, repeat, k)
+        numpy_ms, _ = best_of(lambda rows: top_k(score_batch(*scoring_arrays(rows)[1:]), k), repeat,
+                              db_manager.get_pending_order_scoring_rows())
+        return {"orders": pending, "per_order_ms": scalar_ms, "vectorized_ms": vectorized_ms,
+                "numpy_ms": numpy_ms, "sql_ms": sql_ms, "same_top": result == expected == sql_result}
+    finally:
+        db_manager.log_writer.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-order vs vectorized priority scoring and top-K")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000],
+                        help="synthetic pending set sizes (default: 10000 100000 1000000)")
+    parser.add_argument("--top", type=int, default=100, help="K of the top-K (default: 100)")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per measurement, fastest counts (default: 3)")
+    parser.add_argument("--from-db", action="store_true",
+                        help="measure end to end on the pending orders in the database instead")
+    args = parser.parse_args()
+
+    if args.from_db:
+        result = run_from_db(args.top, args.repeat)
+        print(f"{result['orders']} pending orders, top {args.top}, fetch included:")
+        print(f"  get_pending_orders + per-order score + sort {result['per_order_ms']:>9.1f} ms")
+        print(f"  scoring rows + score_batch + top_k          {result['vectorized_ms']:>9.1f} ms "
+              f"(without the fetch {result['numpy_ms']:.1f} ms)")
+        print(f"  SQL top-K on the base priority index        {result['sql_ms']:>9.1f} ms")
+        print(f"  same top {args.top}: {result['same_top']}")
+        return
+
+    print(f"top {args.top}, in-memory rows")
+    print(f"{'orders':>9}{'per-order ms':>14}{'heapq ms':>10}{'vectorized ms':>15}{'NumPy only ms':>15}"
+          f"{'speedup':>9}{'same top':>10}")
+    for result in run_in_memory(args.sizes, args.top, args.repeat):
+        print(f"{result['orders']:>9}{result['per_order_ms']:>14.1f}{result['heap_ms']:>10.1f}"
+              f"{result['vectorized_ms']:>15.1f}{result['numpy_ms']:>15.1f}"
+              f"{result['per_order_ms'] / result['vectorized_ms']:>8.0f}x{str(result['same_top']):>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+import argparse
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+from typing import Callable, Dict
+
+from database import fixtures, queries
+from database.log_writer import log_timestamp
+from database.migrations import run_migrations
+
+# Hot statement -> parameters for execution i (ids stay inside the demo fixtures)
+HOT_STATEMENTS: Dict[str, Callable[[int], tuple]] = {
+    "INSERT_ORDER": lambda i: (i % 5 + 1, i % 5 + 1, 1, 1.01),
+    "INSERT_ORDER_LINE": lambda i: (i + 1, i % 5 + 1, 1),
+    "SELECT_PRODUCTS_FOR_ORDER_IN": lambda i: (json.dumps([i % 5 + 1]),),
+    "SELECT_CUSTOMER_BUDGET": lambda i: (i % 5 + 1,),
+    "RESERVE_STOCK": lambda i: (1, i % 5 + 1, 1),
+    "HOLD_BUDGET": lambda i: (1.0, i % 5 + 1, 1.0),
+    "CAPTURE_STOCK": lambda i: (1, 0, i % 5 + 1),
+    "CAPTURE_BUDGET": lambda i: (1.0, 0.0, 1.0, i % 5 + 1),
+    "SET_ORDER_STATUS": lambda i: ("processed", i + 1),
+    "SELECT_PENDING_ORDER_HEADER": lambda i: (i + 1,),
+    "SELECT_ORDER_LINES": lambda i: (i + 1,),
+    "INSERT_LOG": lambda i: (i % 5 + 1, "Order Processed", "Standard", "Product1", 1, "ok", log_timestamp()),
+}
+
+
+def connect(path: str, cached: bool) -> sqlite3.Connection:
+    return sqlite3.connect(path, cached_statements=queries.STATEMENT_CACHE_SIZE if cached else 0)
+
+
+def time_statement(conn: sqlite3.Connection, sql: str, params: Callable[[int], tuple], executions: int) -> float:
+    """Microseconds per execution inside one transaction, rolled back afterwards"""
+    arguments = [params(i) for i in range(executions)]
+    cursor = conn.cursor()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        started = time.perf_counter()
+        for parameters in arguments:
+            cursor.execute(sql, parameters)
+            cursor.fetchall()
+        return (time.perf_counter() - started) / executions * 1e6
+    finally:
+        conn.rollback()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-statement cost with and without the statement cache")
+    parser.add_argument("--executions", type=int, default=20000, help="executions per statement (default: 20000)")
+    parser.add_argument("--orders", type=int, default=20000, help="orders in the database (default: 20000)")
+    parser.add_argument("--statements", nargs="+", default=list(HOT_STATEMENTS), choices=sorted(HOT_STATEMENTS),
+                        help="statements to measure (default: all hot statements)")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="oms-bench-")
+    path = os.path.join(work_dir, "user_database.db")
+    try:
+        conn = sqlite3.connect(path)
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("BEGIN IMMEDIATE")
+        run_migrations(conn)
+        fixtures.seed(conn.cursor(), customers=5)
+        conn.execute("UPDATE products SET stock = 1000000000")
+        conn.executemany("INSERT INTO orders (customer_id, product_id, quantity) VALUES (?, ?, 1)",
+                         ((i % 5 + 1, i % 5 + 1) for i in range(args.orders)))
+        conn.execute("INSERT INTO order_lines (order_id, product_id, quantity) "
+                     "SELECT order_id, product_id, quantity FROM orders")
+        conn.commit()
+        conn.close()
+
+        uncached = connect(path, cached=False)
+        cached = connect(path, cached=True)
+        print(f"{'statement':<32}{'uncached us':>12}{'cached us':>11}{'speedup':>9}")
+        for name in args.statements:
+            sql, params = queries.STATEMENTS[name], HOT_STATEMENTS[name]
+            # Warm-up: page cache, and the cached connection prepares the statement once
+            time_statement(cached, sql, params, 100)
+            time_statement(uncached, sql, params, 100)
+            slow = time_statement(uncached, sql, params, args.executions)
+            fast = time_statement(cached, sql, params, args.executions)
+            print(f"{name:<32}{slow:>12.1f}{fast:>11.1f}{slow / fast:>8.1f}x")
+        uncached.close()
+        cached.close()
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+import sqlite3
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict
+
+
+class ConnectionPool:
+    """Elastic pool of SQLite connections
+
+    Connections are opened lazily up to `max_size`. Connections idle for
+    longer than `idle_timeout` are closed down to `min_size`, connections
+    idle for longer than `health_check_interval` are checked with SELECT 1
+    before being handed out, and broken ones are replaced.
+    """
+
+    def __init__(self, connect: Callable[[], sqlite3.Connection], min_size: int = 1,
+                 max_size: int = 10, idle_timeout: float = 300.0,
+                 health_check_interval: float = 5.0, acquire_timeout: float = 30.0,
+                 name: str = "pool"):
+        if max_size < 1 or min_size < 0 or min_size > max_size:
+            raise ValueError(f"Invalid {name} size: min={min_size}, max={max_size}")
+        self._connect = connect
+        self.min_size = min_size
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.health_check_interval = health_check_interval
+        self.acquire_timeout = acquire_timeout
+        self.name = name
+
+        self._idle = deque()  # (conn, last_used), most recently used on the right
+        self._size = 0  # Open connections, idle + in use
+        self._cond = threading.Condition()
+        self._closed = False
+
+        # Metrics
+        self.acquired = 0
+        self.waits = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.timeouts = 0
+        self.created = 0
+        self.evicted = 0
+        self.replaced = 0
+
+        for _ in range(min_size):
+            self._idle.append((self._open(), time.monotonic()))
+
+    def _open(self) -> sqlite3.Connection:
+        conn = self._connect()
+        with self._cond:
+            self._size += 1
+            self.created += 1
+        return conn
+
+    def _discard(self, conn: sqlite3.Connection):
+        """Close a connection and free its slot (caller holds the lock)"""
+        try:
+            conn.close()
+        except Exception:
+            pass
+        self._size -= 1
+        self._cond.notify()
+
+    @staticmethod
+    def _is_healthy(conn: sqlite3.Connection) -> bool:
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except Exception:
+            return False
+
+    def acquire(self, timeout: float = None) -> sqlite3.Connection:
+        """Take an idle connection, open a new one, or wait for one to be released"""
+        timeout = self.acquire_timeout if timeout is None else timeout
+        started = time.monotonic()
+        deadline = started + timeout
+        waited = False
+
+        while True:
+            with self._cond:
+                if self._closed:
+                    raise RuntimeError(f"{self.name} is closed")
+                self._evict_idle()
+
+                conn = None
+                reserve = False
+                if self._idle:
+                    conn, last_used = self._idle.pop()
+                    check = time.monotonic() - last_used >= self.health_check_interval
+                elif self._size < self.max_size:
+                    # Slot is taken now, the connection is opened outside the lock
+                    self._size += 1
+                    reserve = True
+                else:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.timeouts += 1
+                        raise TimeoutError(f"No {self.name} connection available within {timeout}s")
+                    waited = True
+                    self._cond.wait(remaining)
+                    continue
+
+            if reserve:
+                try:
+                    conn = self._connect()
+                except Exception:
+                    with self._cond:
+                        self._size -= 1
+                        self._cond.notify()
+                    raise
+                with self._cond:
+                    self.created += 1
+            elif check and not self._is_healthy(conn):
+                with self._cond:
+                    self._discard(conn)
+                    self.replaced += 1
+                continue
+
+            self._record_wait(time.monotonic() - started, waited)
+            return conn
+
+    def release(self, conn: sqlite3.Connection):
+        """Return a connection; one left inside a transaction is rolled back first"""
+        broken = False
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except Exception:
+            broken = True
+
+        with self._cond:
+            if broken or self._closed:
+                self._discard(conn)
+                if broken:
+                    self.replaced += 1
+                return
+            self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    def _evict_idle(self):
+        """Close connections idle for longer than idle_timeout, keeping min_size open"""
+        now = time.monotonic()
+        while (self._idle and self._size > self.min_size
+               and now - self._idle[0][1] >= self.idle_timeout):
+            conn, _ = self._idle.popleft()
+            self._discard(conn)
+            self.evicted += 1
+
+    def _record_wait(self, wait: float, waited: bool):
+        with self._cond:
+            self.acquired += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+            if waited:
+                self.waits += 1
+
+    def close(self):
+        """Close idle connections; connections in use are closed when released"""
+        with self._cond:
+            self._closed = True
+            while self._idle:
+                conn, _ = self._idle.popleft()
+                self._discard(conn)
+            self._cond.notify_all()
+
+    def get_stats(self) -> Dict:
+        with self._cond:
+            return {
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": self._size - len(self._idle),
+                "max_size": self.max_size,
+                "acquired": self.acquired,
+                "waits": self.waits,
+                "timeouts": self.timeouts,
+                "avg_wait_ms": self.total_wait / self.acquired * 1000.0 if self.acquired else 0.0,
+                "max_wait_ms": self.max_wait * 1000.0,
+                "created": self.created,
+                "evicted": self.evicted,
+                "replaced": self.replaced,
+            }
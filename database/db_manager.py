@@ -4,16 +4,66 @@ import random
 import time
 import os
 import threading
-from typing import Optional, Tuple, List, Dict
-from queue import Queue
+import json
+from typing import Optional, Tuple, List, Dict, Callable, Iterable
+from collections import defaultdict
 from threading import Lock, Semaphore
+from database.connection_pool import ConnectionPool
+from database.profiles import apply_profile, DEFAULT_PROFILE
+from database.log_writer import LogWriter, log_timestamp
+from database import queries
+from database.migrations import run_migrations, TRACKED_TABLES
+from database.retry import RetryPolicy, ContentionTracker
+from processing.priority import base_priority
+from database import fixtures
+
+
+class ConcurrentUpdateError(Exception):
+    """A row changed between being read and updated (optimistic locking conflict)"""
+    def __init__(self, message: str, product_ids: Iterable[int] = ()):
+        super().__init__(message)
+        self.product_ids = tuple(product_ids)
+
 
 class DatabaseManager:
     _instance = None
     _lock = Lock()
-    _connection_pool = Queue(maxsize=10)  # Connection pool with max 10 connections
     _initialized = False
     
+    # Connection pool sizes; connections are opened on demand up to the max
+    POOL_MIN_SIZE = int(os.environ.get("OMS_POOL_MIN_SIZE", 1))
+    POOL_MAX_SIZE = int(os.environ.get("OMS_POOL_MAX_SIZE", 10))
+    READ_POOL_MAX_SIZE = int(os.environ.get("OMS_READ_POOL_MAX_SIZE", 10))
+    POOL_IDLE_TIMEOUT = float(os.environ.get("OMS_POOL_IDLE_TIMEOUT", 300))  # seconds
+    
+    # Stock reserved at placement is released again after this many seconds
+    RESERVATION_TTL = int(os.environ.get("OMS_RESERVATION_TTL", 3600))
+    
+    # process_order retries on optimistic locking conflicts (busy errors already waited busy_timeout)
+    RETRY_MAX_ATTEMPTS = int(os.environ.get("OMS_RETRY_MAX_ATTEMPTS", 5))
+    RETRY_BASE_DELAY = 0.005  # seconds, doubled per attempt
+    RETRY_MAX_DELAY = 0.2
+    # Products with this many conflicts in the window are settled one order at a time
+    HOT_PRODUCT_THRESHOLD = 3
+    HOT_PRODUCT_WINDOW = 10.0  # seconds
+    SERIALIZE_HOT_PRODUCTS = True
+    
+    # PRAGMA tuning profile for every pooled connection, see database/profiles.py
+    DB_PROFILE = os.environ.get("OMS_DB_PROFILE", DEFAULT_PROFILE)
+    
+    # Async log writer settings
+    LOG_FLUSH_INTERVAL = 0.5  # seconds
+    LOG_BATCH_SIZE = 500
+    LOG_BUFFER_SIZE = 50000
+    # True: order logs are inserted inside the order's own transaction
+    DURABLE_LOGS = False
+    
+    # Load demo fixtures on startup when the database is empty
+    SEED_EMPTY_DB = True
+    
+    # Logs produced inside the current thread's transaction, queued after commit
+    _txn_state = threading.local()
+    
     def __new__(cls):
         with cls._lock:
             if cls._instance is None:
@@ -25,53 +75,107 @@ class DatabaseManager:
             if not self._initialized:
                 self._initialized = True
                 self.db_name = "user_database.db"
+                self.retry_policy = RetryPolicy(max_attempts=self.RETRY_MAX_ATTEMPTS,
+                                                base_delay=self.RETRY_BASE_DELAY,
+                                                max_delay=self.RETRY_MAX_DELAY,
+                                                retry_on=(ConcurrentUpdateError,))
+                self.contention = ContentionTracker(hot_threshold=self.HOT_PRODUCT_THRESHOLD,
+                                                    window=self.HOT_PRODUCT_WINDOW)
                 self._init_connection_pool()
-                self.create_tables()
-                self.initialize_products()
-                self.initialize_customers()
+                self.migrate()
+                self._init_read_connection_pool()
+                self.log_writer = LogWriter(self, flush_interval=self.LOG_FLUSH_INTERVAL,
+                                            batch_size=self.LOG_BATCH_SIZE,
+                                            max_buffer=self.LOG_BUFFER_SIZE)
+                if self.SEED_EMPTY_DB:
+                    self.seed_if_empty()
+    
+    def _connect(self) -> sqlite3.Connection:
+        """Open a read-write connection"""
+        conn = sqlite3.connect(self.db_name, timeout=30, check_same_thread=False,
+                               cached_statements=queries.STATEMENT_CACHE_SIZE)
+        conn.execute("PRAGMA busy_timeout = 30000")
+        conn.execute("PRAGMA journal_mode = WAL")
+        apply_profile(conn, self.DB_PROFILE)
+        return conn
+    
+    def _connect_read(self) -> sqlite3.Connection:
+        """Open a read-only connection (never takes the write lock)"""
+        conn = sqlite3.connect(self.db_name, timeout=30, check_same_thread=False,
+                               cached_statements=queries.STATEMENT_CACHE_SIZE)
+        conn.execute("PRAGMA busy_timeout = 30000")
+        conn.execute("PRAGMA query_only = ON")
+        apply_profile(conn, self.DB_PROFILE)
+        return conn
     
     def _init_connection_pool(self):
         """Initialize the connection pool"""
         try:
-            for _ in range(10):  # Create 10 connections
-                conn = sqlite3.connect(self.db_name, timeout=30, check_same_thread=False)
-                conn.execute("PRAGMA busy_timeout = 30000")
-                conn.execute("PRAGMA journal_mode = WAL")
-                self._connection_pool.put(conn)
+            self._connection_pool = ConnectionPool(
+                self._connect, min_size=self.POOL_MIN_SIZE, max_size=self.POOL_MAX_SIZE,
+                idle_timeout=self.POOL_IDLE_TIMEOUT, name="write pool")
         except Exception as e:
             print(f"Error initializing connection pool: {e}")
             raise
     
+    def _init_read_connection_pool(self):
+        """Initialize the read-only connection pool"""
+        try:
+            self._read_connection_pool = ConnectionPool(
+                self._connect_read, min_size=self.POOL_MIN_SIZE, max_size=self.READ_POOL_MAX_SIZE,
+                idle_timeout=self.POOL_IDLE_TIMEOUT, name="read pool")
+        except Exception as e:
+            print(f"Error initializing read connection pool: {e}")
+            raise
+    
     def _get_connection(self) -> sqlite3.Connection:
         """Get a connection from the pool with timeout"""
         try:
-            return self._connection_pool.get(timeout=30)
+            return self._connection_pool.acquire()
         except Exception as e:
             print(f"Error getting connection: {e}")
             raise
     
     def _return_connection(self, conn: sqlite3.Connection):
         """Return a connection to the pool"""
+        self._connection_pool.release(conn)
+    
+    def _get_read_connection(self) -> sqlite3.Connection:
+        """Get a read-only connection from the pool with timeout"""
         try:
-            if self._connection_pool.qsize() < 10:  # Check if pool is not full
-                self._connection_pool.put(conn)
-            else:
-                conn.close()
+            return self._read_connection_pool.acquire()
         except Exception as e:
-            print(f"Error returning connection: {e}")
-            try:
-                conn.close()
-            except:
-                pass
+            print(f"Error getting read connection: {e}")
+            raise
+    
+    def _return_read_connection(self, conn: sqlite3.Connection):
+        """Return a read-only connection to the pool"""
+        self._read_connection_pool.release(conn)
+    
+    def get_pool_stats(self) -> Dict[str, Dict]:
+        """Size and wait-time metrics of both connection pools"""
+        return {
+            "write": self._connection_pool.get_stats(),
+            "read": self._read_connection_pool.get_stats(),
+        }
     
     def execute_transaction(self, func, *args, **kwargs):
         """Execute a function within a transaction"""
         conn = None
+        self._txn_state.logs = []
+        self._txn_state.changed = set()
         try:
             conn = self._get_connection()
             conn.execute("BEGIN IMMEDIATE")
             result = func(conn, *args, **kwargs)
+            # Change feed: one version bump per written table, not per row
+            if self._txn_state.changed:
+                conn.execute(queries.BUMP_TABLE_VERSIONS, (json.dumps(sorted(self._txn_state.changed)),))
             conn.commit()
+            
+            # Loglar sadece commit başarılıysa yazıcıya gider
+            if self._txn_state.logs:
+                self.log_writer.extend(self._txn_state.logs)
             return result
         except Exception as e:
             print(f"Transaction error: {e}")
@@ -82,191 +186,103 @@ class DatabaseManager:
                     pass
             raise
         finally:
+            self._txn_state.logs = []
+            self._txn_state.changed = set()
             if conn:
                 self._return_connection(conn)
     
-    def create_tables(self):
-        """Create database tables"""
-        def _do_create_tables(conn: sqlite3.Connection) -> bool:
-            try:
-                cursor = conn.cursor()
-                
-                # Create users table
-                cursor.execute('''
-                    CREATE TABLE IF NOT EXISTS users (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        username TEXT UNIQUE NOT NULL,
-                        password TEXT NOT NULL,
-                        role TEXT NOT NULL
-                    )
-                ''')
-                
-                # Create customers table
-                cursor.execute('''
-                    CREATE TABLE IF NOT EXISTS customers (
-                        customer_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        customer_name TEXT NOT NULL,
-                        budget REAL NOT NULL,
-                        customer_type TEXT NOT NULL,
-                        total_spent REAL DEFAULT 0,
-                        username TEXT UNIQUE,
-                        FOREIGN KEY (username) REFERENCES users(username)
-                    )
-                ''')
-                
-                # Create products table
-                cursor.execute('''
-                    CREATE TABLE IF NOT EXISTS products (
-                        product_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        product_name TEXT NOT NULL,
-                        stock INTEGER NOT NULL,
-                        price REAL NOT NULL,
-                        version INTEGER DEFAULT 1
-                    )
-                ''')
-                
-                # Create orders table
-                cursor.execute('''
-                    CREATE TABLE IF NOT EXISTS orders (
-                        order_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        customer_id INTEGER NOT NULL,
-                        product_id INTEGER NOT NULL,
-                        quantity INTEGER NOT NULL,
-                        order_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        status TEXT DEFAULT 'pending',
-                        FOREIGN KEY (customer_id) REFERENCES customers(customer_id),
-                        FOREIGN KEY (product_id) REFERENCES products(product_id)
-                    )
-                ''')
-                
-                # Create admin user if not exists
-                cursor.execute("SELECT COUNT(*) FROM users WHERE username = 'admin'")
-                if cursor.fetchone()[0] == 0:
-                    hashed_password = hashlib.sha256("admin123".encode()).hexdigest()
-                    cursor.execute(
-                        "INSERT INTO users (username, password, role) VALUES (?, ?, ?)",
-                        ("admin", hashed_password, "admin")
-                    )
-                
-                return True
-                
-            except Exception as e:
-                print(f"Error in _do_create_tables: {e}")
-                return False
+    def _write_logs(self, cursor: sqlite3.Cursor, records: List[tuple]):
+        """Log (customer_id, log_type, customer_type, product, quantity, result_message) records
         
+        Called inside execute_transaction: in DURABLE_LOGS mode the rows are
+        inserted in the same transaction, otherwise they are handed to the
+        async log writer once the transaction commits.
+        """
+        timestamp = log_timestamp()
+        rows = [record + (timestamp,) for record in records]
+        if self.DURABLE_LOGS:
+            cursor.executemany(queries.INSERT_LOG, rows)
+        else:
+            self._txn_state.logs.extend(rows)
+    
+    def _write_log(self, cursor: sqlite3.Cursor, customer_id: Optional[int], log_type: str,
+                   customer_type: Optional[str], product: Optional[str],
+                   quantity: Optional[int], result_message: str):
+        """Log a single record, see _write_logs"""
+        self._write_logs(cursor, [(customer_id, log_type, customer_type, product,
+                                   quantity, result_message)])
+    
+    def _mark_changed(self, *tables: str):
+        """Record tables written by the current transaction, their versions are bumped on commit"""
+        self._txn_state.changed.update(tables)
+    
+    def execute_read(self, func, *args, **kwargs):
+        """Execute a read-only function within a deferred (snapshot) transaction"""
+        # WAL modunda BEGIN DEFERRED yazma kilidi almaz, okuyucular yazıcıları bekletmez
+        conn = None
         try:
-            return self.execute_transaction(_do_create_tables)
+            conn = self._get_read_connection()
+            conn.execute("BEGIN DEFERRED")
+            result = func(conn, *args, **kwargs)
+            conn.commit()
+            return result
         except Exception as e:
-            print(f"Error in create_tables: {e}")
-            return False
+            print(f"Read transaction error: {e}")
+            if conn:
+                try:
+                    conn.rollback()
+                except:
+                    pass
+            raise
+        finally:
+            if conn:
+                self._return_read_connection(conn)
     
-    def initialize_products(self):
-        """Initialize the default products"""
-        def _do_initialize_products(conn: sqlite3.Connection) -> bool:
-            try:
-                cursor = conn.cursor()
-                
-                # Delete existing products
-                cursor.execute("DELETE FROM products")
-                cursor.execute("DELETE FROM sqlite_sequence WHERE name='products'")
-                
-                # Default products
-                default_products = [
-                    ("Product1", 500, 100),
-                    ("Product2", 10, 50),
-                    ("Product3", 200, 45),
-                    ("Product4", 75, 75),
-                    ("Product5", 0, 500)
-                ]
-                
-                # Add default products
-                cursor.executemany(
-                    "INSERT INTO products (product_name, stock, price) VALUES (?, ?, ?)",
-                    default_products
-                )
-                
-                return True
-                
-            except Exception as e:
-                print(f"Error in _do_initialize_products: {e}")
+    def migrate(self) -> int:
+        """Bring the schema up to date, a single version check when it already is"""
+        try:
+            return self.execute_transaction(run_migrations)
+        except Exception as e:
+            print(f"Error in migrate: {e}")
+            raise
+    
+    def seed_if_empty(self) -> bool:
+        """Load the demo fixtures into an empty database, never touches existing data"""
+        def _do_seed_if_empty(conn: sqlite3.Connection) -> bool:
+            cursor = conn.cursor()
+            if fixtures.is_populated(cursor):
                 return False
+            fixtures.seed(cursor)
+            self._mark_changed("products", "customers")
+            return True
         
         try:
-            return self.execute_transaction(_do_initialize_products)
+            return self.execute_transaction(_do_seed_if_empty)
         except Exception as e:
-            print(f"Error in initialize_products: {e}")
+            print(f"Error in seed_if_empty: {e}")
             return False
     
-    def initialize_customers(self):
-        """Initialize random customers"""
-        def _do_initialize_customers(conn: sqlite3.Connection) -> bool:
-            try:
-                cursor = conn.cursor()
-                
-                # Delete existing customers
-                cursor.execute("DELETE FROM customers")
-                cursor.execute("DELETE FROM users WHERE role = 'customer'")
-                cursor.execute("DELETE FROM sqlite_sequence WHERE name='customers'")
-                cursor.execute("DELETE FROM sqlite_sequence WHERE name='users'")
-                
-                # Generate random number of customers (5-10)
-                num_customers = random.randint(5, 10)
-                
-                # Generate random number of premium customers (at least 2)
-                premium_count = random.randint(2, max(2, num_customers - 1))
-                standard_count = num_customers - premium_count
-                
-                # Add premium customers
-                for i in range(premium_count):
-                    customer_name = f"customer{i+1}"
-                    budget = round(random.uniform(500, 3000), 2)
-                    username = customer_name
-                    password = "1234"
-                    
-                    # Add user account
-                    hashed_password = hashlib.sha256(password.encode()).hexdigest()
-                    cursor.execute(
-                        "INSERT INTO users (username, password, role) VALUES (?, ?, ?)",
-                        (username, hashed_password, "customer")
-                    )
-                    
-                    # Add customer details
-                    cursor.execute('''
-                        INSERT INTO customers (customer_name, budget, customer_type, username)
-                        VALUES (?, ?, ?, ?)
-                    ''', (customer_name, budget, "Premium", username))
-                
-                # Add standard customers
-                for i in range(standard_count):
-                    customer_name = f"customer{i+premium_count+1}"
-                    budget = round(random.uniform(500, 3000), 2)
-                    username = customer_name
-                    password = "1234"
-                    
-                    # Add user account
-                    hashed_password = hashlib.sha256(password.encode()).hexdigest()
-                    cursor.execute(
-                        "INSERT INTO users (username, password, role) VALUES (?, ?, ?)",
-                        (username, hashed_password, "customer")
-                    )
-                    
-                    # Add customer details
-                    cursor.execute('''
-                        INSERT INTO customers (customer_name, budget, customer_type, username)
-                        VALUES (?, ?, ?, ?)
-                    ''', (customer_name, budget, "Standard", username))
-                
-                return True
-                
-            except Exception as e:
-                print(f"Error in _do_initialize_customers: {e}")
-                return False
+    def load_fixtures(self, reset: bool = False,
+                      customers: Optional[int] = None) -> Optional[Tuple[int, int]]:
+        """Bulk load products and customers, returns None if data exists and not reset
+        
+        reset deletes products, customers and all orders first, in the same transaction.
+        """
+        def _do_load_fixtures(conn: sqlite3.Connection) -> Optional[Tuple[int, int]]:
+            cursor = conn.cursor()
+            if reset:
+                fixtures.clear(cursor)
+                self._mark_changed("orders")
+            elif fixtures.is_populated(cursor):
+                return None
+            self._mark_changed("products", "customers")
+            return fixtures.seed(cursor, customers)
         
         try:
-            return self.execute_transaction(_do_initialize_customers)
+            return self.execute_transaction(_do_load_fixtures)
         except Exception as e:
-            print(f"Error in initialize_customers: {e}")
-            return False
+            print(f"Error in load_fixtures: {e}")
+            return None
     
     def verify_user(self, username: str, password: str) -> Optional[Tuple[bool, str]]:
         """Verify user credentials"""
@@ -275,10 +291,7 @@ class DatabaseManager:
                 cursor = conn.cursor()
                 hashed_password = hashlib.sha256(password.encode()).hexdigest()
                 
-                cursor.execute(
-                    "SELECT password, role FROM users WHERE username = ?",
-                    (username,)
-                )
+                cursor.execute(queries.SELECT_USER_CREDENTIALS, (username,))
                 result = cursor.fetchone()
                 
                 if result and result[0] == hashed_password:
@@ -290,21 +303,39 @@ class DatabaseManager:
                 return None
         
         try:
-            return self.execute_transaction(_do_verify_user, username, password)
+            return self.execute_read(_do_verify_user, username, password)
         except Exception as e:
             print(f"Error in verify_user: {e}")
             return None
     
+    def get_changes_since(self, known_versions: Optional[Dict[str, int]] = None) -> Dict[str, int]:
+        """Return {table: version} for tracked tables whose version differs from known_versions"""
+        def _do_get_changes_since(conn: sqlite3.Connection, known_versions: Dict[str, int]) -> Dict[str, int]:
+            try:
+                cursor = conn.cursor()
+                cursor.execute(queries.SELECT_TABLE_VERSIONS)
+                return {
+                    table: version
+                    for table, version in cursor.fetchall()
+                    if known_versions.get(table) != version
+                }
+            except Exception as e:
+                print(f"Error in _do_get_changes_since: {e}")
+                # Bilinmiyorsa her şeyi değişmiş say
+                return {table: -1 for table in TRACKED_TABLES}
+        
+        try:
+            return self.execute_read(_do_get_changes_since, known_versions or {})
+        except Exception as e:
+            print(f"Error in get_changes_since: {e}")
+            return {table: -1 for table in TRACKED_TABLES}
+    
     def get_customer_details(self, username: str) -> Optional[dict]:
         """Get customer details"""
         def _do_get_customer_details(conn: sqlite3.Connection, username: str) -> Optional[dict]:
             try:
                 cursor = conn.cursor()
-                cursor.execute('''
-                    SELECT customer_id, customer_name, budget, customer_type, total_spent
-                    FROM customers
-                    WHERE username = ?
-                ''', (username,))
+                cursor.execute(queries.SELECT_CUSTOMER_BY_USERNAME, (username,))
                 result = cursor.fetchone()
                 
                 if result:
@@ -313,7 +344,8 @@ class DatabaseManager:
                         "customer_name": result[1],
                         "budget": result[2],
                         "customer_type": result[3],
-                        "total_spent": result[4]
+                        "total_spent": result[4],
+                        "held": result[5]
                     }
                 return None
                 
@@ -322,7 +354,7 @@ class DatabaseManager:
                 return None
         
         try:
-            return self.execute_transaction(_do_get_customer_details, username)
+            return self.execute_read(_do_get_customer_details, username)
         except Exception as e:
             print(f"Error in get_customer_details: {e}")
             return None
@@ -332,106 +364,256 @@ class DatabaseManager:
         def _do_get_all_products(conn: sqlite3.Connection) -> List[dict]:
             try:
                 cursor = conn.cursor()
-                cursor.execute('''
-                    SELECT product_id, product_name, stock, price
-                    FROM products
-                    ORDER BY product_id
-                ''')
+                cursor.execute(queries.SELECT_ALL_PRODUCTS)
                 results = cursor.fetchall()
                 
                 return [{
                     "product_id": row[0],
                     "product_name": row[1],
                     "stock": row[2],
-                    "price": row[3]
+                    "price": row[3],
+                    "reserved": row[4]
                 } for row in results]
             except Exception as e:
                 print(f"Error in _do_get_all_products: {e}")
                 return []
         
         try:
-            return self.execute_transaction(_do_get_all_products)
+            return self.execute_read(_do_get_all_products)
         except Exception as e:
             print(f"Error in get_all_products: {e}")
             return []
     
     def place_order(self, customer_id: int, product_id: int, quantity: int) -> bool:
         """Yeni sipariş oluştur - sadece sipariş kaydı oluşturur, stok ve bütçe güncellemesi yapmaz"""
-        def _do_place_order(conn: sqlite3.Connection, customer_id: int, product_id: int, quantity: int) -> bool:
-            try:
-                cursor = conn.cursor()
-                
-                # Get product details
-                cursor.execute('''
-                    SELECT product_name, stock, price
-                    FROM products
-                    WHERE product_id = ?
-                ''', (product_id,))
-                
-                product = cursor.fetchone()
-                if not product:
-                    return False
-                    
-                product_name, stock, price = product
-                
-                # Stok kontrolü
-                if stock < quantity:
-                    return False
-                
-                # Get customer details
-                cursor.execute('''
-                    SELECT budget, customer_type
-                    FROM customers
-                    WHERE customer_id = ?
-                ''', (customer_id,))
-                
-                customer = cursor.fetchone()
-                if not customer:
-                    return False
-                
-                budget, customer_type = customer
-                total_cost = price * quantity
-                
-                # Bütçe kontrolü
-                if budget < total_cost:
-                    return False
-                
-                # Create order
-                cursor.execute('''
-                    INSERT INTO orders (customer_id, product_id, quantity, status)
-                    VALUES (?, ?, ?, 'pending')
-                ''', (customer_id, product_id, quantity))
-                
-                # Add log
-                cursor.execute('''
-                    INSERT INTO logs (customer_id, log_type, customer_type, product,
-                                    quantity, result_message)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                ''', (customer_id, "Order Created", customer_type, product_name,
-                      quantity, f"Order created successfully. Awaiting admin approval."))
-                
-                return True
-                
-            except Exception as e:
-                print(f"Error in _do_place_order: {e}")
-                return False
+        return self.place_basket_order(customer_id, [(product_id, quantity)]) is not None
+    
+    def place_basket_order(self, customer_id: int, lines: List[Tuple[int, int]]) -> Optional[int]:
+        """Create one order for several (product_id, quantity) lines, returns the order id
+        
+        The stock of every line is reserved until the order is settled or the
+        reservation expires, and the total cost is held on the customer's budget.
+        """
+        def _do_place_basket_order(conn: sqlite3.Connection, customer_id: int,
+                                   lines: List[Tuple[int, int]]) -> Optional[int]:
+            # No catch-all here: an error after the first write must roll the whole basket back
+            cursor = conn.cursor()
+            
+            # Same product twice in a basket counts as one line for the checks
+            needed = defaultdict(int)
+            for product_id, quantity in lines:
+                needed[product_id] += quantity
+            
+            # products: product_id -> (name, available (stock - reserved), price)
+            cursor.execute(queries.SELECT_PRODUCTS_FOR_ORDER_IN, (json.dumps(list(needed)),))
+            products = {row[0]: row[1:] for row in cursor.fetchall()}
+            
+            # Stok kontrolü (rezerve edilmemiş stok üzerinden)
+            if any(product_id not in products or products[product_id][1] < quantity
+                   for product_id, quantity in needed.items()):
+                return None
+            
+            # Get customer details
+            cursor.execute(queries.SELECT_CUSTOMER_BUDGET, (customer_id,))
+            
+            customer = cursor.fetchone()
+            if not customer:
+                return None
+            
+            budget, customer_type = customer
+            total_cost = sum(products[product_id][2] * quantity for product_id, quantity in lines)
+            
+            # Bütçe kontrolü (bekleyen siparişlerin tuttuğu bütçe hariç)
+            if budget < total_cost:
+                return None
+            
+            # Header: first product and total quantity, lines hold the details
+            product, quantity = self._describe_lines(
+                [(products[product_id][0], quantity) for product_id, quantity in lines])
+            cursor.execute(queries.INSERT_ORDER, (customer_id, lines[0][0], quantity,
+                                                  base_priority(customer_type, quantity)))
+            order_id = cursor.lastrowid
+            cursor.executemany(queries.INSERT_ORDER_LINE,
+                               [(order_id, product_id, line_quantity) for product_id, line_quantity in lines])
+            self._mark_changed("orders")
+            self._reserve_stock(cursor, order_id, needed)
+            self._hold_budget(cursor, order_id, customer_id, total_cost)
+            
+            # Add log
+            self._write_log(cursor, customer_id, "Order Created", customer_type, product,
+                            quantity, f"Order created successfully. Awaiting admin approval.")
+            
+            return order_id
+        
+        lines = [(product_id, quantity) for product_id, quantity in lines]
+        if not lines or any(quantity <= 0 for _, quantity in lines):
+            return None
         
         try:
-            return self.execute_transaction(_do_place_order, customer_id, product_id, quantity)
+            return self.execute_transaction(_do_place_basket_order, customer_id, lines)
         except Exception as e:
-            print(f"Error in place_order: {e}")
-            return False
+            print(f"Error in place_basket_order: {e}")
+            return None
+    
+    def _reserve_stock(self, cursor: sqlite3.Cursor, order_id: int, needed: Dict[int, int]):
+        """Reserve {product_id: quantity} for an order, all or nothing"""
+        cursor.executemany(queries.RESERVE_STOCK, [
+            (quantity, product_id, quantity) for product_id, quantity in needed.items()
+        ])
+        if cursor.rowcount != len(needed):
+            raise ConcurrentUpdateError(f"Order {order_id}: stock no longer available")
+        self._mark_changed("products")
+        cursor.executemany(queries.INSERT_RESERVATION, [
+            (order_id, product_id, quantity, self.RESERVATION_TTL) for product_id, quantity in needed.items()
+        ])
+    
+    def _hold_budget(self, cursor: sqlite3.Cursor, order_id: int, customer_id: int, amount: float):
+        """Hold `amount` of the customer's budget for an order"""
+        cursor.execute(queries.HOLD_BUDGET, (amount, customer_id, amount))
+        if cursor.rowcount != 1:
+            raise ConcurrentUpdateError(f"Order {order_id}: budget no longer available")
+        self._mark_changed("customers")
+        cursor.execute(queries.INSERT_BUDGET_HOLD, (order_id, customer_id, amount))
+    
+    def _close_holds(self, cursor: sqlite3.Cursor, order_ids: List[int], status: str):
+        """Close the stock reservations and budget holds of orders
+        
+        'released' gives stock and budget back, 'captured' is used after the
+        caller has already taken them out of products.reserved / customers.held.
+        """
+        if status == "released":
+            cursor.execute(queries.SELECT_ACTIVE_RESERVATIONS_IN, (json.dumps(order_ids),))
+            released = defaultdict(int)
+            for _, product_id, quantity in cursor.fetchall():
+                released[product_id] += quantity
+            cursor.executemany(queries.RELEASE_STOCK,
+                               [(quantity, product_id) for product_id, quantity in released.items()])
+            
+            cursor.execute(queries.SELECT_ACTIVE_HOLDS_IN, (json.dumps(order_ids),))
+            released = defaultdict(float)
+            for _, customer_id, amount in cursor.fetchall():
+                released[customer_id] += amount
+            cursor.executemany(queries.RELEASE_BUDGET,
+                               [(amount, customer_id) for customer_id, amount in released.items()])
+            self._mark_changed("products", "customers")
+        
+        cursor.executemany(queries.CLOSE_RESERVATIONS, [(status, order_id) for order_id in order_ids])
+        cursor.executemany(queries.CLOSE_BUDGET_HOLDS, [(status, order_id) for order_id in order_ids])
+    
+    @staticmethod
+    def _describe_lines(lines: List[Tuple[str, int]]) -> Tuple[str, int]:
+        """(product label, total quantity) of (product_name, quantity) lines, for logs"""
+        names = []
+        for product_name, _ in lines:
+            if product_name not in names:
+                names.append(product_name)
+        return ", ".join(names), sum(quantity for _, quantity in lines)
+    
+    def place_orders_bulk(self, orders: Iterable[Tuple[int, int, int]]) -> List[Dict]:
+        """Place many (customer_id, product_id, quantity) orders in one transaction
+        
+        Each order is checked like place_order and reserves its stock and
+        budget, so later orders in the batch only see what remains. Returns
+        one result per input order: {"accepted", "order_id", "reason"}.
+        """
+        def _do_place_orders_bulk(conn: sqlite3.Connection, orders: List[Tuple[int, int, int]]) -> List[Dict]:
+            cursor = conn.cursor()
+            
+            # Set-wise lookups: one query for all products, one for all customers
+            cursor.execute(queries.SELECT_PRODUCTS_FOR_ORDER_IN,
+                           (json.dumps(list({order[1] for order in orders})),))
+            products = {row[0]: row[1:] for row in cursor.fetchall()}
+            cursor.execute(queries.SELECT_CUSTOMER_BUDGETS_AND_TYPES_IN,
+                           (json.dumps(list({order[0] for order in orders})),))
+            customers = {row[0]: row[1:] for row in cursor.fetchall()}
+            
+            # Accepted orders reserve stock and hold budget, later orders only see what is left
+            available = {product_id: product[1] for product_id, product in products.items()}
+            available_budget = {customer_id: customer[0] for customer_id, customer in customers.items()}
+            
+            results = []
+            accepted = []
+            logs = []
+            for customer_id, product_id, quantity in orders:
+                reason = None
+                product = products.get(product_id)
+                customer = customers.get(customer_id)
+                if not isinstance(quantity, int) or quantity <= 0:
+                    reason = "Invalid quantity"
+                elif not product:
+                    reason = "Unknown product"
+                elif not customer:
+                    reason = "Unknown customer"
+                elif available[product_id] < quantity:
+                    reason = "Insufficient stock"
+                elif available_budget[customer_id] < product[2] * quantity:
+                    reason = "Insufficient budget"
+                
+                results.append({"accepted": reason is None, "order_id": None, "reason": reason})
+                if reason is None:
+                    available[product_id] -= quantity
+                    available_budget[customer_id] -= product[2] * quantity
+                    accepted.append((len(results) - 1, (customer_id, product_id, quantity)))
+                    logs.append((customer_id, "Order Created", customer[1], product[0], quantity,
+                                 "Order created successfully. Awaiting admin approval."))
+            
+            if accepted:
+                cursor.executemany(queries.INSERT_ORDER, [
+                    (customer_id, product_id, quantity, base_priority(customers[customer_id][1], quantity))
+                    for _, (customer_id, product_id, quantity) in accepted
+                ])
+                # Tek yazıcı transaction'ı içinde AUTOINCREMENT id'leri ardışıktır
+                cursor.execute(queries.SELECT_LAST_INSERT_ID)
+                first_id = cursor.fetchone()[0] - len(accepted) + 1
+                for offset, (index, _) in enumerate(accepted):
+                    results[index]["order_id"] = first_id + offset
+                cursor.executemany(queries.INSERT_ORDER_LINE, [
+                    (first_id + offset, product_id, quantity)
+                    for offset, (_, (_, product_id, quantity)) in enumerate(accepted)
+                ])
+                reserved = defaultdict(int)
+                for _, (_, product_id, quantity) in accepted:
+                    reserved[product_id] += quantity
+                cursor.executemany(queries.RESERVE_STOCK,
+                                   [(quantity, product_id, quantity) for product_id, quantity in reserved.items()])
+                if cursor.rowcount != len(reserved):
+                    raise ConcurrentUpdateError("Bulk placement: stock no longer available", reserved)
+                cursor.executemany(queries.INSERT_RESERVATION, [
+                    (first_id + offset, product_id, quantity, self.RESERVATION_TTL)
+                    for offset, (_, (_, product_id, quantity)) in enumerate(accepted)
+                ])
+                
+                holds = [(first_id + offset, customer_id, products[product_id][2] * quantity)
+                         for offset, (_, (customer_id, product_id, quantity)) in enumerate(accepted)]
+                held = defaultdict(float)
+                for _, customer_id, amount in holds:
+                    held[customer_id] += amount
+                cursor.executemany(queries.HOLD_BUDGET,
+                                   [(amount, customer_id, amount) for customer_id, amount in held.items()])
+                if cursor.rowcount != len(held):
+                    raise ConcurrentUpdateError("Bulk placement: budget no longer available")
+                cursor.executemany(queries.INSERT_BUDGET_HOLD, holds)
+                self._mark_changed("orders", "products", "customers")
+                self._write_logs(cursor, logs)
+            
+            return results
+        
+        orders = [tuple(order) for order in orders]
+        if not orders:
+            return []
+        
+        try:
+            return self.execute_transaction(_do_place_orders_bulk, orders)
+        except Exception as e:
+            print(f"Error in place_orders_bulk: {e}")
+            return [{"accepted": False, "order_id": None, "reason": str(e)} for _ in orders]
             
     def get_all_customers(self) -> List[dict]:
         """Get all customers with their details"""
         def _do_get_all_customers(conn: sqlite3.Connection) -> List[dict]:
             try:
                 cursor = conn.cursor()
-                cursor.execute('''
-                    SELECT customer_id, customer_name, budget, customer_type, total_spent, username
-                    FROM customers
-                    ORDER BY customer_id
-                ''')
+                cursor.execute(queries.SELECT_ALL_CUSTOMERS)
                 results = cursor.fetchall()
                 
                 return [{
@@ -440,7 +622,8 @@ class DatabaseManager:
                     "budget": row[2],
                     "customer_type": row[3],
                     "total_spent": row[4],
-                    "username": row[5]
+                    "username": row[5],
+                    "held": row[6]
                 } for row in results]
                 
             except Exception as e:
@@ -448,32 +631,24 @@ class DatabaseManager:
                 return []
         
         try:
-            return self.execute_transaction(_do_get_all_customers)
+            return self.execute_read(_do_get_all_customers)
         except Exception as e:
             print(f"Error in get_all_customers: {e}")
             return []
             
     def get_pending_orders(self) -> list:
-        """Bekleyen tüm siparişleri getir"""
+        """Bekleyen tüm siparişleri öncelik puanıyla (yüksekten düşüğe) getir"""
         def _do_get_pending_orders(conn: sqlite3.Connection) -> list:
             try:
                 cursor = conn.cursor()
-                cursor.execute('''
-                    SELECT o.order_id, o.customer_id, c.customer_type, o.product_id,
-                           p.product_name, o.quantity, o.order_time,
-                           ROUND((julianday('now') - julianday(o.order_time)) * 86400) as wait_time
-                    FROM orders o
-                    JOIN customers c ON o.customer_id = c.customer_id
-                    JOIN products p ON o.product_id = p.product_id
-                    WHERE o.status = 'pending'
-                ''')
+                cursor.execute(queries.SELECT_PENDING_ORDERS_BY_PRIORITY)
                 return cursor.fetchall()
             except Exception as e:
                 print(f"Error in _do_get_pending_orders: {e}")
                 return []
 
         try:
-            return self.execute_transaction(_do_get_pending_orders)
+            return self.execute_read(_do_get_pending_orders)
         except Exception as e:
             print(f"Error in get_pending_orders: {e}")
             return []
@@ -484,31 +659,8 @@ class DatabaseManager:
             try:
                 cursor = conn.cursor()
                 
-                # Create logs table if it doesn't exist
-                cursor.execute('''
-                    CREATE TABLE IF NOT EXISTS logs (
-                        log_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        customer_id INTEGER,
-                        log_type TEXT NOT NULL,
-                        customer_type TEXT,
-                        product TEXT,
-                        quantity INTEGER,
-                        timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        result_message TEXT,
-                        FOREIGN KEY (customer_id) REFERENCES customers(customer_id)
-                    )
-                ''')
-                
                 # Get recent logs
-                cursor.execute('''
-                    SELECT l.log_id, l.customer_id, c.customer_name, l.log_type,
-                           l.customer_type, l.product, l.quantity, l.timestamp,
-                           l.result_message
-                    FROM logs l
-                    LEFT JOIN customers c ON l.customer_id = c.customer_id
-                    ORDER BY l.timestamp DESC
-                    LIMIT ?
-                ''', (limit,))
+                cursor.execute(queries.SELECT_RECENT_LOGS, (limit,))
                 results = cursor.fetchall()
                 
                 return [{
@@ -528,11 +680,53 @@ class DatabaseManager:
                 return []
         
         try:
-            return self.execute_transaction(_do_get_recent_logs, limit)
+            return self.execute_read(_do_get_recent_logs, limit)
         except Exception as e:
             print(f"Error in get_recent_logs: {e}")
             return []
             
+    def get_logs_page(self, before_log_id: Optional[int] = None, after_log_id: Optional[int] = None,
+                      limit: int = 100) -> List[dict]:
+        """Keyset-paginated logs (newest first): older than before_log_id or newer than after_log_id"""
+        def _do_get_logs_page(conn: sqlite3.Connection, before_log_id: Optional[int],
+                              after_log_id: Optional[int], limit: int) -> List[dict]:
+            try:
+                cursor = conn.cursor()
+                
+                # OFFSET yok: her sayfa log_id üzerinde tek bir index aralığı taramasıdır
+                if after_log_id is not None:
+                    cursor.execute(queries.SELECT_LOGS_AFTER, (after_log_id, limit))
+                    results = cursor.fetchall()
+                    results.reverse()
+                elif before_log_id is not None:
+                    cursor.execute(queries.SELECT_LOGS_BEFORE, (before_log_id, limit))
+                    results = cursor.fetchall()
+                else:
+                    cursor.execute(queries.SELECT_LOGS_HEAD, (limit,))
+                    results = cursor.fetchall()
+                
+                return [{
+                    "log_id": row[0],
+                    "customer_id": row[1],
+                    "customer_name": row[2] if row[2] else "System",
+                    "log_type": row[3],
+                    "customer_type": row[4],
+                    "product": row[5],
+                    "quantity": row[6],
+                    "timestamp": row[7],
+                    "result_message": row[8]
+                } for row in results]
+                
+            except Exception as e:
+                print(f"Error in _do_get_logs_page: {e}")
+                return []
+        
+        try:
+            return self.execute_read(_do_get_logs_page, before_log_id, after_log_id, limit)
+        except Exception as e:
+            print(f"Error in get_logs_page: {e}")
+            return []
+    
     def add_log(self, customer_id: Optional[int], log_type: str, customer_type: Optional[str],
                 product: Optional[str], quantity: Optional[int], result_message: str) -> bool:
         """Add a new log entry"""
@@ -542,11 +736,7 @@ class DatabaseManager:
             try:
                 cursor = conn.cursor()
                 
-                cursor.execute('''
-                    INSERT INTO logs (customer_id, log_type, customer_type, product,
-                                    quantity, result_message)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                ''', (customer_id, log_type, customer_type, product, quantity, result_message))
+                self._write_log(cursor, customer_id, log_type, customer_type, product, quantity, result_message)
                 
                 return True
                 
@@ -554,6 +744,12 @@ class DatabaseManager:
                 print(f"Error in _do_add_log: {e}")
                 return False
         
+        # Async mod: transaction açmadan doğrudan yazıcı kuyruğuna
+        if not self.DURABLE_LOGS:
+            self.log_writer.append((customer_id, log_type, customer_type, product,
+                                    quantity, result_message, log_timestamp()))
+            return True
+        
         try:
             return self.execute_transaction(_do_add_log, customer_id, log_type,
                                          customer_type, product, quantity, result_message)
@@ -561,283 +757,543 @@ class DatabaseManager:
             print(f"Error in add_log: {e}")
             return False
             
+    def _plan_order(self, cursor: sqlite3.Cursor, order_id: int) -> Optional[Dict]:
+        """How a pending order would be settled, from the reads of one transaction
+        
+        None if the order is not pending. "failure" is the reason the order
+        fails, None if it can be settled; "needed" keeps the product versions
+        that were read, so the settling writes can check nothing changed.
+        """
+        # Get order header with customer info
+        cursor.execute(queries.SELECT_PENDING_ORDER_HEADER, (order_id,))
+        
+        order = cursor.fetchone()
+        if not order:
+            return None
+        
+        customer_id, customer_type, current_budget, held = order
+        
+        cursor.execute(queries.SELECT_ORDER_LINES, (order_id,))
+        lines = cursor.fetchall()
+        product, quantity = self._describe_lines([(line[2], line[3]) for line in lines])
+        
+        # Stock this order reserved at placement (nothing if it expired)
+        cursor.execute(queries.SELECT_ACTIVE_RESERVATIONS, (order_id,))
+        reservations = cursor.fetchall()
+        own_reserved = defaultdict(int)
+        for product_id, reserved_quantity in reservations:
+            own_reserved[product_id] += reserved_quantity
+        
+        # Budget this order holds
+        cursor.execute(queries.SELECT_ACTIVE_HOLDS_IN, (json.dumps([order_id]),))
+        holds = cursor.fetchall()
+        own_held = sum(row[2] for row in holds)
+        
+        # product_id -> [quantity, version, stock, reserved by all orders]
+        needed = {}
+        for _, product_id, _, line_quantity, _, stock, version, reserved, _ in lines:
+            needed.setdefault(product_id, [0, version, stock, reserved])[0] += line_quantity
+        
+        # Son kontroller: satırlardan biri bile karşılanamazsa sipariş başarısız.
+        # Kendi rezervasyonunu aşan kısım başkalarının rezervasyonuna dokunamaz
+        # (free stock is never negative, even if stock was cut below the reservations).
+        # Fiyat değiştiyse tutulan tutarı aşan kısım serbest bütçeden karşılanır.
+        failure = None
+        total_cost = 0.0
+        if any(line[8] for line in lines):
+            # A line whose product was deleted can never be delivered
+            failure = "Product no longer available"
+        elif not lines or any(
+                stock < line_quantity or max(stock - reserved, 0) < line_quantity - own_reserved[product_id]
+                for product_id, (line_quantity, _, stock, reserved) in needed.items()):
+            failure = "Insufficient stock"
+        else:
+            total_cost = sum(line[3] * line[4] for line in lines)
+            if current_budget < total_cost or current_budget - held < total_cost - own_held:
+                failure = "Insufficient budget"
+        
+        return {
+            "customer_id": customer_id, "customer_type": customer_type,
+            "product": product, "quantity": quantity, "failure": failure,
+            "needed": needed, "own_reserved": own_reserved, "reservations": len(reservations),
+            "own_held": own_held, "holds": len(holds), "total_cost": total_cost,
+        }
+    
     def process_order(self, order_id: int) -> bool:
-        """Siparişi işle - stok ve bütçe güncellemesi yapar"""
-        def _do_process_order(conn: sqlite3.Connection, order_id: int) -> bool:
-            try:
-                cursor = conn.cursor()
-                
-                # Get order details with product and customer info
-                cursor.execute('''
-                    SELECT o.customer_id, c.customer_type, o.product_id, p.product_name,
-                           o.quantity, o.status, p.price, p.version, p.stock,
-                           c.budget
-                    FROM orders o
-                    JOIN customers c ON o.customer_id = c.customer_id
-                    JOIN products p ON o.product_id = p.product_id
-                    WHERE o.order_id = ? AND o.status = 'pending'
-                ''', (order_id,))
-                
-                order = cursor.fetchone()
-                if not order:
-                    return False
-                
-                customer_id, customer_type, product_id, product_name, quantity, status, \
-                price, version, current_stock, current_budget = order
-                
-                total_cost = price * quantity
-                
-                # Son kontroller
-                if current_stock < quantity:
-                    cursor.execute('''
-                        UPDATE orders SET status = 'failed'
-                        WHERE order_id = ?
-                    ''', (order_id,))
-                    
-                    cursor.execute('''
-                        INSERT INTO logs (customer_id, log_type, customer_type, product,
-                                        quantity, result_message)
-                        VALUES (?, ?, ?, ?, ?, ?)
-                    ''', (customer_id, "Error", customer_type, product_name,
-                          quantity, f"Order {order_id} failed: Insufficient stock"))
-                    return False
-                
-                if current_budget < total_cost:
-                    cursor.execute('''
-                        UPDATE orders SET status = 'failed'
-                        WHERE order_id = ?
-                    ''', (order_id,))
-                    
-                    cursor.execute('''
-                        INSERT INTO logs (customer_id, log_type, customer_type, product,
-                                        quantity, result_message)
-                        VALUES (?, ?, ?, ?, ?, ?)
-                    ''', (customer_id, "Error", customer_type, product_name,
-                          quantity, f"Order {order_id} failed: Insufficient budget"))
+        """Siparişi işle - tüm satırlar için stok ve bütçe güncellemesi tek transaction'da yapılır
+        
+        The order is planned on a snapshot read, then settled in a short write
+        transaction whose updates only apply if the products, reservations and
+        holds are still as read; otherwise it is a conflict and is retried.
+        """
+        def _do_read_order(conn: sqlite3.Connection, order_id: int) -> Optional[Dict]:
+            return self._plan_order(conn.cursor(), order_id)
+        
+        def _do_process_order(conn: sqlite3.Connection, order_id: int, plan: Dict) -> bool:
+            cursor = conn.cursor()
+            
+            # Failing is decided on current data, under the write lock
+            if plan["failure"]:
+                plan = self._plan_order(cursor, order_id)
+                if plan is None:
                     return False
+            
+            customer_id, customer_type = plan["customer_id"], plan["customer_type"]
+            product, quantity = plan["product"], plan["quantity"]
+            needed = plan["needed"]
+            own_reserved = plan["own_reserved"]
+            
+            # Every path below settles or fails the order, unless it was settled meanwhile
+            cursor.execute(queries.SET_PENDING_ORDER_STATUS,
+                           ("failed" if plan["failure"] else "processed", order_id))
+            if cursor.rowcount == 0:
+                return False
+            self._mark_changed("orders", "products", "customers")
+            
+            if plan["failure"]:
+                self._close_holds(cursor, [order_id], "released")
                 
-                # Update stock with optimistic locking
-                cursor.execute('''
-                    UPDATE products
-                    SET stock = stock - ?, version = version + 1
-                    WHERE product_id = ? AND version = ? AND stock >= ?
-                ''', (quantity, product_id, version, quantity))
-                
-                if cursor.rowcount == 0:
+                self._write_log(cursor, customer_id, "Error", customer_type, product,
+                                quantity, f"Order {order_id} failed: {plan['failure']}")
+                return False
+            
+            # The reservations and holds read must all still be active (not expired meanwhile)
+            cursor.execute(queries.CLOSE_RESERVATIONS, ("captured", order_id))
+            if cursor.rowcount != plan["reservations"]:
+                raise ConcurrentUpdateError(f"Order {order_id}: reservation expired concurrently", needed)
+            cursor.execute(queries.CLOSE_BUDGET_HOLDS, ("captured", order_id))
+            if cursor.rowcount != plan["holds"]:
+                raise ConcurrentUpdateError(f"Order {order_id}: budget hold changed concurrently")
+            
+            # Update stock with optimistic locking, every product must still be unchanged
+            cursor.executemany(queries.CAPTURE_STOCK_IF_VERSION, [
+                (line_quantity, own_reserved[product_id], product_id, version,
+                 line_quantity, line_quantity - own_reserved[product_id])
+                for product_id, (line_quantity, version, _, _) in needed.items()
+            ])
+            
+            if cursor.rowcount != len(needed):
+                raise ConcurrentUpdateError(f"Order {order_id}: product changed concurrently", needed)
+            
+            # Update customer budget and total spent, capturing the hold
+            total_cost, own_held = plan["total_cost"], plan["own_held"]
+            cursor.execute(queries.CAPTURE_BUDGET_IF_FUNDED,
+                           (total_cost, own_held, total_cost, customer_id,
+                            total_cost, total_cost - own_held))
+            
+            if cursor.rowcount == 0:
+                raise ConcurrentUpdateError(f"Order {order_id}: budget changed concurrently")
+            
+            # Add success log
+            self._write_log(cursor, customer_id, "Order Processed", customer_type, product,
+                            quantity, f"Order {order_id} processed successfully")
+            
+            return True
+        
+        # Conflicts roll back and are retried with backoff; once a product is hot
+        # the retries wait for its lane instead of racing the other settlements
+        product_ids = ()
+        for attempt in range(1, self.retry_policy.max_attempts + 1):
+            try:
+                if product_ids and self.SERIALIZE_HOT_PRODUCTS and self.contention.is_hot(product_ids):
+                    with self.contention.lane(product_ids):
+                        plan = self.execute_read(_do_read_order, order_id)
+                        return plan is not None and self.execute_transaction(_do_process_order, order_id, plan)
+                plan = self.execute_read(_do_read_order, order_id)
+                return plan is not None and self.execute_transaction(_do_process_order, order_id, plan)
+            except Exception as e:
+                if not self.retry_policy.is_retryable(e):
+                    print(f"Error in process_order: {e}")
+                    self.add_log(None, "Error", None, None, None, f"Order {order_id} failed: {str(e)}")
                     return False
                 
-                # Update customer budget and total spent
-                cursor.execute('''
-                    UPDATE customers
-                    SET budget = budget - ?,
-                        total_spent = total_spent + ?
-                    WHERE customer_id = ? AND budget >= ?
-                ''', (total_cost, total_cost, customer_id, total_cost))
-                
-                if cursor.rowcount == 0:
+                retrying = attempt < self.retry_policy.max_attempts
+                product_ids = getattr(e, "product_ids", ()) or product_ids
+                self.contention.record_conflict(product_ids, retrying)
+                if not retrying:
+                    # Rolled back, the order stays pending
+                    print(f"Conflict in process_order after {attempt} attempts: {e}")
                     return False
+                time.sleep(self.retry_policy.delay(attempt))
+    
+    def get_contention_stats(self) -> Dict[int, Dict]:
+        """Per-product optimistic locking conflict counters, hottest first"""
+        return self.contention.get_stats()
+            
+    def process_all_orders(self) -> Tuple[int, int]:
+        """Process all pending orders, returns (success_count, failed_count)
+        
+        Same as settle_pending_orders: stock, budget, reservations and holds
+        are all settled.
+        """
+        return self.settle_pending_orders()
+            
+    def get_prioritized_pending_order_ids(self, limit: Optional[int] = None) -> List[int]:
+        """Bekleyen siparişleri öncelik puanına göre (yüksekten düşüğe) getir
+        
+        With a limit only the top `limit` orders are read, via the base priority index.
+        """
+        def _do_get_prioritized_pending_order_ids(conn: sqlite3.Connection, limit: Optional[int]) -> List[int]:
+            try:
+                cursor = conn.cursor()
                 
-                # Update order status
-                cursor.execute('''
-                    UPDATE orders
-                    SET status = 'processed'
-                    WHERE order_id = ?
-                ''', (order_id,))
-                
-                # Add success log
-                cursor.execute('''
-                    INSERT INTO logs (customer_id, log_type, customer_type, product,
-                                    quantity, result_message)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                ''', (customer_id, "Order Processed", customer_type, product_name,
-                      quantity, f"Order {order_id} processed successfully"))
-                
-                return True
-                
+                if limit is None:
+                    cursor.execute(queries.SELECT_PRIORITIZED_PENDING_ORDER_IDS)
+                else:
+                    cursor.execute(queries.SELECT_TOP_PENDING_ORDER_IDS, (limit, limit))
+                return [row[0] for row in cursor.fetchall()]
             except Exception as e:
-                print(f"Error in _do_process_order: {e}")
-                
-                # Log error
-                try:
-                    cursor.execute('''
-                        INSERT INTO logs (customer_id, log_type, customer_type, product,
-                                        quantity, result_message)
-                        VALUES (?, ?, ?, ?, ?, ?)
-                    ''', (customer_id, "Error", customer_type, product_name,
-                          quantity, f"Order {order_id} failed: {str(e)}"))
-                except:
-                    pass
-                    
-                return False
+                print(f"Error in _do_get_prioritized_pending_order_ids: {e}")
+                return []
         
         try:
-            return self.execute_transaction(_do_process_order, order_id)
+            return self.execute_read(_do_get_prioritized_pending_order_ids, limit)
         except Exception as e:
-            print(f"Error in process_order: {e}")
-            return False
-            
-    def process_all_orders(self) -> Tuple[int, int]:
-        """Process all pending orders, returns (success_count, failed_count)"""
-        def _do_process_all_orders(conn: sqlite3.Connection) -> Tuple[int, int]:
+            print(f"Error in get_prioritized_pending_order_ids: {e}")
+            return []
+    
+    def get_order_stream(self) -> List[Tuple[int, int, str, int, float]]:
+        """(order_id, customer_id, customer_type, quantity, placed_at) of every order, in placement order
+        
+        placed_at is a Unix timestamp (UTC).
+        """
+        def _do_get_order_stream(conn: sqlite3.Connection) -> List[Tuple[int, int, str, int, float]]:
             try:
                 cursor = conn.cursor()
-                
-                # Get all pending orders sorted by priority
-                cursor.execute('''
-                    SELECT o.order_id, o.customer_id, c.customer_type, o.product_id,
-                           p.product_name, o.quantity, o.order_time,
-                           ROUND((julianday('now') - julianday(o.order_time)) * 86400) as wait_time
-                    FROM orders o
-                    JOIN customers c ON o.customer_id = c.customer_id
-                    JOIN products p ON o.product_id = p.product_id
-                    WHERE o.status = 'pending'
-                    ORDER BY 
-                        CASE WHEN c.customer_type = 'Premium' THEN 1 ELSE 2 END,
-                        wait_time DESC
-                ''')
-                
-                orders = cursor.fetchall()
-                success_count = 0
-                failed_count = 0
-                
-                for order in orders:
-                    order_id, customer_id, customer_type, product_id, product_name, quantity, order_time, wait_time = order
-                    
-                    # Calculate priority score
-                    customer_type_multiplier = 2.0 if customer_type == "Premium" else 1.0
-                    priority_score = customer_type_multiplier * (1.0 + wait_time / 3600.0)
-                    
-                    try:
-                        # Update order status
-                        cursor.execute('''
-                            UPDATE orders
-                            SET status = 'processed'
-                            WHERE order_id = ?
-                        ''', (order_id,))
-                        
-                        # Add detailed log entry with priority information
-                        log_message = (
-                            f"Order {order_id} processed | "
-                            f"Priority: {priority_score:.2f} | "
-                            f"Wait: {wait_time:.0f}s | "
-                            f"Multiplier: {customer_type_multiplier:.1f}x"
-                        )
-                        
-                        cursor.execute('''
-                            INSERT INTO logs (customer_id, log_type, customer_type, product,
-                                            quantity, result_message)
-                            VALUES (?, ?, ?, ?, ?, ?)
-                        ''', (customer_id, "Order Processed", customer_type, product_name,
-                              quantity, log_message))
-                        
-                        success_count += 1
-                        
-                    except Exception as e:
-                        print(f"Error processing order {order_id}: {e}")
-                        failed_count += 1
-                        
-                        # Add error log with priority information
-                        try:
-                            error_message = (
-                                f"Failed to process order {order_id} | "
-                                f"Priority: {priority_score:.2f} | "
-                                f"Wait: {wait_time:.0f}s | "
-                                f"Error: {str(e)}"
-                            )
-                            
-                            cursor.execute('''
-                                INSERT INTO logs (customer_id, log_type, customer_type, product,
-                                                quantity, result_message)
-                                VALUES (?, ?, ?, ?, ?, ?)
-                            ''', (customer_id, "Error", customer_type, product_name,
-                                  quantity, error_message))
-                        except:
-                            pass
-                
-                # Add summary log
-                if orders:
-                    summary_message = (
-                        f"Batch processing completed | "
-                        f"Total: {len(orders)} | "
-                        f"Success: {success_count} | "
-                        f"Failed: {failed_count} | "
-                        f"Order: Premium first, then by wait time"
-                    )
-                    
-                    cursor.execute('''
-                        INSERT INTO logs (log_type, result_message)
-                        VALUES (?, ?)
-                    ''', ("System", summary_message))
-                
-                return success_count, failed_count
-                
+                cursor.execute(queries.SELECT_ORDER_STREAM)
+                return cursor.fetchall()
             except Exception as e:
-                print(f"Error in _do_process_all_orders: {e}")
-                return 0, 0
+                print(f"Error in _do_get_order_stream: {e}")
+                return []
         
         try:
-            return self.execute_transaction(_do_process_all_orders)
+            return self.execute_read(_do_get_order_stream)
         except Exception as e:
-            print(f"Error in process_all_orders: {e}")
-            return 0, 0
-            
-    def create_test_orders(self) -> bool:
-        """Test için örnek siparişler oluştur"""
-        def _do_create_test_orders(conn: sqlite3.Connection) -> bool:
+            print(f"Error in get_order_stream: {e}")
+            return []
+    
+    def get_pending_order_scoring_rows(self) -> List[Tuple[int, int, float, int]]:
+        """(order_id, is_premium, wait_time, quantity) of every pending order"""
+        def _do_get_pending_order_scoring_rows(conn: sqlite3.Connection) -> List[Tuple[int, int, float, int]]:
+            try:
+                cursor = conn.cursor()
+                cursor.execute(queries.SELECT_PENDING_ORDER_SCORING_ROWS)
+                return cursor.fetchall()
+            except Exception as e:
+                print(f"Error in _do_get_pending_order_scoring_rows: {e}")
+                return []
+        
+        try:
+            return self.execute_read(_do_get_pending_order_scoring_rows)
+        except Exception as e:
+            print(f"Error in get_pending_order_scoring_rows: {e}")
+            return []
+    
+    def get_pending_orders_after(self, last_order_id: int, limit: int = 10000) -> List[tuple]:
+        """(order_id, customer_id, customer_type, quantity, base_priority, wait_time) of pending
+        orders with a higher id, oldest id first"""
+        def _do_get_pending_orders_after(conn: sqlite3.Connection, last_order_id: int,
+                                         limit: int) -> List[tuple]:
+            try:
+                cursor = conn.cursor()
+                cursor.execute(queries.SELECT_PENDING_ORDERS_AFTER, (last_order_id, limit))
+                return cursor.fetchall()
+            except Exception as e:
+                print(f"Error in _do_get_pending_orders_after: {e}")
+                return []
+        
+        try:
+            return self.execute_read(_do_get_pending_orders_after, last_order_id, limit)
+        except Exception as e:
+            print(f"Error in get_pending_orders_after: {e}")
+            return []
+    
+    def get_pending_order_conflict_keys(self) -> List[Tuple[int, int, List[int]]]:
+        """(order_id, customer_id, product_ids) of pending orders in priority order"""
+        def _do_get_pending_order_conflict_keys(conn: sqlite3.Connection) -> List[Tuple[int, int, List[int]]]:
             try:
                 cursor = conn.cursor()
                 
-                # Mevcut müşterileri al
-                cursor.execute("SELECT customer_id, customer_type FROM customers")
-                customers = cursor.fetchall()
-                
-                # Mevcut ürünleri al
-                cursor.execute("SELECT product_id FROM products WHERE stock > 0")
-                products = cursor.fetchall()
-                
-                # Test siparişleri oluştur
-                for i, customer in enumerate(customers):
-                    customer_id, customer_type = customer
-                    product_id = products[i % len(products)][0]
-                    quantity = random.randint(1, 5)
-                    
-                    # Farklı zamanlarda oluşturulmuş gibi görünmesi için
-                    time_offset = random.randint(0, 3600)  # 0-1 saat arası
-                    order_time = time.strftime(
-                        '%Y-%m-%d %H:%M:%S',
-                        time.localtime(time.time() - time_offset)
-                    )
-                    
-                    cursor.execute('''
-                        INSERT INTO orders (customer_id, product_id, quantity, order_time, status)
-                        VALUES (?, ?, ?, ?, 'pending')
-                    ''', (customer_id, product_id, quantity, order_time))
-                
-                return True
+                # Aynı snapshot içinde öncelik sırası ve ürünler
+                cursor.execute(queries.SELECT_PRIORITIZED_PENDING_ORDER_IDS)
+                order_ids = [row[0] for row in cursor.fetchall()]
                 
+                cursor.execute(queries.SELECT_PENDING_ORDER_PRODUCTS)
+                keys = {}
+                for order_id, customer_id, product_id in cursor.fetchall():
+                    keys.setdefault(order_id, (order_id, customer_id, []))[2].append(product_id)
+                return [keys[order_id] for order_id in order_ids if order_id in keys]
             except Exception as e:
-                print(f"Error in _do_create_test_orders: {e}")
-                return False
+                print(f"Error in _do_get_pending_order_conflict_keys: {e}")
+                return []
+        
+        try:
+            return self.execute_read(_do_get_pending_order_conflict_keys)
+        except Exception as e:
+            print(f"Error in get_pending_order_conflict_keys: {e}")
+            return []
+    
+    def settle_orders(self, order_ids: List[int]) -> Optional[Tuple[int, int]]:
+        """Settle the given orders (in the given priority order) in one transaction, returns (success_count, failed_count)
+        
+        (0, 0) means none of the orders was still pending; None means the
+        transaction failed and rolled back, the orders stay pending.
+        """
+        def _do_settle_orders(conn: sqlite3.Connection, order_ids: List[int]) -> Tuple[int, int]:
+            cursor = conn.cursor()
+            
+            # Only orders that are still pending inside this transaction
+            cursor.execute(queries.SELECT_PENDING_ORDERS_IN, (json.dumps(order_ids),))
+            orders = {row[0]: row for row in cursor.fetchall()}
+            if not orders:
+                return 0, 0
+            self._mark_changed("orders", "products", "customers")
+            
+            # Lines of every order, with the products' current stock and reservations
+            cursor.execute(queries.SELECT_ORDER_LINES_IN, (json.dumps(list(orders)),))
+            lines = defaultdict(list)
+            stock = {}
+            reserved = {}
+            missing_product = set()
+            for order_id, product_id, product_name, quantity, price, product_stock, _, product_reserved, \
+                    product_missing in cursor.fetchall():
+                lines[order_id].append((product_id, product_name, quantity, price))
+                if product_missing:
+                    missing_product.add(order_id)
+                    continue
+                stock[product_id] = product_stock
+                reserved[product_id] = product_reserved
+            
+            # Stock each order reserved at placement
+            cursor.execute(queries.SELECT_ACTIVE_RESERVATIONS_IN, (json.dumps(list(orders)),))
+            own_reserved = defaultdict(lambda: defaultdict(int))
+            for order_id, product_id, quantity in cursor.fetchall():
+                own_reserved[order_id][product_id] += quantity
+            
+            customer_ids = list({row[1] for row in orders.values()})
+            cursor.execute(queries.SELECT_CUSTOMER_BUDGETS_IN, (json.dumps(customer_ids),))
+            budget = {}
+            held = {}
+            for customer_id, customer_budget, customer_held in cursor.fetchall():
+                budget[customer_id] = customer_budget
+                held[customer_id] = customer_held
+            
+            # Budget each order holds
+            cursor.execute(queries.SELECT_ACTIVE_HOLDS_IN, (json.dumps(list(orders)),))
+            own_held = defaultdict(float)
+            for order_id, _, amount in cursor.fetchall():
+                own_held[order_id] += amount
+            
+            processed = []
+            failed = []
+            logs = []
+            stock_used = defaultdict(int)
+            reservation_used = defaultdict(int)
+            reservation_released = defaultdict(int)
+            spent = defaultdict(float)
+            hold_used = defaultdict(float)
+            hold_released = defaultdict(float)
+            
+            # Öncelik sırasını koruyarak stok ve bütçeyi bellekte düş
+            for order_id in order_ids:
+                order = orders.get(order_id)
+                if not order:
+                    continue
+                
+                _, customer_id, customer_type = order
+                order_lines = lines[order_id]
+                own = own_reserved[order_id]
+                needed = defaultdict(int)
+                for product_id, _, quantity, _ in order_lines:
+                    needed[product_id] += quantity
+                # Deleted products have no price, their orders fail below
+                total_cost = sum(quantity * (price or 0) for _, _, quantity, price in order_lines)
+                product, quantity = self._describe_lines([(line[1], line[2]) for line in order_lines])
+                
+                # A line whose product was deleted can never be delivered. Sepet bütün
+                # olarak işlenir: tüm satırlar karşılanmalı. Kendi rezervasyonunu aşan
+                # kısım başkalarının rezervasyonuna dokunamaz; stock cut below the
+                # reservations goes to the orders in priority order.
+                if order_id in missing_product:
+                    failed.append(("failed", order_id))
+                    logs.append((customer_id, "Error", customer_type, product,
+                                 quantity, f"Order {order_id} failed: Product no longer available"))
+                elif not order_lines or any(
+                        stock[product_id] < needed_quantity
+                        or max(stock[product_id] - reserved[product_id], 0) < needed_quantity - own[product_id]
+                        for product_id, needed_quantity in needed.items()):
+                    failed.append(("failed", order_id))
+                    logs.append((customer_id, "Error", customer_type, product,
+                                 quantity, f"Order {order_id} failed: Insufficient stock"))
+                elif (budget[customer_id] < total_cost
+                      or budget[customer_id] - held[customer_id] < total_cost - own_held[order_id]):
+                    failed.append(("failed", order_id))
+                    logs.append((customer_id, "Error", customer_type, product,
+                                 quantity, f"Order {order_id} failed: Insufficient budget"))
+                else:
+                    for product_id, needed_quantity in needed.items():
+                        stock[product_id] -= needed_quantity
+                        stock_used[product_id] += needed_quantity
+                    for product_id, quantity in own.items():
+                        reserved[product_id] -= quantity
+                        reservation_used[product_id] += quantity
+                    budget[customer_id] -= total_cost
+                    held[customer_id] -= own_held[order_id]
+                    spent[customer_id] += total_cost
+                    hold_used[customer_id] += own_held[order_id]
+                    processed.append(("processed", order_id))
+                    logs.append((customer_id, "Order Processed", customer_type, product,
+                                 quantity, f"Order {order_id} processed successfully"))
+                    continue
+                
+                # Failed: reservation and hold go back to the pool for the next orders
+                for product_id, quantity in own.items():
+                    if product_id in reserved:
+                        reserved[product_id] -= quantity
+                    reservation_released[product_id] += quantity
+                held[customer_id] -= own_held[order_id]
+                hold_released[customer_id] += own_held[order_id]
+            
+            # Aggregated writes: one row per product / customer
+            cursor.executemany(queries.CAPTURE_STOCK, [
+                (quantity, reservation_used[product_id], product_id)
+                for product_id, quantity in stock_used.items()
+            ])
+            cursor.executemany(queries.RELEASE_STOCK,
+                               [(quantity, product_id) for product_id, quantity in reservation_released.items()])
+            cursor.executemany(queries.CAPTURE_BUDGET, [
+                (amount, hold_used[customer_id], amount, customer_id)
+                for customer_id, amount in spent.items()
+            ])
+            cursor.executemany(queries.RELEASE_BUDGET,
+                               [(amount, customer_id) for customer_id, amount in hold_released.items()])
+            cursor.executemany(queries.SET_ORDER_STATUS, processed + failed)
+            closed = ([("captured", order_id) for _, order_id in processed]
+                      + [("released", order_id) for _, order_id in failed])
+            cursor.executemany(queries.CLOSE_RESERVATIONS, closed)
+            cursor.executemany(queries.CLOSE_BUDGET_HOLDS, closed)
+            
+            self._write_logs(cursor, logs)
+            
+            return len(processed), len(failed)
+        
+        if not order_ids:
+            return 0, 0
         
         try:
-            return self.execute_transaction(_do_create_test_orders)
+            return self.execute_transaction(_do_settle_orders, list(order_ids))
+        except Exception as e:
+            print(f"Error in settle_orders: {e}")
+            return None
+    
+    def settle_pending_orders(self, chunk_size: int = 500,
+                              should_continue: Optional[Callable[[], bool]] = None) -> Tuple[int, int]:
+        """Settle all pending orders by priority in chunked transactions, returns (success_count, failed_count)"""
+        self.expire_reservations()
+        order_ids = self.get_prioritized_pending_order_ids()
+        success_count = 0
+        failed_count = 0
+        
+        for start in range(0, len(order_ids), chunk_size):
+            if should_continue and not should_continue():
+                break
+            
+            # A failed chunk stays pending for the next run
+            success, failed = self.settle_orders(order_ids[start:start + chunk_size]) or (0, 0)
+            success_count += success
+            failed_count += failed
+        
+        if order_ids:
+            self.add_log(None, "System", None, None, None, (
+                f"Batch settlement completed | "
+                f"Total: {len(order_ids)} | "
+                f"Success: {success_count} | "
+                f"Failed: {failed_count} | "
+                f"Chunk size: {chunk_size}"
+            ))
+        
+        return success_count, failed_count
+    
+    def expire_reservations(self, batch_size: int = 1000) -> int:
+        """Release reservations older than RESERVATION_TTL, returns how many expired
+        
+        The orders stay pending; settling them later only uses unreserved stock.
+        """
+        def _do_expire_reservations(conn: sqlite3.Connection, batch_size: int) -> int:
+            cursor = conn.cursor()
+            cursor.execute(queries.SELECT_EXPIRED_RESERVATIONS, (batch_size,))
+            expired = cursor.fetchall()
+            
+            released = defaultdict(int)
+            for _, product_id, quantity in expired:
+                released[product_id] += quantity
+            cursor.executemany(queries.RELEASE_STOCK,
+                               [(quantity, product_id) for product_id, quantity in released.items()])
+            cursor.executemany(queries.EXPIRE_RESERVATION, [(row[0],) for row in expired])
+            if expired:
+                self._mark_changed("products")
+            return len(expired)
+        
+        total = 0
+        try:
+            while True:
+                count = self.execute_transaction(_do_expire_reservations, batch_size)
+                total += count
+                if count < batch_size:
+                    break
+        except Exception as e:
+            print(f"Error in expire_reservations: {e}")
+        
+        if total:
+            self.add_log(None, "System", None, None, None, f"{total} stock reservations expired")
+        return total
+    
+    def create_test_orders(self) -> bool:
+        """Test için örnek siparişler oluştur - her müşteriye bir sipariş
+        
+        Placed through place_orders_bulk, so they reserve stock and hold
+        budget like any other order.
+        """
+        def _do_get_test_order_targets(conn: sqlite3.Connection) -> Tuple[List[tuple], List[tuple]]:
+            cursor = conn.cursor()
+            # Mevcut müşterileri ve stoktaki ürünleri al
+            cursor.execute(queries.SELECT_CUSTOMER_TYPES)
+            customers = cursor.fetchall()
+            cursor.execute(queries.SELECT_IN_STOCK_PRODUCT_IDS)
+            return customers, cursor.fetchall()
+        
+        try:
+            customers, products = self.execute_read(_do_get_test_order_targets)
+            if not customers or not products:
+                return False
+            results = self.place_orders_bulk([
+                (customer_id, products[i % len(products)][0], random.randint(1, 5))
+                for i, (customer_id, _) in enumerate(customers)
+            ])
+            return any(result["accepted"] for result in results)
         except Exception as e:
             print(f"Error in create_test_orders: {e}")
             return False
             
     def delete_product(self, product_id: int) -> bool:
-        """Ürünü sil"""
+        """Ürünü sil - refused while pending orders still reserve the product"""
         def _do_delete_product(conn: sqlite3.Connection, product_id: int) -> bool:
             try:
                 cursor = conn.cursor()
                 
                 # Önce ürünün var olduğunu kontrol et
-                cursor.execute("SELECT product_name FROM products WHERE product_id = ?", (product_id,))
+                cursor.execute(queries.SELECT_PRODUCT_NAME, (product_id,))
                 if not cursor.fetchone():
                     return False
                 
+                # Pending orders still reserve it: deleting would strand their reservations
+                cursor.execute(queries.SELECT_PRODUCT_ACTIVE_RESERVATION, (product_id,))
+                if cursor.fetchone():
+                    return False
+                
                 # Ürünü sil
-                cursor.execute("DELETE FROM products WHERE product_id = ?", (product_id,))
+                cursor.execute(queries.DELETE_PRODUCT, (product_id,))
+                self._mark_changed("products")
                 return True
                 
             except Exception as e:
@@ -857,16 +1313,13 @@ class DatabaseManager:
                 cursor = conn.cursor()
                 
                 # Önce ürünün var olduğunu kontrol et
-                cursor.execute("SELECT product_name FROM products WHERE product_id = ?", (product_id,))
+                cursor.execute(queries.SELECT_PRODUCT_NAME, (product_id,))
                 if not cursor.fetchone():
                     return False
                 
                 # Stok miktarını güncelle
-                cursor.execute('''
-                    UPDATE products 
-                    SET stock = ?, version = version + 1
-                    WHERE product_id = ?
-                ''', (new_stock, product_id))
+                cursor.execute(queries.SET_PRODUCT_STOCK, (new_stock, product_id))
+                self._mark_changed("products")
                 
                 return True
                 
@@ -887,16 +1340,13 @@ class DatabaseManager:
                 cursor = conn.cursor()
                 
                 # Önce ürünün var olduğunu kontrol et
-                cursor.execute("SELECT product_name FROM products WHERE product_id = ?", (product_id,))
+                cursor.execute(queries.SELECT_PRODUCT_NAME, (product_id,))
                 if not cursor.fetchone():
                     return False
                 
                 # Fiyatı güncelle
-                cursor.execute('''
-                    UPDATE products 
-                    SET price = ?, version = version + 1
-                    WHERE product_id = ?
-                ''', (new_price, product_id))
+                cursor.execute(queries.SET_PRODUCT_PRICE, (new_price, product_id))
+                self._mark_changed("products")
                 
                 return True
                 
@@ -916,19 +1366,7 @@ class DatabaseManager:
             try:
                 cursor = conn.cursor()
                 
-                cursor.execute('''
-                    SELECT 
-                        o.order_id,
-                        p.product_name,
-                        o.quantity,
-                        o.status,
-                        o.order_time,
-                        CAST((julianday('now') - julianday(o.order_time)) * 24 * 60 * 60 AS INTEGER) as wait_time
-                    FROM orders o
-                    JOIN products p ON o.product_id = p.product_id
-                    WHERE o.customer_id = ?
-                    ORDER BY o.order_time DESC
-                ''', (customer_id,))
+                cursor.execute(queries.SELECT_CUSTOMER_ORDERS, (customer_id,))
                 
                 orders = []
                 for row in cursor.fetchall():
@@ -948,7 +1386,7 @@ class DatabaseManager:
                 return []
         
         try:
-            return self.execute_transaction(_do_get_customer_orders, customer_id)
+            return self.execute_read(_do_get_customer_orders, customer_id)
         except Exception as e:
             print(f"Error in get_customer_orders: {e}")
             return []
@@ -960,10 +1398,8 @@ class DatabaseManager:
                 cursor = conn.cursor()
                 
                 # Ürünü ekle
-                cursor.execute('''
-                    INSERT INTO products (product_name, stock, price)
-                    VALUES (?, ?, ?)
-                ''', (product_name, stock, price))
+                cursor.execute(queries.INSERT_PRODUCT, (product_name, stock, price))
+                self._mark_changed("products")
                 
                 return True
                 
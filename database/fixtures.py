@@ -0,0 +1,111 @@
+import argparse
+import hashlib
+import random
+import sqlite3
+import time
+from typing import List, Optional, Tuple
+
+from database.profiles import PRAGMA_PROFILES
+
+# (product_name, stock, price)
+DEFAULT_PRODUCTS = [
+    ("Product1", 500, 100),
+    ("Product2", 10, 50),
+    ("Product3", 200, 45),
+    ("Product4", 75, 75),
+    ("Product5", 0, 500)
+]
+
+CUSTOMER_PASSWORD = "1234"
+
+
+def generate_customers(count: Optional[int] = None) -> List[Tuple[str, float, str]]:
+    """Random (customer_name, budget, customer_type) rows, at least 2 Premium"""
+    # Generate random number of customers (5-10)
+    if count is None:
+        count = random.randint(5, 10)
+    premium_count = min(count, random.randint(2, max(2, count - 1)))
+
+    customers = []
+    for i in range(count):
+        customer_type = "Premium" if i < premium_count else "Standard"
+        customers.append((f"customer{i+1}", round(random.uniform(500, 3000), 2), customer_type))
+    return customers
+
+
+def is_populated(cursor: sqlite3.Cursor) -> bool:
+    """True when products or customers already hold data (constant time)"""
+    cursor.execute('''
+        SELECT EXISTS (SELECT 1 FROM products) OR EXISTS (SELECT 1 FROM customers)
+    ''')
+    return bool(cursor.fetchone()[0])
+
+
+def clear(cursor: sqlite3.Cursor):
+    """Delete products, customers, customer accounts and every order
+
+    Orders, their lines, stock reservations and budget holds point at the
+    deleted products and customers, so they go too. Id sequences are not
+    reset: logs keep the old ids, the new rows must not reuse them.
+    """
+    cursor.execute("DELETE FROM budget_holds")
+    cursor.execute("DELETE FROM stock_reservations")
+    cursor.execute("DELETE FROM order_lines")
+    cursor.execute("DELETE FROM orders")
+    cursor.execute("DELETE FROM products")
+    cursor.execute("DELETE FROM customers")
+    cursor.execute("DELETE FROM users WHERE role = 'customer'")
+
+
+def seed(cursor: sqlite3.Cursor, customers: Optional[int] = None) -> Tuple[int, int]:
+    """Bulk insert the default products and random customers, returns the row counts"""
+    cursor.executemany(
+        "INSERT INTO products (product_name, stock, price) VALUES (?, ?, ?)",
+        DEFAULT_PRODUCTS
+    )
+
+    rows = generate_customers(customers)
+    hashed_password = hashlib.sha256(CUSTOMER_PASSWORD.encode()).hexdigest()
+    cursor.executemany(
+        "INSERT INTO users (username, password, role) VALUES (?, ?, 'customer')",
+        ((name, hashed_password) for name, _, _ in rows)
+    )
+    cursor.executemany('''
+        INSERT INTO customers (customer_name, budget, customer_type, username)
+        VALUES (?, ?, ?, ?)
+    ''', ((name, budget, customer_type, name) for name, budget, customer_type in rows))
+
+    return len(DEFAULT_PRODUCTS), len(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load demo products and customers")
+    parser.add_argument("--reset", action="store_true",
+                        help="delete existing products, customers and orders first")
+    parser.add_argument("--customers", type=int, default=None,
+                        help="number of customers to create (default: random 5-10)")
+    parser.add_argument("--profile", default="bulk-load", choices=sorted(PRAGMA_PROFILES),
+                        help="database PRAGMA profile used for the load (default: bulk-load)")
+    args = parser.parse_args()
+
+    from database.db_manager import DatabaseManager
+
+    # The command decides what gets seeded, not the startup check
+    DatabaseManager.SEED_EMPTY_DB = False
+    DatabaseManager.DB_PROFILE = args.profile
+    db_manager = DatabaseManager()
+
+    started = time.perf_counter()
+    result = db_manager.load_fixtures(reset=args.reset, customers=args.customers)
+    elapsed = time.perf_counter() - started
+    db_manager.log_writer.close()
+
+    if result is None:
+        print("Database already has products or customers, use --reset to replace them")
+        return
+    products, customers = result
+    print(f"Loaded {products} products and {customers} customers in {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
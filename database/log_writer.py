@@ -0,0 +1,119 @@
+import atexit
+import sqlite3
+import threading
+import time
+from collections import deque
+from typing import Iterable, List, Tuple
+
+from database import queries
+
+# (customer_id, log_type, customer_type, product, quantity, result_message, timestamp)
+LogRecord = Tuple
+
+
+def log_timestamp() -> str:
+    """Current UTC time in the same format as CURRENT_TIMESTAMP"""
+    return time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime())
+
+
+class LogWriter:
+    """Buffers log records in a bounded ring buffer and writes them in batches
+
+    A background thread flushes every `flush_interval` seconds or as soon as
+    `batch_size` records are waiting. When the buffer is full the oldest
+    records are dropped and counted in `dropped`.
+    """
+
+    def __init__(self, db_manager, flush_interval: float = 0.5, batch_size: int = 500,
+                 max_buffer: int = 50000):
+        self.db_manager = db_manager
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self._buffer = deque(maxlen=max_buffer)
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._closed = False
+
+        # Metrics
+        self.written = 0
+        self.dropped = 0
+        self.flushes = 0
+
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def append(self, record: LogRecord):
+        """Queue a single record"""
+        self.extend((record,))
+
+    def extend(self, records: Iterable[LogRecord]):
+        """Queue records, waking the flusher when a full batch is waiting"""
+        with self._cond:
+            for record in records:
+                if len(self._buffer) == self._buffer.maxlen:
+                    self.dropped += 1
+                self._buffer.append(record)
+            if len(self._buffer) >= self.batch_size:
+                self._cond.notify()
+
+    def pending_count(self) -> int:
+        return len(self._buffer)
+
+    def flush(self) -> int:
+        """Write everything buffered so far, returns the number of records written"""
+        total = 0
+        with self._flush_lock:
+            while True:
+                batch = self._take_batch()
+                if not batch:
+                    return total
+                if not self._write(batch):
+                    # Put the batch back in front and retry on the next flush. Records
+                    # queued meanwhile are newer: only the free room is refilled, the
+                    # oldest records of the batch are dropped like on any full buffer
+                    with self._cond:
+                        free = self._buffer.maxlen - len(self._buffer)
+                        requeued = batch[len(batch) - free:] if free < len(batch) else batch
+                        self.dropped += len(batch) - len(requeued)
+                        self._buffer.extendleft(reversed(requeued))
+                    return total
+                total += len(batch)
+
+    def close(self):
+        """Stop the flusher and write the remaining records"""
+        if self._closed:
+            return
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join(timeout=5.0)
+        self.flush()
+
+    def _take_batch(self) -> List[LogRecord]:
+        with self._cond:
+            count = min(self.batch_size, len(self._buffer))
+            return [self._buffer.popleft() for _ in range(count)]
+
+    def _write(self, batch: List[LogRecord]) -> bool:
+        def _do_write_logs(conn: sqlite3.Connection, batch: List[LogRecord]) -> int:
+            conn.executemany(queries.INSERT_LOG, batch)
+            return len(batch)
+
+        try:
+            self.written += self.db_manager.execute_transaction(_do_write_logs, batch)
+            self.flushes += 1
+            return True
+        except Exception as e:
+            print(f"Error writing {len(batch)} log records: {e}")
+            return False
+
+    def _run(self):
+        """Flush on interval or when a batch fills up"""
+        while True:
+            with self._cond:
+                if not self._closed and len(self._buffer) < self.batch_size:
+                    self._cond.wait(timeout=self.flush_interval)
+                if self._closed:
+                    return
+            self.flush()
@@ -0,0 +1,322 @@
+import hashlib
+import sqlite3
+from typing import Callable, List, Tuple
+
+# Tables whose writes are counted in table_versions (change feed)
+TRACKED_TABLES = ("products", "orders", "customers", "logs")
+
+
+def _initial_schema(cursor: sqlite3.Cursor):
+    """Users, customers, products, orders and logs tables"""
+    # IF NOT EXISTS: databases created before schema_version existed already have them
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT UNIQUE NOT NULL,
+            password TEXT NOT NULL,
+            role TEXT NOT NULL
+        )
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS customers (
+            customer_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            customer_name TEXT NOT NULL,
+            budget REAL NOT NULL,
+            customer_type TEXT NOT NULL,
+            total_spent REAL DEFAULT 0,
+            username TEXT UNIQUE,
+            FOREIGN KEY (username) REFERENCES users(username)
+        )
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS products (
+            product_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            product_name TEXT NOT NULL,
+            stock INTEGER NOT NULL,
+            price REAL NOT NULL,
+            version INTEGER DEFAULT 1
+        )
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS orders (
+            order_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            customer_id INTEGER NOT NULL,
+            product_id INTEGER NOT NULL,
+            quantity INTEGER NOT NULL,
+            order_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            status TEXT DEFAULT 'pending',
+            FOREIGN KEY (customer_id) REFERENCES customers(customer_id),
+            FOREIGN KEY (product_id) REFERENCES products(product_id)
+        )
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS logs (
+            log_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            customer_id INTEGER,
+            log_type TEXT NOT NULL,
+            customer_type TEXT,
+            product TEXT,
+            quantity INTEGER,
+            timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            result_message TEXT,
+            FOREIGN KEY (customer_id) REFERENCES customers(customer_id)
+        )
+    ''')
+
+
+def _admin_user(cursor: sqlite3.Cursor):
+    """Default admin account"""
+    cursor.execute("SELECT COUNT(*) FROM users WHERE username = 'admin'")
+    if cursor.fetchone()[0] == 0:
+        hashed_password = hashlib.sha256("admin123".encode()).hexdigest()
+        cursor.execute(
+            "INSERT INTO users (username, password, role) VALUES (?, ?, ?)",
+            ("admin", hashed_password, "admin")
+        )
+
+
+def _hot_query_indexes(cursor: sqlite3.Cursor):
+    """Secondary indexes for the hot order and log query shapes"""
+    # get_pending_orders / settlement: only pending rows are indexed
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_orders_pending "
+                   "ON orders (order_time) WHERE status = 'pending'")
+    # get_customer_orders: WHERE customer_id = ? ORDER BY order_time DESC
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_orders_customer_time "
+                   "ON orders (customer_id, order_time)")
+    # get_recent_logs: ORDER BY timestamp DESC LIMIT ?
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_logs_timestamp ON logs (timestamp)")
+
+
+def _change_feed(cursor: sqlite3.Cursor):
+    """Per-table version counters, bumped by triggers on every write (until migration 10)"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS table_versions (
+            table_name TEXT PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+
+    for table in TRACKED_TABLES:
+        cursor.execute(
+            "INSERT OR IGNORE INTO table_versions (table_name, version) VALUES (?, 0)",
+            (table,)
+        )
+        for operation in ("INSERT", "UPDATE", "DELETE"):
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS trg_{table}_{operation.lower()}_version
+                AFTER {operation} ON {table}
+                BEGIN
+                    UPDATE table_versions SET version = version + 1
+                    WHERE table_name = '{table}';
+                END
+            ''')
+
+
+def _order_lines(cursor: sqlite3.Cursor):
+    """Order lines: an order (basket) holds one or more products
+
+    orders.product_id / orders.quantity stay as a header summary: the first
+    line's product and the total quantity of all lines.
+    """
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS order_lines (
+            line_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            order_id INTEGER NOT NULL,
+            product_id INTEGER NOT NULL,
+            quantity INTEGER NOT NULL,
+            FOREIGN KEY (order_id) REFERENCES orders(order_id),
+            FOREIGN KEY (product_id) REFERENCES products(product_id)
+        )
+    ''')
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_order_lines_order ON order_lines (order_id)")
+
+    # Backfill: every existing order becomes a single-line basket
+    cursor.execute('''
+        INSERT INTO order_lines (order_id, product_id, quantity)
+        SELECT order_id, product_id, quantity FROM orders
+        WHERE order_id NOT IN (SELECT order_id FROM order_lines)
+    ''')
+
+
+def _add_column(cursor: sqlite3.Cursor, table: str, column: str, definition: str):
+    """ALTER TABLE ADD COLUMN unless the column already exists"""
+    cursor.execute(f"PRAGMA table_info({table})")
+    if column not in {row[1] for row in cursor.fetchall()}:
+        cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+
+def _stock_reservations(cursor: sqlite3.Cursor):
+    """Stock reserved at placement: products.reserved plus a per-order ledger"""
+    _add_column(cursor, "products", "reserved", "INTEGER NOT NULL DEFAULT 0")
+
+    # status: active -> captured (settled) | released (failed) | expired
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS stock_reservations (
+            reservation_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            order_id INTEGER NOT NULL,
+            product_id INTEGER NOT NULL,
+            quantity INTEGER NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            expires_at TIMESTAMP NOT NULL,
+            status TEXT NOT NULL DEFAULT 'active',
+            FOREIGN KEY (order_id) REFERENCES orders(order_id),
+            FOREIGN KEY (product_id) REFERENCES products(product_id)
+        )
+    ''')
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_reservations_order ON stock_reservations (order_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_reservations_active "
+                   "ON stock_reservations (expires_at) WHERE status = 'active'")
+
+    # Backfill: lines of pending orders are reserved for an hour
+    cursor.execute('''
+        INSERT INTO stock_reservations (order_id, product_id, quantity, expires_at)
+        SELECT ol.order_id, ol.product_id, SUM(ol.quantity), datetime('now', '+3600 seconds')
+        FROM order_lines ol
+        JOIN orders o ON ol.order_id = o.order_id
+        WHERE o.status = 'pending'
+          AND ol.order_id NOT IN (SELECT order_id FROM stock_reservations)
+        GROUP BY ol.order_id, ol.product_id
+    ''')
+    cursor.execute('''
+        UPDATE products SET reserved = (
+            SELECT COALESCE(SUM(quantity), 0) FROM stock_reservations r
+            WHERE r.product_id = products.product_id AND r.status = 'active'
+        )
+    ''')
+
+
+def _budget_holds(cursor: sqlite3.Cursor):
+    """Budget held at placement: customers.held plus a per-order ledger"""
+    _add_column(cursor, "customers", "held", "REAL NOT NULL DEFAULT 0")
+
+    # status: active -> captured (settled) | released (failed)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS budget_holds (
+            hold_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            order_id INTEGER NOT NULL,
+            customer_id INTEGER NOT NULL,
+            amount REAL NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            status TEXT NOT NULL DEFAULT 'active',
+            FOREIGN KEY (order_id) REFERENCES orders(order_id),
+            FOREIGN KEY (customer_id) REFERENCES customers(customer_id)
+        )
+    ''')
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_budget_holds_order ON budget_holds (order_id)")
+
+    # Backfill: pending orders hold their current cost
+    cursor.execute('''
+        INSERT INTO budget_holds (order_id, customer_id, amount)
+        SELECT o.order_id, o.customer_id, SUM(ol.quantity * p.price)
+        FROM orders o
+        JOIN order_lines ol ON ol.order_id = o.order_id
+        JOIN products p ON ol.product_id = p.product_id
+        WHERE o.status = 'pending'
+          AND o.order_id NOT IN (SELECT order_id FROM budget_holds)
+        GROUP BY o.order_id, o.customer_id
+    ''')
+    cursor.execute('''
+        UPDATE customers SET held = (
+            SELECT COALESCE(SUM(amount), 0) FROM budget_holds h
+            WHERE h.customer_id = customers.customer_id AND h.status = 'active'
+        )
+    ''')
+
+
+def _order_base_priority(cursor: sqlite3.Cursor):
+    """Stored time independent priority per order, indexed for top-K lookups"""
+    _add_column(cursor, "orders", "base_priority", "REAL NOT NULL DEFAULT 1.0")
+
+    # Backfill with the model in processing/priority.py at the time of writing:
+    # Premium 2x, Standard 1x, times (1 + quantity / 100)
+    cursor.execute('''
+        UPDATE orders SET base_priority = (
+            SELECT CASE WHEN c.customer_type = 'Premium' THEN 2.0 ELSE 1.0 END
+            FROM customers c WHERE c.customer_id = orders.customer_id
+        ) * (1.0 + quantity / 100.0)
+        WHERE EXISTS (SELECT 1 FROM customers c WHERE c.customer_id = orders.customer_id)
+    ''')
+
+    # Per base_priority, pending orders oldest first
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_orders_pending_priority "
+                   "ON orders (base_priority, order_time) WHERE status = 'pending'")
+
+
+def _drop_unused_pending_index(cursor: sqlite3.Cursor):
+    """idx_orders_pending: every pending orders query uses idx_orders_pending_priority"""
+    cursor.execute("DROP INDEX IF EXISTS idx_orders_pending")
+
+
+def _change_feed_per_transaction(cursor: sqlite3.Cursor):
+    """Drop the per-row version triggers
+
+    DatabaseManager bumps table_versions once per write transaction, and the
+    logs version is MAX(log_id), see queries.SELECT_TABLE_VERSIONS.
+    """
+    for table in TRACKED_TABLES:
+        for operation in ("insert", "update", "delete"):
+            cursor.execute(f"DROP TRIGGER IF EXISTS trg_{table}_{operation}_version")
+    cursor.execute("DELETE FROM table_versions WHERE table_name = 'logs'")
+
+
+# Ordered (version, description, migration) list; only ever append to it
+MIGRATIONS: List[Tuple[int, str, Callable[[sqlite3.Cursor], None]]] = [
+    (1, "initial schema", _initial_schema),
+    (2, "default admin user", _admin_user),
+    (3, "hot query indexes", _hot_query_indexes),
+    (4, "table version change feed", _change_feed),
+    (5, "order lines", _order_lines),
+    (6, "stock reservations", _stock_reservations),
+    (7, "budget holds", _budget_holds),
+    (8, "order base priority", _order_base_priority),
+    (9, "drop unused pending orders index", _drop_unused_pending_index),
+    (10, "change feed per transaction", _change_feed_per_transaction),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def get_schema_version(cursor: sqlite3.Cursor) -> int:
+    """Current schema version, 0 for a database without schema_version"""
+    try:
+        cursor.execute("SELECT MAX(version) FROM schema_version")
+        return cursor.fetchone()[0] or 0
+    except sqlite3.OperationalError:
+        return 0
+
+
+def run_migrations(conn: sqlite3.Connection) -> int:
+    """Apply pending migrations in order, returns the resulting schema version
+
+    Must run inside a write transaction; on an up-to-date database this is
+    a single SELECT.
+    """
+    cursor = conn.cursor()
+    current = get_schema_version(cursor)
+    if current >= LATEST_VERSION:
+        return current
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            description TEXT NOT NULL,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    for version, description, migration in MIGRATIONS:
+        if version <= current:
+            continue
+        print(f"Applying migration {version}: {description}")
+        migration(cursor)
+        cursor.execute(
+            "INSERT INTO schema_version (version, description) VALUES (?, ?)",
+            (version, description)
+        )
+        current = version
+
+    return current
@@ -0,0 +1,45 @@
+import sqlite3
+from typing import Dict
+
+# Per-connection PRAGMA settings, applied to every pooled connection.
+# cache_size < 0 is in KiB, mmap_size is in bytes.
+PRAGMA_PROFILES: Dict[str, Dict[str, object]] = {
+    # fsync on every commit: survives power loss
+    "durable": {
+        "synchronous": "FULL",
+        "cache_size": -8000,
+        "mmap_size": 0,
+        "temp_store": "DEFAULT",
+        "wal_autocheckpoint": 1000,
+    },
+    # WAL + NORMAL: no corruption, the last commits may be lost on power loss
+    "balanced": {
+        "synchronous": "NORMAL",
+        "cache_size": -32000,
+        "mmap_size": 256 * 1024 * 1024,
+        "temp_store": "MEMORY",
+        "wal_autocheckpoint": 1000,
+    },
+    # Fixture loads and batch imports only: no fsync, rare checkpoints
+    "bulk-load": {
+        "synchronous": "OFF",
+        "cache_size": -128000,
+        "mmap_size": 1024 * 1024 * 1024,
+        "temp_store": "MEMORY",
+        "wal_autocheckpoint": 10000,
+    },
+}
+
+# Deployments opt into a faster profile with OMS_DB_PROFILE
+DEFAULT_PROFILE = "durable"
+
+
+def apply_profile(conn: sqlite3.Connection, profile: str):
+    """Apply a named PRAGMA profile to a connection"""
+    try:
+        settings = PRAGMA_PROFILES[profile]
+    except KeyError:
+        raise ValueError(f"Unknown database profile '{profile}', "
+                         f"expected one of {', '.join(PRAGMA_PROFILES)}")
+    for pragma, value in settings.items():
+        conn.execute(f"PRAGMA {pragma} = {value}")
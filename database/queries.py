@@ -0,0 +1,343 @@
+# Named SQL statements used by DatabaseManager.
+# The text of every statement is fixed, so sqlite3's per-connection statement
+# cache parses each one once per connection. Variable-length id lists are
+# passed as a single JSON array and expanded with json_each.
+
+from processing import priority
+
+# Users
+SELECT_USER_CREDENTIALS = "SELECT password, role FROM users WHERE username = ?"
+
+# Change feed: logs are append-only, their version is the newest log_id
+SELECT_TABLE_VERSIONS = '''
+    SELECT table_name, version FROM table_versions
+    UNION ALL
+    SELECT 'logs', COALESCE(MAX(log_id), 0) FROM logs
+'''
+
+BUMP_TABLE_VERSIONS = '''
+    UPDATE table_versions SET version = version + 1
+    WHERE table_name IN (SELECT value FROM json_each(?))
+'''
+
+# Customers
+SELECT_CUSTOMER_BY_USERNAME = '''
+    SELECT customer_id, customer_name, budget, customer_type, total_spent, held
+    FROM customers
+    WHERE username = ?
+'''
+
+SELECT_ALL_CUSTOMERS = '''
+    SELECT customer_id, customer_name, budget, customer_type, total_spent, username, held
+    FROM customers
+    ORDER BY customer_id
+'''
+
+# Available budget: what is not held by pending orders
+SELECT_CUSTOMER_BUDGET = "SELECT budget - held, customer_type FROM customers WHERE customer_id = ?"
+
+SELECT_CUSTOMER_TYPES = "SELECT customer_id, customer_type FROM customers"
+
+SELECT_CUSTOMER_BUDGETS_AND_TYPES_IN = '''
+    SELECT customer_id, budget - held, customer_type FROM customers
+    WHERE customer_id IN (SELECT value FROM json_each(?))
+'''
+
+SELECT_CUSTOMER_BUDGETS_IN = '''
+    SELECT customer_id, budget, held FROM customers
+    WHERE customer_id IN (SELECT value FROM json_each(?))
+'''
+
+HOLD_BUDGET = '''
+    UPDATE customers SET held = held + ?
+    WHERE customer_id = ? AND budget - held >= ?
+'''
+
+RELEASE_BUDGET = "UPDATE customers SET held = held - ? WHERE customer_id = ?"
+
+# Debit `amount`, `held` of it was held by the settled orders
+CAPTURE_BUDGET = '''
+    UPDATE customers
+    SET budget = budget - ?,
+        held = held - ?,
+        total_spent = total_spent + ?
+    WHERE customer_id = ?
+'''
+
+# Never eats into budget held by the customer's other orders
+CAPTURE_BUDGET_IF_FUNDED = '''
+    UPDATE customers
+    SET budget = budget - ?,
+        held = held - ?,
+        total_spent = total_spent + ?
+    WHERE customer_id = ? AND budget >= ? AND budget - held >= ?
+'''
+
+# Products
+SELECT_ALL_PRODUCTS = '''
+    SELECT product_id, product_name, stock, price, reserved
+    FROM products
+    ORDER BY product_id
+'''
+
+SELECT_PRODUCT_NAME = "SELECT product_name FROM products WHERE product_id = ?"
+
+SELECT_IN_STOCK_PRODUCT_IDS = "SELECT product_id FROM products WHERE stock > 0"
+
+SELECT_PRODUCTS_FOR_ORDER_IN = '''
+    SELECT product_id, product_name, stock - reserved, price FROM products
+    WHERE product_id IN (SELECT value FROM json_each(?))
+'''
+
+INSERT_PRODUCT = "INSERT INTO products (product_name, stock, price) VALUES (?, ?, ?)"
+
+DELETE_PRODUCT = "DELETE FROM products WHERE product_id = ?"
+
+# Stock of a product still reserved by pending orders (partial index on active reservations)
+SELECT_PRODUCT_ACTIVE_RESERVATION = '''
+    SELECT 1 FROM stock_reservations
+    WHERE status = 'active' AND product_id = ?
+    LIMIT 1
+'''
+
+SET_PRODUCT_STOCK = "UPDATE products SET stock = ?, version = version + 1 WHERE product_id = ?"
+
+SET_PRODUCT_PRICE = "UPDATE products SET price = ?, version = version + 1 WHERE product_id = ?"
+
+# Reservations do not bump version: placing orders must not conflict with settlement
+RESERVE_STOCK = '''
+    UPDATE products SET reserved = reserved + ?
+    WHERE product_id = ? AND stock - reserved >= ?
+'''
+
+RELEASE_STOCK = "UPDATE products SET reserved = reserved - ? WHERE product_id = ?"
+
+# Take `quantity` out of stock, `reserved` of it was reserved by the order
+CAPTURE_STOCK = '''
+    UPDATE products
+    SET stock = stock - ?, reserved = reserved - ?, version = version + 1
+    WHERE product_id = ?
+'''
+
+# Optimistic locking: only applies if nobody changed the product since it was read,
+# and never eats into stock reserved by other orders. Free stock is never negative:
+# when stock was cut below the reservations, an order may still use its own
+CAPTURE_STOCK_IF_VERSION = '''
+    UPDATE products
+    SET stock = stock - ?, reserved = reserved - ?, version = version + 1
+    WHERE product_id = ? AND version = ? AND stock >= ? AND MAX(stock - reserved, 0) >= ?
+'''
+
+# Orders
+INSERT_ORDER = '''
+    INSERT INTO orders (customer_id, product_id, quantity, base_priority, status)
+    VALUES (?, ?, ?, ?, 'pending')
+'''
+
+SELECT_LAST_INSERT_ID = "SELECT last_insert_rowid()"
+
+SET_ORDER_STATUS = "UPDATE orders SET status = ? WHERE order_id = ?"
+
+# Settles an order only once: no rows if it is not pending anymore
+SET_PENDING_ORDER_STATUS = "UPDATE orders SET status = ? WHERE order_id = ? AND status = 'pending'"
+
+INSERT_ORDER_LINE = "INSERT INTO order_lines (order_id, product_id, quantity) VALUES (?, ?, ?)"
+
+# Priority scores come from processing/priority.py, see SQL_PRIORITY_SCORE
+SELECT_PENDING_ORDERS = f'''
+    SELECT o.order_id, o.customer_id, c.customer_type, o.product_id,
+           (SELECT group_concat(p.product_name, ', ')
+            FROM order_lines ol JOIN products p ON ol.product_id = p.product_id
+            WHERE ol.order_id = o.order_id) as product_name,
+           o.quantity, o.order_time,
+           {priority.SQL_WAIT_TIME} as wait_time,
+           {priority.SQL_PRIORITY_SCORE} as priority
+    FROM orders o
+    JOIN customers c ON o.customer_id = c.customer_id
+    WHERE o.status = 'pending'
+'''
+
+SELECT_PENDING_ORDERS_BY_PRIORITY = SELECT_PENDING_ORDERS + "ORDER BY priority DESC, o.order_id"
+
+SELECT_PENDING_ORDER_HEADER = '''
+    SELECT o.customer_id, c.customer_type, c.budget, c.held
+    FROM orders o
+    JOIN customers c ON o.customer_id = c.customer_id
+    WHERE o.order_id = ? AND o.status = 'pending'
+'''
+
+# LEFT JOIN: a line whose product was deleted still shows up, with NULL product
+# columns and product_missing = 1, so the order fails instead of settling without it
+_SELECT_ORDER_LINES = '''
+    SELECT ol.order_id, ol.product_id, COALESCE(p.product_name, 'Product ' || ol.product_id),
+           ol.quantity, p.price, p.stock, p.version, p.reserved, p.product_id IS NULL AS product_missing
+    FROM order_lines ol
+    LEFT JOIN products p ON ol.product_id = p.product_id
+'''
+
+SELECT_ORDER_LINES = _SELECT_ORDER_LINES + "WHERE ol.order_id = ? ORDER BY ol.line_id"
+
+SELECT_ORDER_LINES_IN = _SELECT_ORDER_LINES + '''
+    WHERE ol.order_id IN (SELECT value FROM json_each(?))
+    ORDER BY ol.order_id, ol.line_id
+'''
+
+# Stock reservations
+INSERT_RESERVATION = '''
+    INSERT INTO stock_reservations (order_id, product_id, quantity, expires_at)
+    VALUES (?, ?, ?, datetime('now', '+' || ? || ' seconds'))
+'''
+
+SELECT_ACTIVE_RESERVATIONS = '''
+    SELECT product_id, quantity FROM stock_reservations
+    WHERE order_id = ? AND status = 'active'
+'''
+
+SELECT_ACTIVE_RESERVATIONS_IN = '''
+    SELECT order_id, product_id, quantity FROM stock_reservations
+    WHERE order_id IN (SELECT value FROM json_each(?)) AND status = 'active'
+'''
+
+SELECT_EXPIRED_RESERVATIONS = '''
+    SELECT reservation_id, product_id, quantity FROM stock_reservations
+    WHERE status = 'active' AND expires_at <= datetime('now')
+    LIMIT ?
+'''
+
+# status: 'captured' (settled) or 'released' (failed)
+CLOSE_RESERVATIONS = '''
+    UPDATE stock_reservations SET status = ?
+    WHERE order_id = ? AND status = 'active'
+'''
+
+EXPIRE_RESERVATION = "UPDATE stock_reservations SET status = 'expired' WHERE reservation_id = ?"
+
+# Budget holds
+INSERT_BUDGET_HOLD = "INSERT INTO budget_holds (order_id, customer_id, amount) VALUES (?, ?, ?)"
+
+SELECT_ACTIVE_HOLDS_IN = '''
+    SELECT order_id, customer_id, amount FROM budget_holds
+    WHERE order_id IN (SELECT value FROM json_each(?)) AND status = 'active'
+'''
+
+# status: 'captured' (settled) or 'released' (failed)
+CLOSE_BUDGET_HOLDS = '''
+    UPDATE budget_holds SET status = ?
+    WHERE order_id = ? AND status = 'active'
+'''
+
+SELECT_PRIORITIZED_PENDING_ORDER_IDS = f'''
+    SELECT o.order_id
+    FROM orders o
+    WHERE o.status = 'pending'
+    ORDER BY {priority.SQL_PRIORITY_SCORE} DESC, o.order_id
+'''
+
+# Every order ever placed, for replays in processing/simulation.py
+SELECT_ORDER_STREAM = '''
+    SELECT o.order_id, o.customer_id, c.customer_type, o.quantity,
+           (julianday(o.order_time) - 2440587.5) * 86400.0 as placed_at
+    FROM orders o
+    JOIN customers c ON o.customer_id = c.customer_id
+    ORDER BY o.order_time, o.order_id
+'''
+
+# Numeric columns for processing/batch_scoring.py
+SELECT_PENDING_ORDER_SCORING_ROWS = f'''
+    SELECT o.order_id, c.customer_type = 'Premium', {priority.SQL_WAIT_TIME}, o.quantity
+    FROM orders o
+    JOIN customers c ON o.customer_id = c.customer_id
+    WHERE o.status = 'pending'
+'''
+
+# Incremental feed for processing/scheduler.py and policies.py, by order id.
+# Parameters: last order id, limit
+SELECT_PENDING_ORDERS_AFTER = f'''
+    SELECT o.order_id, o.customer_id, c.customer_type, o.quantity, o.base_priority,
+           {priority.SQL_WAIT_TIME}
+    FROM orders o
+    JOIN customers c ON o.customer_id = c.customer_id
+    WHERE o.order_id > ? AND o.status = 'pending'
+    ORDER BY o.order_id
+    LIMIT ?
+'''
+
+# Top-K by score without sorting every pending order: within one base_priority
+# the oldest orders score highest, so the K oldest of each distinct base (an
+# index range scan on idx_orders_pending_priority) contain the global top K.
+# Parameters: K, K
+SELECT_TOP_PENDING_ORDER_IDS = f'''
+    SELECT o.order_id
+    FROM (SELECT DISTINCT base_priority FROM orders WHERE status = 'pending') b
+    JOIN orders o ON o.order_id IN (
+        SELECT order_id FROM orders
+        WHERE status = 'pending' AND base_priority = b.base_priority
+        ORDER BY order_time, order_id
+        LIMIT ?
+    )
+    ORDER BY {priority.SQL_PRIORITY_SCORE} DESC, o.order_id
+    LIMIT ?
+'''
+
+# Products of every pending order, for settlement lanes
+SELECT_PENDING_ORDER_PRODUCTS = '''
+    SELECT o.order_id, o.customer_id, ol.product_id
+    FROM orders o
+    JOIN order_lines ol ON ol.order_id = o.order_id
+    WHERE o.status = 'pending'
+'''
+
+SELECT_PENDING_ORDERS_IN = '''
+    SELECT o.order_id, o.customer_id, c.customer_type
+    FROM orders o
+    JOIN customers c ON o.customer_id = c.customer_id
+    WHERE o.order_id IN (SELECT value FROM json_each(?)) AND o.status = 'pending'
+'''
+
+SELECT_CUSTOMER_ORDERS = '''
+    SELECT
+        o.order_id,
+        (SELECT group_concat(p.product_name, ', ')
+         FROM order_lines ol JOIN products p ON ol.product_id = p.product_id
+         WHERE ol.order_id = o.order_id) as product_name,
+        o.quantity,
+        o.status,
+        o.order_time,
+        CAST((julianday('now') - julianday(o.order_time)) * 24 * 60 * 60 AS INTEGER) as wait_time
+    FROM orders o
+    WHERE o.customer_id = ?
+    ORDER BY o.order_time DESC
+'''
+
+# Logs
+INSERT_LOG = '''
+    INSERT INTO logs (customer_id, log_type, customer_type, product,
+                      quantity, result_message, timestamp)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+'''
+
+_SELECT_LOGS = '''
+    SELECT l.log_id, l.customer_id, c.customer_name, l.log_type,
+           l.customer_type, l.product, l.quantity, l.timestamp,
+           l.result_message
+    FROM logs l
+    LEFT JOIN customers c ON l.customer_id = c.customer_id
+'''
+
+SELECT_RECENT_LOGS = _SELECT_LOGS + "ORDER BY l.timestamp DESC LIMIT ?"
+
+# Keyset pages on log_id, no OFFSET
+SELECT_LOGS_HEAD = _SELECT_LOGS + "ORDER BY l.log_id DESC LIMIT ?"
+
+SELECT_LOGS_BEFORE = _SELECT_LOGS + "WHERE l.log_id < ? ORDER BY l.log_id DESC LIMIT ?"
+
+SELECT_LOGS_AFTER = _SELECT_LOGS + "WHERE l.log_id > ? ORDER BY l.log_id ASC LIMIT ?"
+
+# Registry of every named statement above
+STATEMENTS = {
+    name: sql for name, sql in dict(globals()).items()
+    if name.isupper() and isinstance(sql, str)
+}
+
+# Room for every named statement plus the ad-hoc ones (migrations, fixtures)
+STATEMENT_CACHE_SIZE = max(128, 2 * len(STATEMENTS))
@@ -0,0 +1,124 @@
+import random
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from typing import Dict, Iterable, Tuple, Type
+
+
+class RetryPolicy:
+    """Bounded exponential backoff with full jitter
+
+    Attempt n (1-based) waits a random time in [0, min(max_delay, base_delay * 2^(n-1))],
+    so concurrent losers of the same conflict do not retry in lockstep.
+    """
+
+    def __init__(self, max_attempts: int = 5, base_delay: float = 0.005,
+                 max_delay: float = 0.2, retry_on: Tuple[Type[BaseException], ...] = ()):
+        if max_attempts < 1:
+            raise ValueError(f"Invalid max_attempts: {max_attempts}")
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retry_on = retry_on
+
+    def is_retryable(self, error: BaseException) -> bool:
+        """Only the retry_on errors (conflicts) are worth another attempt
+        
+        Busy/locked database errors are not: the connection's busy_timeout
+        already waited for the lock, retrying would multiply that wait.
+        """
+        return isinstance(error, self.retry_on)
+
+    def delay(self, attempt: int) -> float:
+        """Backoff before the attempt following `attempt`"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** (attempt - 1))))
+
+
+class _ProductContention:
+    def __init__(self):
+        self.conflicts = 0
+        self.retries = 0
+        self.exhausted = 0
+        self.serialized = 0
+        self.recent = deque()  # monotonic times of recent conflicts
+
+
+class ContentionTracker:
+    """Per-product conflict counters and serialized lanes for hot products
+
+    A product is hot while it had at least `hot_threshold` conflicts in the
+    last `window` seconds. Work on hot products can run inside lane(), which
+    holds one lock per product (taken in product_id order, so lanes never
+    deadlock) and thereby serializes conflicting settlements in this process.
+    """
+
+    def __init__(self, hot_threshold: int = 3, window: float = 10.0):
+        self.hot_threshold = hot_threshold
+        self.window = window
+        self._lock = threading.Lock()
+        self._products: Dict[int, _ProductContention] = defaultdict(_ProductContention)
+        self._lanes: Dict[int, threading.Lock] = defaultdict(threading.Lock)
+
+    def _trim(self, entry: _ProductContention, now: float):
+        while entry.recent and now - entry.recent[0] > self.window:
+            entry.recent.popleft()
+
+    def record_conflict(self, product_ids: Iterable[int], retrying: bool):
+        now = time.monotonic()
+        with self._lock:
+            for product_id in product_ids:
+                entry = self._products[product_id]
+                entry.conflicts += 1
+                entry.recent.append(now)
+                self._trim(entry, now)
+                if retrying:
+                    entry.retries += 1
+                else:
+                    entry.exhausted += 1
+
+    def is_hot(self, product_ids: Iterable[int]) -> bool:
+        """True if any of the products is hot"""
+        now = time.monotonic()
+        with self._lock:
+            for product_id in product_ids:
+                entry = self._products.get(product_id)
+                if entry is None:
+                    continue
+                self._trim(entry, now)
+                if len(entry.recent) >= self.hot_threshold:
+                    return True
+        return False
+
+    @contextmanager
+    def lane(self, product_ids: Iterable[int]):
+        """Run the block while holding the lanes of all products"""
+        product_ids = sorted(set(product_ids))
+        with self._lock:
+            locks = [self._lanes[product_id] for product_id in product_ids]
+            for product_id in product_ids:
+                self._products[product_id].serialized += 1
+        for lock in locks:
+            lock.acquire()
+        try:
+            yield
+        finally:
+            for lock in reversed(locks):
+                lock.release()
+
+    def get_stats(self) -> Dict[int, Dict]:
+        """product_id -> counters, hottest products first"""
+        now = time.monotonic()
+        with self._lock:
+            stats = {}
+            for product_id, entry in self._products.items():
+                self._trim(entry, now)
+                stats[product_id] = {
+                    "conflicts": entry.conflicts,
+                    "retries": entry.retries,
+                    "exhausted": entry.exhausted,
+                    "serialized": entry.serialized,
+                    "recent_conflicts": len(entry.recent),
+                    "hot": len(entry.recent) >= self.hot_threshold,
+                }
+        return dict(sorted(stats.items(), key=lambda item: -item[1]["recent_conflicts"]))
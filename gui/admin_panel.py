@@ -2,9 +2,12 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 from auth.auth_manager import AuthManager
 from database.db_manager import DatabaseManager
-import threading
-from queue import PriorityQueue
-from threading import Lock, Semaphore
+from processing.worker_pool import WorkerPool
+from processing.lanes import LaneScheduler
+from gui.tree_sync import TreeviewSync
+from gui.background_fetch import BackgroundFetcher
+from gui.log_view import VirtualLogView
+import os
 import time
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
@@ -16,11 +19,9 @@ class AdminPanel:
         self.root = root
         
         # Thread management
-        self.order_threads = {}
-        self.order_queue = PriorityQueue()
-        self.processing_lock = Lock()
         self.max_concurrent_orders = 8
-        self.order_semaphore = Semaphore(self.max_concurrent_orders)
+        self.order_pool = WorkerPool(max_workers=self.max_concurrent_orders,
+                                     max_queue_size=1000, name="order-worker")
         self.is_processing = False
         
         # Create main window
@@ -40,6 +41,11 @@ class AdminPanel:
         self._last_refresh_time = 0
         self._refresh_interval = 5000  # 5 seconds
         
+        # Change feed: last seen table versions
+        self._table_versions = {}
+        self._last_order_refresh = 0.0
+        self._order_list_max_age = 30.0  # seconds
+        
         # Reference keeping
         self._root_bindings = []
         self._window_bindings = []
@@ -56,12 +62,32 @@ class AdminPanel:
         self.auth_manager = auth_manager
         self.db_manager = DatabaseManager()
         
+        # Parallel settlement lanes are opt-in: SQLite has a single writer, so lanes only
+        # add a conflict-key read per run and settle slower than one chunked settlement.
+        # They share the order pool; one worker runs the scheduler itself.
+        self.settlement_lanes = min(int(os.environ.get("OMS_SETTLEMENT_LANES", 1)),
+                                    self.max_concurrent_orders - 1)
+        self.lane_scheduler = None
+        if self.settlement_lanes > 1:
+            self.lane_scheduler = LaneScheduler(self.db_manager, self.order_pool,
+                                                max_lanes=self.settlement_lanes)
+        
+        # Database queries run on background workers, never on the Tk loop
+        self.fetcher = BackgroundFetcher(self.window)
+        
         # Initialize UI elements as None
         self.order_tree = None
         self.log_tree = None
         self.customer_tree = None
         self.product_tree = None
         
+        # Incremental (keyed) tree updaters
+        self.order_tree_sync = None
+        self.customer_tree_sync = None
+        self.product_tree_sync = None
+        self.log_view = None
+        self._render_stock_graph = None
+        
         # Kritik stok seviyesi
         self.critical_stock_level = 10
         
@@ -169,13 +195,14 @@ class AdminPanel:
                 self.window.after_cancel(self._initial_timer)
                 self._initial_timer = None
             
-            # Stop order processing
-            self.is_processing = False
+            # Stop background queries
+            if self.fetcher:
+                self.fetcher.close()
             
-            # Wait for threads to complete
-            for thread in list(self.order_threads.values()):
-                if thread.is_alive():
-                    thread.join(timeout=1.0)
+            # Stop order processing, drop queued jobs and let running ones finish
+            self.is_processing = False
+            if self.order_pool:
+                self.order_pool.shutdown(wait=True, cancel_pending=True, timeout=1.0)
             
             # Clear all bindings
             if hasattr(self, 'canvas') and self.canvas:
@@ -194,10 +221,9 @@ class AdminPanel:
                     pass
             
             # Clear references
-            self.order_threads.clear()
-            self.order_queue = None
-            self.processing_lock = None
-            self.order_semaphore = None
+            self.order_pool = None
+            self.lane_scheduler = None
+            self.fetcher = None
             
             if hasattr(self, 'stock_canvas'):
                 try:
@@ -229,6 +255,10 @@ class AdminPanel:
             self.log_tree = None
             self.customer_tree = None
             self.product_tree = None
+            self.order_tree_sync = None
+            self.log_view = None
+            self.customer_tree_sync = None
+            self.product_tree_sync = None
             
             # Reset flags
             self._refresh_enabled = False
@@ -253,25 +283,44 @@ class AdminPanel:
             self._is_closing = True
     
     def _refresh_all(self):
-        """Refresh all data"""
-        if not self._is_closing and self.window.winfo_exists():
-            try:
-                # Only refresh if trees are initialized
-                if self.order_tree:
-                    self.refresh_order_list()
-                if self.log_tree:
-                    self.refresh_logs()
-                if self.customer_tree:
-                    self.refresh_customer_list()
-                if self.product_tree:
-                    self.refresh_product_list()
-                
-                self.window.update_idletasks()
-            except Exception as e:
-                print(f"Error refreshing data: {e}")
-                if self._refresh_timer:
-                    self.window.after_cancel(self._refresh_timer)
-                    self._refresh_timer = None
+        """Refresh the data whose tables changed since the last refresh"""
+        if not self._is_closing and self.window.winfo_exists() and self.fetcher:
+            # Ucuz sürüm kontrolü; sadece değişen tablolar yeniden çekilir
+            self.fetcher.fetch("changes", self.db_manager.get_changes_since,
+                               self._refresh_changed, dict(self._table_versions))
+    
+    def _refresh_changed(self, changes):
+        """Refresh the views that depend on the changed tables"""
+        if self._is_closing or not self.window.winfo_exists():
+            return
+        try:
+            # No known versions on the first cycle: every table counts as changed, so
+            # the order list gets its first load and writes made during setup are not missed
+            self._table_versions.update(changes)
+            
+            # Wait time and priority columns age even without writes
+            order_list_stale = (time.monotonic() - self._last_order_refresh
+                                >= self._order_list_max_age)
+            
+            # Only refresh if trees are initialized
+            if order_list_stale and self.order_pool and not self.is_processing:
+                # Stale reservations give their stock back
+                self.order_pool.submit(self.db_manager.expire_reservations, block=False)
+            if self.order_tree and (order_list_stale or changes.keys() & {"orders", "customers", "products"}):
+                self.refresh_order_list()
+            if self.log_tree and changes.keys() & {"logs", "customers"}:
+                self.refresh_logs()
+            if self.customer_tree and "customers" in changes:
+                self.refresh_customer_list()
+            if self.product_tree and "products" in changes:
+                self.refresh_product_list()
+            
+            self.window.update_idletasks()
+        except Exception as e:
+            print(f"Error refreshing data: {e}")
+            if self._refresh_timer:
+                self.window.after_cancel(self._refresh_timer)
+                self._refresh_timer = None
     
     def _safe_handle_focus_in(self, event=None):
         """Safely handle focus in event"""
@@ -471,6 +520,7 @@ class AdminPanel:
         columns = ("ID", "Name", "Budget", "Type", "Total Spent", "Username")
         self.customer_tree = ttk.Treeview(list_frame, columns=columns, show="headings", 
                                         style="Tree.Row", height=15)
+        self.customer_tree_sync = TreeviewSync(self.customer_tree)
         
         # Set column headings with custom style
         for col in columns:
@@ -549,6 +599,7 @@ class AdminPanel:
         columns = ("ID", "Name", "Stock", "Price (TL)")
         self.product_tree = ttk.Treeview(list_frame, columns=columns, show="headings",
                                        style="Treeview", height=20, selectmode="browse")
+        self.product_tree_sync = TreeviewSync(self.product_tree)
         
         # Set column headings with custom style
         for col in columns:
@@ -602,7 +653,7 @@ class AdminPanel:
                         messagebox.showinfo("Success", f"{product_name} has been deleted successfully!")
                         self.refresh_product_list()
                     else:
-                        messagebox.showerror("Error", "Failed to delete product!")
+                        messagebox.showerror("Error", "Failed to delete product! Pending orders may still reserve it.")
             except Exception as e:
                 print(f"Error in delete_selected_product: {e}")
                 messagebox.showerror("Error", "An error occurred while deleting the product")
@@ -758,9 +809,8 @@ class AdminPanel:
         self.stock_canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
         
         # Update graph when refreshing product list
-        def update_stock_graph():
+        def update_stock_graph(products):
             self.stock_ax.clear()
-            products = self.db_manager.get_all_products()
             
             names = [p["product_name"] for p in products]
             stocks = [p["stock"] for p in products]
@@ -795,15 +845,8 @@ class AdminPanel:
             # Canvas'ı güncelle
             self.stock_canvas.draw()
         
-        # Orijinal refresh_product_list fonksiyonunu güncelle
-        original_refresh = self.refresh_product_list
-        def new_refresh():
-            original_refresh()
-            update_stock_graph()
-        self.refresh_product_list = new_refresh
-        
-        # İlk grafiği çiz
-        update_stock_graph()
+        # Ürün listesi her çizildiğinde grafiği de güncelle
+        self._render_stock_graph = update_stock_graph
         
         # Add alternating row colors
         self.product_tree.tag_configure('oddrow', background='#f0f0f0')
@@ -828,12 +871,8 @@ class AdminPanel:
                 return
                 
             order_id = self.order_tree.item(selected[0])['values'][0]
-            thread = threading.Thread(
-                target=self.process_order_thread,
-                args=(order_id, 0)  # Tek sipariş için öncelik önemsiz
-            )
-            self.order_threads[order_id] = thread
-            thread.start()
+            if not self.order_pool.submit(self.process_order_thread, order_id, timeout=1.0):
+                messagebox.showwarning("Warning", "Order queue is full, please try again")
 
         def process_all_orders():
             if self.is_processing:
@@ -841,16 +880,32 @@ class AdminPanel:
                 return
                 
             self.is_processing = True
-            processing_thread = threading.Thread(target=self.start_order_processing)
-            processing_thread.start()
+            if not self.order_pool.submit(self.start_order_processing, timeout=1.0):
+                self.is_processing = False
+                messagebox.showwarning("Warning", "Order queue is full, please try again")
+
+        def stop_processing():
+            if not self.is_processing:
+                return
+            
+            # Çalışan settlement bir sonraki chunk'ta durur, kuyruktaki işler atılır
+            self.is_processing = False
+            dropped = self.order_pool.cancel_pending()
+            print(f"Order processing cancelled, {dropped} queued jobs dropped")
 
         # Buttons
         ttk.Button(button_frame, text="Process Selected", command=process_selected_order).pack(side=tk.LEFT, padx=5)
         ttk.Button(button_frame, text="Process All Orders", command=process_all_orders).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="Stop Processing", command=stop_processing).pack(side=tk.LEFT, padx=5)
+        
+        # Worker pool durumu
+        self.worker_stats_label = ttk.Label(button_frame, text="")
+        self.worker_stats_label.pack(side=tk.LEFT, padx=15)
         
         # Create Treeview for orders
         columns = ("Order ID", "Customer", "Type", "Product", "Quantity", "Priority", "Order Time", "Wait Time")
         self.order_tree = ttk.Treeview(parent_frame, columns=columns, show="headings", height=15)
+        self.order_tree_sync = TreeviewSync(self.order_tree)
         
         # Configure columns and headings
         column_widths = {
@@ -901,85 +956,33 @@ class AdminPanel:
         scrollbar.grid(row=2, column=1, sticky="ns", pady=10)
         self.order_tree.configure(yscrollcommand=scrollbar.set)
     
-    def process_order_thread(self, order_id, priority_score):
-        """Her bir siparişi ayrı bir thread'de işle"""
+    def process_order_thread(self, order_id):
+        """Tek bir siparişi worker pool içinde işle
+        
+        The outcome is reported through the logs table and the worker stats.
+        """
         try:
-            with self.order_semaphore:  # En fazla 8 eş zamanlı işlem
-                print(f"Processing order {order_id} with priority {-priority_score:.2f}")
-                
-                # Sadece process_order işlemi için mutex kullan
-                with self.processing_lock:
-                    if not self.is_processing:
-                        return
-                    success = self.db_manager.process_order(order_id)
-                
-                if success:
-                    print(f"Successfully processed order {order_id}")
-                    self.window.after(0, lambda: self.refresh_order_list())
-                    self.window.after(0, lambda: self.refresh_logs())
-                else:
-                    print(f"Failed to process order {order_id}")
+            # Kilit yok: process_order kendi transaction'ında çalışır, çakışmada tekrar dener
+            if self.db_manager.process_order(order_id):
+                self.window.after(0, lambda: self.refresh_order_list())
+                self.window.after(0, lambda: self.refresh_logs())
         except Exception as e:
             print(f"Error in process_order_thread: {e}")
-        finally:
-            if order_id in self.order_threads:
-                del self.order_threads[order_id]
-
-    def calculate_priority_score(self, order_data):
-        """Sipariş öncelik puanını hesapla"""
-        customer_type, wait_time, quantity = order_data
-        
-        # Müşteri tipi katsayısı (Premium: 2x, Normal: 1x)
-        type_multiplier = 2.0 if customer_type == "Premium" else 1.0
-        
-        # Bekleme süresi katsayısı (saat başına artan)
-        wait_multiplier = 1.0 + (wait_time / 3600.0)
-        
-        # Miktar katsayısı
-        quantity_multiplier = 1.0 + (quantity / 100.0)
-        
-        # Toplam öncelik puanı (negatif çünkü PriorityQueue küçük değerlere öncelik verir)
-        priority_score = -(type_multiplier * wait_multiplier * quantity_multiplier)
-        print(f"Priority Score: {-priority_score:.2f} (Type: {type_multiplier}x, Wait: {wait_multiplier:.2f}x, Quantity: {quantity_multiplier:.2f}x)")
-        return priority_score
 
     def start_order_processing(self):
-        """Tüm bekleyen siparişleri öncelik sırasına göre işle"""
+        """Tüm bekleyen siparişleri öncelik sırasına göre toplu işle"""
         try:
-            print("\nStarting order processing...")
-            # Bekleyen siparişleri al
-            orders = self.db_manager.get_pending_orders()
-            print(f"Found {len(orders)} pending orders")
-            
-            # Her sipariş için öncelik hesapla ve kuyruğa ekle
-            for order in orders:
-                order_id = order[0]
-                customer_type = order[2]
-                wait_time = float(order[7])
-                quantity = int(order[5])
-                
-                priority_score = self.calculate_priority_score((customer_type, wait_time, quantity))
-                self.order_queue.put((priority_score, order_id))
+            print("\nStarting order settlement...")
+            # Öncelik sırasıyla chunk'lar halinde; lane'ler açıksa çakışmayan
+            # siparişler (ortak ürün/müşteri yok) paralel lane'lerde işlenir
+            settle = (self.lane_scheduler.settle_pending_orders if self.lane_scheduler
+                      else self.db_manager.settle_pending_orders)
+            success_count, failed_count = settle(should_continue=lambda: self.is_processing)
+            print(f"Settled orders: {success_count} processed, {failed_count} failed")
             
-            print("\nProcessing orders by priority...")
-            # Kuyruktan siparişleri al ve thread'leri başlat
-            while not self.order_queue.empty():
-                if not self.is_processing:
-                    break
-                    
-                priority_score, order_id = self.order_queue.get()
-                
-                # Yeni thread oluştur
-                thread = threading.Thread(
-                    target=self.process_order_thread,
-                    args=(order_id, priority_score)
-                )
-                self.order_threads[order_id] = thread
-                thread.start()
-                
-            # Tüm thread'lerin tamamlanmasını bekle
-            for thread in list(self.order_threads.values()):
-                thread.join()
+            if self.window and not self._is_closing:
+                self.window.after(0, lambda: self.refresh_order_list())
+                self.window.after(0, lambda: self.refresh_logs())
                 
         except Exception as e:
             print(f"Error in start_order_processing: {e}")
@@ -989,51 +992,53 @@ class AdminPanel:
             print("Order processing completed")
     
     def refresh_customer_list(self):
-        # Clear existing items
-        for item in self.customer_tree.get_children():
-            self.customer_tree.delete(item)
-        
-        # Add customers to the treeview
-        customers = self.db_manager.get_all_customers()
-        for customer in customers:
-            self.customer_tree.insert("", tk.END, values=(
+        """Fetch customers in the background, render on the Tk thread"""
+        if self._is_closing or not self.fetcher:
+            return
+        self.fetcher.fetch("customers", self.db_manager.get_all_customers,
+                           self._render_customer_list)
+    
+    def _render_customer_list(self, customers):
+        if self._is_closing or not self.customer_tree:
+            return
+        
+        # Sadece değişen satırlar güncellenir
+        self.customer_tree_sync.apply(
+            (customer["customer_id"], (
                 customer["customer_id"],
                 customer["customer_name"],
                 f"{customer['budget']:.2f} TL",
                 customer["customer_type"],
                 f"{customer['total_spent']:.2f} TL",
                 customer["username"]
-            ))
+            ), ())
+            for customer in customers
+        )
     
     def refresh_product_list(self):
-        # Get current selection
-        selected_items = self.product_tree.selection()
-        selected_ids = []
-        for item in selected_items:
-            try:
-                selected_ids.append(self.product_tree.item(item)['values'][0])
-            except:
-                pass
-
-        # Clear existing items
-        self.product_tree.delete(*self.product_tree.get_children())
-        
-        # Add products to the treeview
-        products = self.db_manager.get_all_products()
-        for i, product in enumerate(products):
-            # Alternatif satır renkleri için tag
-            row_tag = 'evenrow' if i % 2 == 0 else 'oddrow'
-            
-            item_id = self.product_tree.insert("", tk.END, values=(
+        """Fetch products in the background, render on the Tk thread"""
+        if self._is_closing or not self.fetcher:
+            return
+        self.fetcher.fetch("products", self.db_manager.get_all_products,
+                           self._render_product_list)
+    
+    def _render_product_list(self, products):
+        if self._is_closing or not self.product_tree:
+            return
+        
+        # Sadece değişen satırlar güncellenir, seçim korunur
+        self.product_tree_sync.apply(
+            (product["product_id"], (
                 product["product_id"],
                 product["product_name"],
                 product["stock"],
                 f"{product['price']:.2f} TL"
-            ), tags=(row_tag,))
-            
-            # Restore selection if this was a selected item
-            if product["product_id"] in selected_ids:
-                self.product_tree.selection_add(item_id)
+            ), ('evenrow' if i % 2 == 0 else 'oddrow',))  # Alternatif satır renkleri
+            for i, product in enumerate(products)
+        )
+        
+        if self._render_stock_graph:
+            self._render_stock_graph(products)
     
     def show_product_menu(self, event):
         """Show context menu on right click"""
@@ -1064,7 +1069,7 @@ class AdminPanel:
                 messagebox.showinfo("Success", f"{product_name} deleted successfully!")
                 self.refresh_product_list()
             else:
-                messagebox.showerror("Error", "Failed to delete product!") 
+                messagebox.showerror("Error", "Failed to delete product! Pending orders may still reserve it.") 
     
     def setup_log_tab(self, parent_frame):
         """Setup the log viewing tab"""
@@ -1084,6 +1089,10 @@ class AdminPanel:
         columns = ("ID", "Customer", "Type", "Customer Type", "Product", "Quantity", "Time", "Message")
         self.log_tree = ttk.Treeview(log_frame, columns=columns, show="headings", height=20)
         
+        # Configure tag colors
+        self.log_tree.tag_configure("error", foreground="red")
+        self.log_tree.tag_configure("warning", foreground="orange")
+        
         # Set column headings and widths
         self.log_tree.heading("ID", text="Log ID")
         self.log_tree.column("ID", width=50, stretch=False)
@@ -1116,7 +1125,11 @@ class AdminPanel:
         # Add scrollbars
         y_scrollbar = ttk.Scrollbar(log_frame, orient=tk.VERTICAL, command=self.log_tree.yview)
         x_scrollbar = ttk.Scrollbar(log_frame, orient=tk.HORIZONTAL, command=self.log_tree.xview)
-        self.log_tree.configure(yscrollcommand=y_scrollbar.set, xscrollcommand=x_scrollbar.set)
+        self.log_tree.configure(xscrollcommand=x_scrollbar.set)
+        
+        # Sayfalı (log_id keyset) sanal görünüm; dikey kaydırmayı o yönetir
+        self.log_view = VirtualLogView(self.log_tree, y_scrollbar, self.db_manager,
+                                       self.fetcher, self._log_row)
         
         # Grid the treeview and scrollbars
         self.log_tree.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
@@ -1130,6 +1143,9 @@ class AdminPanel:
         ttk.Button(button_frame, text="Refresh Logs", 
                   command=self.refresh_logs).pack(side=tk.LEFT, padx=5)
         
+        ttk.Button(button_frame, text="Newest Logs", 
+                  command=self.log_view.reload).pack(side=tk.LEFT, padx=5)
+        
         # Auto-refresh setup
         self._refresh_enabled = True
         self._refresh_timer = None
@@ -1152,38 +1168,56 @@ class AdminPanel:
         self._safe_start_refresh_cycle()
     
     def refresh_order_list(self):
-        """Refresh the order list with safety checks"""
+        """Fetch pending orders in the background, render on the Tk thread"""
+        if self._is_closing or not self.fetcher:
+            return
+        self._last_order_refresh = time.monotonic()
+        self.fetcher.fetch("orders", self.db_manager.get_pending_orders,
+                           self._render_order_list)
+    
+    def _render_order_list(self, orders):
+        """Render the order list with safety checks"""
         try:
             if self._is_closing or not self.window.winfo_exists():
                 return
             
-            # Clear existing items
-            self.order_tree.delete(*self.order_tree.get_children())
-            
-            # Add orders to the treeview
-            orders = self.db_manager.get_pending_orders()
+            # Add orders to the treeview (only changed rows are touched)
+            rows = []
             for i, order in enumerate(orders):
-                # order tuple: (order_id, customer_id, customer_type, product_id, product_name, quantity, order_time, wait_time)
+                # order tuple: (order_id, customer_id, customer_type, product_id, product_name,
+                #               quantity, order_time, wait_time, priority)
                 customer_type = order[2]
                 wait_time = float(order[7])
                 quantity = int(order[5])
                 
-                # Öncelik puanını hesapla
-                priority_score = self.calculate_priority_score((customer_type, wait_time, quantity))
+                # Öncelik puanı SQL'de hesaplanır (processing/priority.py)
+                priority_score = order[8]
                 
                 # Alternatif satır renkleri için tag
                 row_tag = 'evenrow' if i % 2 == 0 else 'oddrow'
                 
-                self.order_tree.insert("", tk.END, values=(
+                rows.append((order[0], (
                     order[0],  # order_id
                     f"Customer {order[1]}",  # customer_id
                     customer_type,  # customer_type
                     order[4],  # product_name
                     quantity,  # quantity
-                    f"Priority: {-priority_score:.2f}",  # Negatifi alınmış priority score
+                    f"Priority: {priority_score:.2f}",
                     order[6],  # order_time
                     f"{wait_time:.0f} sec"  # wait_time
-                ), tags=(row_tag,))
+                ), (row_tag,)))
+            
+            self.order_tree_sync.apply(rows)
+            
+            # Worker pool istatistikleri
+            if self.order_pool:
+                summary = self.order_pool.get_summary()
+                self.worker_stats_label.config(text=(
+                    f"Workers: {summary['busy']}/{summary['workers']} busy | "
+                    f"Queued: {summary['queued']} | "
+                    f"Completed: {summary['completed']} | "
+                    f"Failed: {summary['failed']}"
+                ))
             
             # Update the window
             if not self._is_closing and self.window.winfo_exists():
@@ -1194,57 +1228,30 @@ class AdminPanel:
             self._handle_refresh_error()
     
     def refresh_logs(self):
-        """Refresh the log list with safety checks"""
-        try:
-            if self._is_closing or not self.window.winfo_exists():
-                return
-            
-            # Get current selection
-            selected_items = self.log_tree.selection()
-            selected_ids = [self.log_tree.item(item)['values'][0] for item in selected_items]
-            
-            # Clear existing items
-            self.log_tree.delete(*self.log_tree.get_children())
-            
-            # Add logs to the treeview
-            logs = self.db_manager.get_recent_logs()
-            for log in logs:
-                if self._is_closing or not self.window.winfo_exists():
-                    return
-                
-                # Set row color based on log type
-                tags = ()
-                if log["log_type"] == "Error":
-                    tags = ("error",)
-                elif log["log_type"] == "Warning":
-                    tags = ("warning",)
-                
-                item_id = self.log_tree.insert("", tk.END, values=(
-                    log["log_id"],
-                    log["customer_name"],
-                    log["log_type"],
-                    log["customer_type"],
-                    log["product"] or "-",
-                    log["quantity"] or "-",
-                    log["timestamp"],
-                    log["result_message"]
-                ), tags=tags)
-                
-                # Restore selection if this was a selected item
-                if log["log_id"] in selected_ids:
-                    self.log_tree.selection_add(item_id)
-            
-            # Configure tag colors
-            self.log_tree.tag_configure("error", foreground="red")
-            self.log_tree.tag_configure("warning", foreground="orange")
-            
-            # Update the window to prevent display issues
-            if not self._is_closing and self.window.winfo_exists():
-                self.window.update_idletasks()
-            
-        except Exception as e:
-            print(f"Error refreshing logs: {e}")
-            self._handle_refresh_error()
+        """Pull new logs in the background while the log view shows the newest page"""
+        if self._is_closing or not self.log_view:
+            return
+        self.log_view.refresh()
+    
+    def _log_row(self, log):
+        """Treeview row (key, values, tags) for a log entry"""
+        # Set row color based on log type
+        tags = ()
+        if log["log_type"] == "Error":
+            tags = ("error",)
+        elif log["log_type"] == "Warning":
+            tags = ("warning",)
+        
+        return (log["log_id"], (
+            log["log_id"],
+            log["customer_name"],
+            log["log_type"],
+            log["customer_type"],
+            log["product"] or "-",
+            log["quantity"] or "-",
+            log["timestamp"],
+            log["result_message"]
+        ), tags)
     
     def _force_close(self):
         """Force close the window"""
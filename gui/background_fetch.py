@@ -0,0 +1,60 @@
+from threading import Lock
+from typing import Callable, Dict
+
+from processing.worker_pool import WorkerPool
+
+
+class BackgroundFetcher:
+    """Runs database queries off the Tk main thread and hands results back via `after`
+
+    Every fetch gets a generation number per key; a result is only delivered
+    if no newer fetch for the same key was started in the meantime.
+    """
+
+    def __init__(self, window, max_workers: int = 2, max_queue_size: int = 64):
+        self.window = window
+        self._pool = WorkerPool(max_workers=max_workers, max_queue_size=max_queue_size,
+                                name="fetch-worker")
+        self._generations: Dict[str, int] = {}
+        self._lock = Lock()
+        self._closed = False
+
+    def fetch(self, key: str, query: Callable, on_result: Callable, *args) -> bool:
+        """Run `query(*args)` on a worker, then `on_result(result)` on the Tk thread"""
+        if self._closed:
+            return False
+
+        with self._lock:
+            generation = self._generations.get(key, 0) + 1
+            self._generations[key] = generation
+
+        def _run():
+            if self._is_stale(key, generation):
+                return
+            result = query(*args)
+            if self._is_stale(key, generation):
+                return
+            try:
+                self.window.after(0, self._deliver, key, generation, on_result, result)
+            except Exception as e:
+                # Window destroyed while the query was running
+                print(f"Error delivering {key} result: {e}")
+
+        # Never block the Tk thread; a full queue means the next refresh retries
+        return self._pool.submit(_run, block=False)
+
+    def _is_stale(self, key: str, generation: int) -> bool:
+        with self._lock:
+            return self._closed or self._generations.get(key) != generation
+
+    def _deliver(self, key: str, generation: int, on_result: Callable, result):
+        """Runs on the Tk thread, drops results superseded by a newer fetch"""
+        if self._is_stale(key, generation):
+            return
+        on_result(result)
+
+    def close(self):
+        """Drop queued fetches and ignore results still in flight"""
+        with self._lock:
+            self._closed = True
+        self._pool.shutdown(wait=False, cancel_pending=True)
@@ -1,7 +1,9 @@
 import tkinter as tk
+import time
 from tkinter import ttk, messagebox
 from auth.auth_manager import AuthManager
 from database.db_manager import DatabaseManager
+from gui.background_fetch import BackgroundFetcher
 
 class CustomerPanel:
     def __init__(self, root: tk.Tk, auth_manager: AuthManager, username: str):
@@ -28,7 +30,10 @@ class CustomerPanel:
         self.db_manager = DatabaseManager()
         self.username = username
         
-        # Get customer details
+        # Database queries run on background workers, never on the Tk loop
+        self.fetcher = BackgroundFetcher(self.window)
+        
+        # Get customer details (needed to build the UI)
         self.customer_details = self.db_manager.get_customer_details(username)
         
         # Initialize UI elements
@@ -42,6 +47,11 @@ class CustomerPanel:
         self.window.transient(root)
         self.window.grab_set()
         
+        # Change feed: last seen table versions
+        self._table_versions = {}
+        self._last_order_refresh = time.monotonic()
+        self._order_list_max_age = 30.0  # seconds
+        
         # Start auto refresh
         self._refresh_timer = None
         self.start_auto_refresh()
@@ -151,7 +161,7 @@ class CustomerPanel:
         info_text = f"""
         Customer: {self.customer_details['customer_name']}
         Type: {self.customer_details['customer_type']}
-        Available Budget: {self.customer_details['budget']:.2f} TL
+        Available Budget: {self.customer_details['budget'] - self.customer_details['held']:.2f} TL
         Total Spent: {self.customer_details['total_spent']:.2f} TL
         """
         ttk.Label(info_frame, text=info_text).pack()
@@ -162,7 +172,8 @@ class CustomerPanel:
         
         # Create Treeview for products
         columns = ("ID", "Name", "Stock", "Price (TL)")
-        self.product_tree = ttk.Treeview(product_frame, columns=columns, show="headings", height=10)
+        self.product_tree = ttk.Treeview(product_frame, columns=columns, show="headings", height=10,
+                                         selectmode="extended")
         
         # Configure columns
         self.product_tree.heading("ID", text="ID")
@@ -188,7 +199,7 @@ class CustomerPanel:
         order_form.pack(fill=tk.X, padx=5, pady=5)
         
         # Quantity input
-        ttk.Label(order_form, text="Quantity:").grid(row=0, column=0, padx=5, pady=5)
+        ttk.Label(order_form, text="Quantity (each selected product):").grid(row=0, column=0, padx=5, pady=5)
         quantity_var = tk.StringVar()
         quantity_entry = ttk.Entry(order_form, textvariable=quantity_var, width=10)
         quantity_entry.grid(row=0, column=1, padx=5, pady=5)
@@ -205,9 +216,10 @@ class CustomerPanel:
                     messagebox.showerror("Error", "Quantity must be positive!")
                     return
                 
-                product_id = self.product_tree.item(selected[0])['values'][0]
+                # Birden fazla ürün seçildiyse hepsi tek siparişte (sepet)
+                lines = [(self.product_tree.item(item)['values'][0], quantity) for item in selected]
                 
-                if self.db_manager.place_order(self.customer_details['customer_id'], product_id, quantity):
+                if self.db_manager.place_basket_order(self.customer_details['customer_id'], lines) is not None:
                     messagebox.showinfo("Success", "Order placed successfully!")
                     quantity_var.set("")  # Clear quantity
                     self.refresh_all()  # Refresh all views
@@ -264,29 +276,48 @@ class CustomerPanel:
         self.refresh_order_list()
     
     def refresh_product_list(self):
+        """Fetch products in the background, render on the Tk thread"""
+        if self._is_closing:
+            return
+        self.fetcher.fetch("products", self.db_manager.get_all_products,
+                           self._render_product_list)
+    
+    def _render_product_list(self, products):
+        if self._is_closing or not self.product_tree:
+            return
+        
         # Clear existing items
         for item in self.product_tree.get_children():
             self.product_tree.delete(item)
         
         # Add products to the treeview
-        products = self.db_manager.get_all_products()
         for product in products:
-            if product['stock'] > 0:  # Only show available products
+            # Stock reserved by other customers' pending orders is not available
+            available = product["stock"] - product["reserved"]
+            if available > 0:  # Only show available products
                 self.product_tree.insert("", tk.END, values=(
                     product["product_id"],
                     product["product_name"],
-                    product["stock"],
+                    available,
                     f"{product['price']:.2f}"
                 ))
     
     def refresh_order_list(self):
+        """Fetch the customer's orders in the background, render on the Tk thread"""
+        if self._is_closing:
+            return
+        self._last_order_refresh = time.monotonic()
+        self.fetcher.fetch("orders", self.db_manager.get_customer_orders,
+                           self._render_order_list, self.customer_details['customer_id'])
+    
+    def _render_order_list(self, orders):
+        if self._is_closing or not self.order_tree:
+            return
+        
         # Clear existing items
         for item in self.order_tree.get_children():
             self.order_tree.delete(item)
         
-        # Get customer's orders
-        orders = self.db_manager.get_customer_orders(self.customer_details['customer_id'])
-        
         for order in orders:
             # Determine status tag
             status = order['status'].lower()
@@ -306,17 +337,49 @@ class CustomerPanel:
         self.refresh_product_list()
         self.refresh_order_list()
         # Update customer details
-        self.customer_details = self.db_manager.get_customer_details(self.username)
+        if not self._is_closing:
+            self.fetcher.fetch("customer_details", self.db_manager.get_customer_details,
+                               self._update_customer_details, self.username)
+    
+    def _update_customer_details(self, details):
+        if details:
+            self.customer_details = details
     
     def start_auto_refresh(self):
         """Start auto refresh cycle"""
-        self.refresh_all()
+        if self._is_closing:
+            return
+        # Ucuz sürüm kontrolü; sadece değişen tablolar yeniden çekilir
+        self.fetcher.fetch("changes", self.db_manager.get_changes_since,
+                           self._refresh_changed, dict(self._table_versions))
         self._refresh_timer = self.window.after(5000, self.start_auto_refresh)
     
+    def _refresh_changed(self, changes):
+        """Refresh the views that depend on the changed tables"""
+        if self._is_closing:
+            return
+        
+        # No known versions on the first cycle: every table counts as changed,
+        # so writes made while setup_ui was loading are not missed
+        self._table_versions.update(changes)
+        
+        # Wait time column ages even without writes
+        order_list_stale = (time.monotonic() - self._last_order_refresh
+                            >= self._order_list_max_age)
+        
+        if "products" in changes:
+            self.refresh_product_list()
+        if order_list_stale or changes.keys() & {"orders", "products"}:
+            self.refresh_order_list()
+        if "customers" in changes:
+            self.fetcher.fetch("customer_details", self.db_manager.get_customer_details,
+                               self._update_customer_details, self.username)
+    
     def cleanup(self):
         """Cleanup resources"""
         if self._refresh_timer:
             self.window.after_cancel(self._refresh_timer)
+        self.fetcher.close()
         self.window.destroy() 
     
     def logout(self):
@@ -339,6 +402,9 @@ class CustomerPanel:
                 
             self._is_closing = True
             
+            # Stop background queries
+            self.fetcher.close()
+            
             # Cancel any pending timers
             if hasattr(self, '_refresh_timer') and self._refresh_timer:
                 self.window.after_cancel(self._refresh_timer)
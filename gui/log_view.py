@@ -0,0 +1,124 @@
+from typing import Callable, Dict, List, Optional, Tuple
+
+from gui.tree_sync import TreeviewSync
+
+
+class VirtualLogView:
+    """Windowed, keyset-paginated log list for a Treeview
+
+    Only `page_size * max_pages` rows are kept; scrolling near either end
+    fetches the next page by log_id and drops a page from the other end.
+    """
+
+    _EDGE = 0.05  # Fraction of the scroll range that triggers a page load
+
+    def __init__(self, tree, scrollbar, db_manager, fetcher,
+                 render_row: Callable[[Dict], Tuple[object, tuple, tuple]],
+                 page_size: int = 100, max_pages: int = 5):
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.db_manager = db_manager
+        self.fetcher = fetcher
+        self.render_row = render_row
+        self.page_size = page_size
+        self.max_rows = page_size * max_pages
+        self.tree_sync = TreeviewSync(tree)
+
+        self.rows: List[Dict] = []  # Newest first (log_id DESC)
+        self.at_head = True   # Window starts at the newest log
+        self.at_tail = False  # Window reaches the oldest log
+        self._loading = set()
+
+        self.tree.configure(yscrollcommand=self._on_yscroll)
+
+    def refresh(self):
+        """Pull newly written logs while the window is showing the newest ones"""
+        if not self.at_head:
+            return
+        if not self.rows:
+            self.reload()
+            return
+        self._load("newer", self.db_manager.get_logs_page, self._on_newer_page,
+                   None, self.rows[0]["log_id"], self.page_size)
+
+    def reload(self):
+        """Jump back to the newest page"""
+        self._loading.clear()
+        self._load("head", self.db_manager.get_logs_page, self._on_head_page,
+                   None, None, self.page_size)
+
+    def _load(self, direction: str, query: Callable, on_result: Callable, *args):
+        """Start one page fetch per direction at a time"""
+        if direction in self._loading:
+            return
+        self._loading.add(direction)
+        cursor = self._cursor()
+
+        def _deliver(page, direction=direction, cursor=cursor):
+            self._loading.discard(direction)
+            # The window moved while the page was loading, ignore it
+            if cursor != self._cursor():
+                return
+            on_result(page)
+
+        if not self.fetcher.fetch(f"logs_{direction}", query, _deliver, *args):
+            self._loading.discard(direction)
+
+    def _cursor(self) -> Optional[Tuple[int, int]]:
+        if not self.rows:
+            return None
+        return self.rows[0]["log_id"], self.rows[-1]["log_id"]
+
+    def _on_head_page(self, page: List[Dict]):
+        self.rows = page
+        self.at_head = True
+        self.at_tail = len(page) < self.page_size
+        self._render()
+        self.tree.yview_moveto(0)
+
+    def _on_newer_page(self, page: List[Dict]):
+        if not page:
+            # Nothing newer: the window already starts at the newest log
+            self.at_head = True
+            return
+
+        if self.at_head and len(page) >= self.page_size:
+            # Fell more than a page behind the head, restart from the newest page
+            self.reload()
+            return
+
+        anchor = None if self.at_head else self.rows[0]["log_id"]
+        self.rows = page + self.rows
+        self.at_head = self.at_head or len(page) < self.page_size
+        if len(self.rows) > self.max_rows:
+            del self.rows[self.max_rows:]
+            self.at_tail = False
+        self._render(anchor)
+
+    def _on_older_page(self, page: List[Dict]):
+        if len(page) < self.page_size:
+            self.at_tail = True
+        if not page:
+            return
+
+        self.rows.extend(page)
+        if len(self.rows) > self.max_rows:
+            del self.rows[:len(self.rows) - self.max_rows]
+            self.at_head = False
+        self._render()
+
+    def _render(self, anchor_key=None):
+        self.tree_sync.apply((self.render_row(row) for row in self.rows), anchor_key)
+
+    def _on_yscroll(self, first, last):
+        """Forward to the scrollbar and load a page when close to either end"""
+        self.scrollbar.set(first, last)
+        if not self.rows:
+            return
+
+        if float(last) >= 1.0 - self._EDGE and not self.at_tail:
+            self._load("older", self.db_manager.get_logs_page, self._on_older_page,
+                       self.rows[-1]["log_id"], None, self.page_size)
+        elif float(first) <= self._EDGE and not self.at_head:
+            self._load("newer", self.db_manager.get_logs_page, self._on_newer_page,
+                       None, self.rows[0]["log_id"], self.page_size)
@@ -0,0 +1,139 @@
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+class TreeviewSync:
+    """Keyed incremental updater for a ttk.Treeview
+
+    Row keys are used as item iids, so selection survives refreshes. Changes
+    are applied in slices of at most `time_budget_ms` on the Tk main thread.
+    """
+
+    _CHECK_EVERY = 50  # Check the clock every N operations
+
+    def __init__(self, tree, time_budget_ms: float = 25.0):
+        self.tree = tree
+        self.time_budget = time_budget_ms / 1000.0
+        self._rows: Dict[str, Tuple[tuple, tuple]] = {}
+        self._ops: List[tuple] = []
+        self._continuation = None
+        self._anchor: Optional[str] = None
+
+        # Metrics of the last refresh
+        self.last_slice_ms = 0.0
+        self.max_slice_ms = 0.0
+        self.last_changes = 0
+
+    def apply(self, rows: Iterable[Tuple[object, tuple, tuple]], anchor_key: Optional[object] = None):
+        """Sync the tree to `rows`, an ordered iterable of (key, values, tags)
+
+        `anchor_key` pins that row to the top of the view; by default the
+        current top row is kept unless the view is scrolled to the top.
+        """
+        if self._continuation:
+            # Newer data wins; the diff below starts from the tree as it is now
+            self.tree.after_cancel(self._continuation)
+            self._continuation = None
+
+        new_order = []
+        new_rows = {}
+        for key, values, tags in rows:
+            iid = str(key)
+            new_order.append(iid)
+            new_rows[iid] = (tuple(values), tuple(tags))
+
+        current_order = list(self.tree.get_children())
+        current = set(current_order)
+        ops = []
+
+        for iid in current_order:
+            if iid not in new_rows:
+                ops.append(("delete", iid))
+
+        # Inserts at increasing indexes land in the right place as long as
+        # surviving rows keep their relative order
+        for index, iid in enumerate(new_order):
+            values, tags = new_rows[iid]
+            if iid not in current:
+                ops.append(("insert", iid, index, values, tags))
+            elif self._rows.get(iid) != (values, tags):
+                ops.append(("update", iid, values, tags))
+
+        kept_before = [iid for iid in current_order if iid in new_rows]
+        kept_after = [iid for iid in new_order if iid in current]
+        if kept_before != kept_after:
+            ops.extend(("move", iid, index) for index, iid in enumerate(new_order))
+
+        self.last_changes = len(ops)
+        self.max_slice_ms = 0.0
+        self._ops = ops
+        self._anchor = str(anchor_key) if anchor_key is not None else self._top_visible_item()
+        self._run_slice()
+
+    def _run_slice(self):
+        """Apply queued operations until the time budget is used up"""
+        self._continuation = None
+        tree = self.tree
+        if not tree.winfo_exists():
+            self._ops = []
+            return
+
+        started = time.perf_counter()
+        done = 0
+
+        try:
+            while done < len(self._ops):
+                op = self._ops[done]
+                kind = op[0]
+                if kind == "delete":
+                    tree.delete(op[1])
+                    self._rows.pop(op[1], None)
+                elif kind == "insert":
+                    _, iid, index, values, tags = op
+                    tree.insert("", index, iid=iid, values=values, tags=tags)
+                    self._rows[iid] = (values, tags)
+                elif kind == "update":
+                    _, iid, values, tags = op
+                    tree.item(iid, values=values, tags=tags)
+                    self._rows[iid] = (values, tags)
+                else:
+                    tree.move(op[1], "", op[2])
+                done += 1
+
+                if done % self._CHECK_EVERY == 0 and time.perf_counter() - started >= self.time_budget:
+                    break
+        finally:
+            self._ops = self._ops[done:]
+            elapsed = (time.perf_counter() - started) * 1000.0
+            self.last_slice_ms = elapsed
+            self.max_slice_ms = max(self.max_slice_ms, elapsed)
+
+        self._restore_scroll()
+        if self._ops:
+            self._continuation = tree.after(1, self._run_slice)
+
+    def _top_visible_item(self) -> Optional[str]:
+        """The item shown in the first visible row, None when scrolled to the top"""
+        try:
+            if self.tree.yview()[0] <= 0.0:
+                return None
+            return self.tree.identify_row(1) or None
+        except Exception:
+            return None
+
+    def _restore_scroll(self):
+        """Keep the previously top-most visible row at the top of the view"""
+        if not self._anchor or not self.tree.exists(self._anchor):
+            return
+        total = len(self.tree.get_children())
+        if total:
+            self.tree.yview_moveto(self.tree.index(self._anchor) / total)
+
+    def clear(self):
+        """Remove every row"""
+        if self._continuation:
+            self.tree.after_cancel(self._continuation)
+            self._continuation = None
+        self._ops = []
+        self.tree.delete(*self.tree.get_children())
+        self._rows.clear()
@@ -0,0 +1,242 @@
+import argparse
+import json
+import os
+import signal
+import threading
+import time
+from typing import Dict, List, Optional
+
+from database.db_manager import DatabaseManager
+from database.profiles import PRAGMA_PROFILES, DEFAULT_PROFILE
+from processing.policies import POLICIES, DEFAULT_POLICY, create_policy
+from processing.worker_pool import WorkerPool
+
+
+class OrderDaemon:
+    """Headless settlement service: drains pending orders without the Tk GUI
+
+    The dispatch loop feeds a priority policy incrementally from the
+    database and hands batches of the highest priority orders to the
+    worker pool; every batch is settled in one transaction. At most one
+    batch per worker is in flight, the rest stays in the policy queue.
+    """
+
+    def __init__(self, db_manager: DatabaseManager, workers: int = 4, policy: str = DEFAULT_POLICY,
+                 batch_size: int = 200, poll_interval: float = 1.0,
+                 status_file: Optional[str] = "order_daemon_status.json", status_interval: float = 5.0,
+                 expire_interval: float = 30.0, resync_interval: float = 300.0):
+        self.db_manager = db_manager
+        self.workers = workers
+        self.policy_name = policy
+        self.policy = create_policy(policy)
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.status_file = status_file
+        self.status_interval = status_interval
+        self.expire_interval = expire_interval
+        self.resync_interval = resync_interval
+
+        self.pool = WorkerPool(max_workers=workers, max_queue_size=workers, name="settle-worker")
+        self._stop = threading.Event()
+        self._wake = threading.Event()  # Set when a batch finishes
+        self._slots = threading.Semaphore(workers)  # Batches in flight
+        self._lock = threading.Lock()
+        self._resync = False
+        self.min_resync_spacing = 5.0  # seconds between resyncs requested by failed batches
+        self.state = "starting"
+
+        # Metrics
+        self.started_at = time.time()
+        self.settled = 0
+        self.failed = 0
+        self.batches = 0
+        self.batch_errors = 0
+        self.expired = 0
+        self.in_flight = 0
+        self.last_batch_at: Optional[float] = None
+        self._recent: List[tuple] = []  # (time, settled + failed) per batch, last minute
+
+    def stop(self, *_):
+        """Ask the dispatch loop to stop; in-flight batches still finish"""
+        if not self._stop.is_set():
+            print("Shutdown requested, finishing in-flight batches...")
+        self._stop.set()
+        self._wake.set()
+
+    def _settle_batch(self, order_ids: List[int]):
+        try:
+            result = self.db_manager.settle_orders(order_ids)
+            with self._lock:
+                self.batches += 1
+                self.last_batch_at = time.time()
+                if result is None:
+                    # Rolled back, the orders are still pending: resync so nothing stays behind
+                    self.batch_errors += 1
+                    self._resync = True
+                    return
+                # (0, 0) only means somebody else settled these orders first
+                success, failed = result
+                self.settled += success
+                self.failed += failed
+                self._recent.append((self.last_batch_at, success + failed))
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+            self._slots.release()
+            self._wake.set()
+
+    def _dispatch(self) -> int:
+        """Hand batches to free workers, returns how many orders were dispatched"""
+        dispatched = 0
+        while len(self.policy) and not self._stop.is_set():
+            if not self._slots.acquire(blocking=False):
+                break
+            batch = self.policy.pop_batch(self.batch_size)
+            with self._lock:
+                self.in_flight += 1
+            if not self.pool.submit(self._settle_batch, batch, block=False):
+                # Pool full or shut down: put the slot back, the orders are picked up on resync
+                with self._lock:
+                    self.in_flight -= 1
+                    self._resync = True
+                self._slots.release()
+                break
+            dispatched += len(batch)
+        return dispatched
+
+    def run(self):
+        """Dispatch until stop() is called (SIGINT / SIGTERM)"""
+        self.state = "running"
+        self.db_manager.add_log(None, "System", None, None, None, (
+            f"Order daemon started | Workers: {self.workers} | "
+            f"Policy: {self.policy_name} | Batch size: {self.batch_size}"
+        ))
+        print(f"Order daemon running: {self.workers} workers, policy {self.policy_name}, "
+              f"batch size {self.batch_size}")
+
+        next_status = next_expire = time.monotonic()
+        last_resync = time.monotonic()
+        next_resync = last_resync + self.resync_interval
+        try:
+            while not self._stop.is_set():
+                now = time.monotonic()
+                if now >= next_expire:
+                    self.expired += self.db_manager.expire_reservations()
+                    next_expire = now + self.expire_interval
+
+                with self._lock:
+                    resync = ((self._resync and now - last_resync >= self.min_resync_spacing)
+                              or now >= next_resync)
+                    if resync:
+                        self._resync = False
+                if resync:
+                    # Start over from the database: picks up orders of failed batches. Orders
+                    # still in flight may be dispatched twice, the second settlement skips them.
+                    self.policy = create_policy(self.policy_name)
+                    last_resync = now
+                    next_resync = now + self.resync_interval
+
+                self._wake.clear()
+                self.policy.sync(self.db_manager)
+                dispatched = self._dispatch()
+
+                if now >= next_status:
+                    self.write_status()
+                    next_status = now + self.status_interval
+
+                if not dispatched:
+                    self._wake.wait(self.poll_interval)
+        finally:
+            self.state = "stopping"
+            self.write_status()
+            self.pool.shutdown(wait=True)
+            self.state = "stopped"
+            self.db_manager.add_log(None, "System", None, None, None, (
+                f"Order daemon stopped | Settled: {self.settled} | Failed: {self.failed} | "
+                f"Batches: {self.batches}"
+            ))
+            self.write_status()
+            print(f"Order daemon stopped: {self.settled} settled, {self.failed} failed")
+
+    def get_status(self) -> Dict:
+        now = time.time()
+        with self._lock:
+            self._recent = [entry for entry in self._recent if now - entry[0] <= 60.0]
+            uptime = now - self.started_at
+            return {
+                "pid": os.getpid(),
+                "state": self.state,
+                "policy": self.policy_name,
+                "workers": self.workers,
+                "batch_size": self.batch_size,
+                "started_at": self.started_at,
+                "updated_at": now,
+                "uptime_seconds": round(uptime, 1),
+                "queued": len(self.policy),
+                "in_flight_batches": self.in_flight,
+                "settled": self.settled,
+                "failed": self.failed,
+                "batches": self.batches,
+                "batch_errors": self.batch_errors,
+                "expired_reservations": self.expired,
+                "orders_per_second": round((self.settled + self.failed) / uptime, 1) if uptime > 0 else 0.0,
+                "orders_last_minute": sum(count for _, count in self._recent),
+                "last_batch_at": self.last_batch_at,
+                "worker_pool": self.pool.get_summary(),
+                "connection_pools": self.db_manager.get_pool_stats(),
+            }
+
+    def write_status(self):
+        """Write the status JSON atomically (tmp file + rename)"""
+        if not self.status_file:
+            return
+        try:
+            tmp_path = f"{self.status_file}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(self.get_status(), f, indent=2)
+            os.replace(tmp_path, self.status_file)
+        except Exception as e:
+            print(f"Error writing status file: {e}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless order settlement service")
+    parser.add_argument("--workers", type=int, default=int(os.environ.get("OMS_DAEMON_WORKERS", 4)),
+                        help="parallel settlement workers (default: 4)")
+    parser.add_argument("--policy", default=os.environ.get("OMS_PRIORITY_POLICY", DEFAULT_POLICY),
+                        choices=sorted(POLICIES), help=f"dispatch policy (default: {DEFAULT_POLICY})")
+    parser.add_argument("--batch-size", type=int, default=200,
+                        help="orders settled per transaction (default: 200)")
+    parser.add_argument("--poll-interval", type=float, default=1.0,
+                        help="seconds to wait for new orders when idle (default: 1)")
+    parser.add_argument("--status-file", default="order_daemon_status.json",
+                        help="status/metrics JSON, rewritten periodically (default: order_daemon_status.json)")
+    parser.add_argument("--status-interval", type=float, default=5.0,
+                        help="seconds between status file updates (default: 5)")
+    parser.add_argument("--profile", default=None, choices=sorted(PRAGMA_PROFILES),
+                        help=f"database PRAGMA profile (default: OMS_DB_PROFILE or {DEFAULT_PROFILE})")
+    args = parser.parse_args()
+
+    if args.workers < 1 or args.batch_size < 1:
+        parser.error("--workers and --batch-size must be at least 1")
+
+    # Settlement only: no demo data
+    DatabaseManager.SEED_EMPTY_DB = False
+    if args.profile:
+        DatabaseManager.DB_PROFILE = args.profile
+    db_manager = DatabaseManager()
+
+    daemon = OrderDaemon(db_manager, workers=args.workers, policy=args.policy,
+                         batch_size=args.batch_size, poll_interval=args.poll_interval,
+                         status_file=args.status_file, status_interval=args.status_interval)
+    signal.signal(signal.SIGINT, daemon.stop)
+    signal.signal(signal.SIGTERM, daemon.stop)
+
+    try:
+        daemon.run()
+    finally:
+        db_manager.log_writer.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+from typing import Sequence, Tuple
+
+import numpy as np
+
+from processing.priority import (PREMIUM_MULTIPLIER, STANDARD_MULTIPLIER,
+                                 WAIT_GROWTH_SECONDS, QUANTITY_SCALE)
+
+
+def scoring_arrays(rows: Sequence[tuple]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """(order_ids, is_premium, wait_times, quantities) arrays of get_pending_order_scoring_rows()"""
+    if not rows:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=bool), np.zeros(0), np.zeros(0)
+    # One conversion for the whole result set, every column is numeric
+    table = np.array(rows, dtype=np.float64)
+    return table[:, 0].astype(np.int64), table[:, 1] != 0, table[:, 2], table[:, 3]
+
+
+def score_batch(customer_types, wait_times, quantities) -> np.ndarray:
+    """Priority scores of many orders in one pass, same model as priority.priority_score
+
+    customer_types holds customer type names or is_premium booleans.
+    """
+    customer_types = np.asarray(customer_types)
+    is_premium = customer_types if customer_types.dtype == bool else customer_types == "Premium"
+    type_multipliers = np.where(is_premium, PREMIUM_MULTIPLIER, STANDARD_MULTIPLIER)
+    wait_times = np.asarray(wait_times, dtype=np.float64)
+    quantities = np.asarray(quantities, dtype=np.float64)
+    return type_multipliers * (1.0 + wait_times / WAIT_GROWTH_SECONDS) * (1.0 + quantities / QUANTITY_SCALE)
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k highest scores, highest first (ties: lower index first)
+
+    argpartition selects the k candidates in O(n); only they are sorted.
+    """
+    scores = np.asarray(scores)
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.zeros(0, dtype=np.intp)
+    if k < len(scores):
+        # Everything tied with the k-th score is a candidate, so ties break by index
+        threshold = scores[np.argpartition(-scores, k - 1)[:k]].min()
+        candidates = np.flatnonzero(scores >= threshold)
+    else:
+        candidates = np.arange(len(scores))
+    order = np.lexsort((candidates, -scores[candidates]))
+    return candidates[order[:k]]
+
+
+def top_pending_orders(db_manager, k: int) -> list:
+    """Ids of the k highest scoring pending orders, scored in one NumPy pass"""
+    order_ids, is_premium, wait_times, quantities = scoring_arrays(db_manager.get_pending_order_scoring_rows())
+    return order_ids[top_k(score_batch(is_premium, wait_times, quantities), k)].tolist()
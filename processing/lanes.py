@@ -0,0 +1,137 @@
+import threading
+import time
+from typing import Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+from processing.worker_pool import WorkerPool
+
+
+class _DisjointSet:
+    """Union-find over conflict keys, with path halving"""
+
+    def __init__(self):
+        self._parent: Dict[Hashable, Hashable] = {}
+
+    def find(self, key: Hashable) -> Hashable:
+        self._parent.setdefault(key, key)
+        while True:
+            parent = self._parent[key]
+            if parent == key:
+                return key
+            grandparent = self._parent[parent]
+            self._parent[key] = grandparent
+            key = grandparent
+
+    def union(self, a: Hashable, b: Hashable):
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a != root_b:
+            self._parent[root_b] = root_a
+
+
+def build_lanes(orders: Iterable[Tuple[int, int, Iterable[int]]], max_lanes: int) -> List[List[int]]:
+    """Split (order_id, customer_id, product_ids) into at most max_lanes lanes
+
+    Orders sharing a product or a customer always land in the same lane, so
+    lanes never touch the same rows and can be settled in parallel. Each lane
+    keeps the input (priority) order.
+    """
+    orders = list(orders)
+    groups = _DisjointSet()
+    for order_id, customer_id, product_ids in orders:
+        for product_id in product_ids:
+            groups.union(("customer", customer_id), ("product", product_id))
+
+    # Connected components, by position in the input
+    components: Dict[Hashable, List[int]] = {}
+    for position, (_, customer_id, _) in enumerate(orders):
+        components.setdefault(groups.find(("customer", customer_id)), []).append(position)
+
+    # Largest component first into the least loaded lane
+    lanes: List[List[int]] = [[] for _ in range(max(1, min(max_lanes, len(components))))]
+    for positions in sorted(components.values(), key=len, reverse=True):
+        min(lanes, key=len).extend(positions)
+
+    return [[orders[position][0] for position in sorted(lane)] for lane in lanes if lane]
+
+
+class LaneScheduler:
+    """Settle pending orders in parallel lanes of non-conflicting orders
+
+    Every lane runs as one job on the worker pool and settles its orders in
+    priority order, `chunk_size` orders per transaction. Orders in different
+    lanes share no product and no customer.
+    """
+
+    def __init__(self, db_manager, worker_pool: WorkerPool, max_lanes: int = 4,
+                 chunk_size: int = 500):
+        self.db_manager = db_manager
+        self.worker_pool = worker_pool
+        self.max_lanes = max_lanes
+        self.chunk_size = chunk_size
+
+    def _settle_lane(self, order_ids: List[int], should_continue: Optional[Callable[[], bool]]) -> Tuple[int, int]:
+        success_count = 0
+        failed_count = 0
+        for start in range(0, len(order_ids), self.chunk_size):
+            if should_continue and not should_continue():
+                break
+            success, failed = self.db_manager.settle_orders(order_ids[start:start + self.chunk_size]) or (0, 0)
+            success_count += success
+            failed_count += failed
+        return success_count, failed_count
+
+    def run(self, lanes: List[List[int]], should_continue: Optional[Callable[[], bool]] = None) -> Tuple[int, int]:
+        """Settle the lanes in parallel, returns (success_count, failed_count)"""
+        done = threading.Condition()
+        results = {}
+        started = set()
+
+        def _lane_job(lane: int):
+            with done:
+                # Abandoned after a stop request
+                if lane in results:
+                    return
+                started.add(lane)
+            try:
+                result = self._settle_lane(lanes[lane], should_continue)
+            except Exception as e:
+                print(f"Error in settlement lane: {e}")
+                result = (0, 0)
+            with done:
+                results[lane] = result
+                done.notify()
+
+        for lane in range(len(lanes)):
+            # Pool full or shut down: the lane runs on the calling thread
+            if not self.worker_pool.submit(_lane_job, lane, block=False):
+                _lane_job(lane)
+
+        with done:
+            while len(results) < len(lanes):
+                done.wait(0.1)
+                if should_continue and not should_continue():
+                    # Queued lanes may have been cancelled: do not wait for them
+                    for lane in range(len(lanes)):
+                        if lane not in started:
+                            results.setdefault(lane, (0, 0))
+
+        return sum(result[0] for result in results.values()), sum(result[1] for result in results.values())
+
+    def settle_pending_orders(self, should_continue: Optional[Callable[[], bool]] = None) -> Tuple[int, int]:
+        """Expire stale reservations, then settle every pending order, returns (success_count, failed_count)"""
+        started = time.perf_counter()
+        self.db_manager.expire_reservations()
+        orders = self.db_manager.get_pending_order_conflict_keys()
+        lanes = build_lanes(orders, self.max_lanes)
+        success_count, failed_count = self.run(lanes, should_continue)
+
+        if orders:
+            self.db_manager.add_log(None, "System", None, None, None, (
+                f"Lane settlement completed | "
+                f"Total: {len(orders)} | "
+                f"Success: {success_count} | "
+                f"Failed: {failed_count} | "
+                f"Lanes: {len(lanes)} | "
+                f"Time: {time.perf_counter() - started:.2f}s"
+            ))
+
+        return success_count, failed_count
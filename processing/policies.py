@@ -0,0 +1,188 @@
+import time
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, List, Optional, Type
+
+from processing.priority import base_priority
+from processing.scheduler import IndexedHeap, OrderScheduler
+
+# Earliest-deadline: an order should be settled this many seconds after placement
+DEADLINES = {"Premium": 600.0, "Standard": 3600.0}
+
+# Weighted fair queuing: share of settlements per customer, by customer type
+FAIR_SHARE_WEIGHTS = {"Premium": 2.0, "Standard": 1.0}
+
+
+class PriorityPolicy(ABC):
+    """Dispatch order of pending orders
+
+    A policy is a queue: orders are added once, pop() returns the next
+    order to settle at time `now`. Not thread-safe; one dispatcher owns it.
+    """
+
+    name = ""
+
+    def __init__(self, clock: Callable[[], float] = time.time):
+        self._clock = clock
+        self.last_order_id = 0  # Highest order id fed from the database
+
+    @abstractmethod
+    def add(self, order_id: int, customer_id: int, customer_type: str, quantity: int,
+            enqueued_at: Optional[float] = None):
+        """Queue an order, enqueued_at defaults to now"""
+
+    @abstractmethod
+    def remove(self, order_id: int) -> bool:
+        """Drop a queued order, False if it is not queued"""
+
+    @abstractmethod
+    def pop(self, now: Optional[float] = None) -> Optional[int]:
+        """Next order to settle at `now`, None when empty"""
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """Number of queued orders"""
+
+    def pop_batch(self, count: int, now: Optional[float] = None) -> List[int]:
+        """Up to `count` orders in dispatch order"""
+        now = self._clock() if now is None else now
+        batch = []
+        while len(batch) < count:
+            order_id = self.pop(now)
+            if order_id is None:
+                break
+            batch.append(order_id)
+        return batch
+
+    def sync(self, db_manager, limit: int = 10000) -> int:
+        """Queue pending orders placed since the last sync, returns how many were added"""
+        added = 0
+        while True:
+            rows = db_manager.get_pending_orders_after(self.last_order_id, limit)
+            now = self._clock()
+            for order_id, customer_id, customer_type, quantity, _, wait_time in rows:
+                self.add(order_id, customer_id, customer_type, quantity, now - wait_time)
+                self.last_order_id = max(self.last_order_id, order_id)
+            added += len(rows)
+            if len(rows) < limit:
+                return added
+
+
+class WeightedScorePolicy(PriorityPolicy):
+    """Highest processing/priority.py score first: type, wait time aging and quantity"""
+
+    name = "weighted"
+
+    def __init__(self, clock: Callable[[], float] = time.time):
+        super().__init__(clock)
+        self._scheduler = OrderScheduler(clock)
+
+    def add(self, order_id, customer_id, customer_type, quantity, enqueued_at=None):
+        self._scheduler.add(order_id, base_priority(customer_type, quantity), enqueued_at)
+
+    def remove(self, order_id):
+        return self._scheduler.remove(order_id)
+
+    def pop(self, now=None):
+        return self._scheduler.pop(now)
+
+    def __len__(self):
+        return len(self._scheduler)
+
+
+class _HeapPolicy(PriorityPolicy):
+    """Policies whose order is fixed when the order is added"""
+
+    def __init__(self, clock: Callable[[], float] = time.time):
+        super().__init__(clock)
+        self._heap = IndexedHeap()
+
+    @abstractmethod
+    def _key(self, order_id, customer_id, customer_type, quantity, enqueued_at):
+        """Heap key of an order, the smallest key goes first"""
+
+    def add(self, order_id, customer_id, customer_type, quantity, enqueued_at=None):
+        if enqueued_at is None:
+            enqueued_at = self._clock()
+        self._heap.push(order_id, self._key(order_id, customer_id, customer_type, quantity, enqueued_at))
+
+    def remove(self, order_id):
+        return self._heap.remove(order_id)
+
+    def pop(self, now=None):
+        if not self._heap:
+            return None
+        return self._heap.pop()[0]
+
+    def __len__(self):
+        return len(self._heap)
+
+
+class StrictClassPolicy(_HeapPolicy):
+    """Every Premium order before any Standard order, oldest first within a class"""
+
+    name = "strict-class"
+
+    def _key(self, order_id, customer_id, customer_type, quantity, enqueued_at):
+        return (0 if customer_type == "Premium" else 1, enqueued_at, order_id)
+
+
+class EarliestDeadlinePolicy(_HeapPolicy):
+    """Earliest deadline first, deadline = placement + DEADLINES[customer type]"""
+
+    name = "edf"
+
+    def __init__(self, clock: Callable[[], float] = time.time, deadlines: Optional[Dict[str, float]] = None):
+        super().__init__(clock)
+        self.deadlines = deadlines or DEADLINES
+
+    def _key(self, order_id, customer_id, customer_type, quantity, enqueued_at):
+        return (enqueued_at + self.deadlines.get(customer_type, self.deadlines["Standard"]), order_id)
+
+
+class WeightedFairQueuingPolicy(_HeapPolicy):
+    """Weighted fair queuing across customers (self-clocked)
+
+    Every order gets a virtual finish tag: max(virtual time, the customer's
+    last tag) + 1 / weight. The smallest tag goes first and becomes the new
+    virtual time, so a customer with many orders cannot crowd out the others
+    and a Premium customer gets twice the share of a Standard one.
+    """
+
+    name = "wfq"
+
+    def __init__(self, clock: Callable[[], float] = time.time, weights: Optional[Dict[str, float]] = None):
+        super().__init__(clock)
+        self.weights = weights or FAIR_SHARE_WEIGHTS
+        self._virtual_time = 0.0
+        self._last_finish: Dict[int, float] = {}
+
+    def _key(self, order_id, customer_id, customer_type, quantity, enqueued_at):
+        start = max(self._virtual_time, self._last_finish.get(customer_id, 0.0))
+        finish = start + 1.0 / self.weights.get(customer_type, self.weights["Standard"])
+        self._last_finish[customer_id] = finish
+        return (finish, order_id)
+
+    def pop(self, now=None):
+        if not self._heap:
+            return None
+        order_id, (finish, _) = self._heap.pop()
+        self._virtual_time = finish
+        return order_id
+
+
+POLICIES: Dict[str, Type[PriorityPolicy]] = {
+    policy.name: policy
+    for policy in (WeightedScorePolicy, StrictClassPolicy, EarliestDeadlinePolicy, WeightedFairQueuingPolicy)
+}
+
+DEFAULT_POLICY = WeightedScorePolicy.name
+
+
+def create_policy(name: str, clock: Callable[[], float] = time.time) -> PriorityPolicy:
+    """Instantiate a policy by name"""
+    try:
+        policy = POLICIES[name]
+    except KeyError:
+        raise ValueError(f"Unknown priority policy '{name}', "
+                         f"expected one of {', '.join(POLICIES)}")
+    return policy(clock)
@@ -0,0 +1,31 @@
+# Order priority model, shared by the admin panel, batch settlement and the
+# SQL ordering of pending orders:
+#
+#   score = base_priority * (1 + wait_time / WAIT_GROWTH_SECONDS)
+#   base_priority = type multiplier (Premium 2x) * (1 + quantity / QUANTITY_SCALE)
+#
+# base_priority is fixed when the order is placed and stored in
+# orders.base_priority; only the wait time term changes afterwards.
+
+PREMIUM_MULTIPLIER = 2.0
+STANDARD_MULTIPLIER = 1.0
+WAIT_GROWTH_SECONDS = 3600.0  # +1x per hour waited
+QUANTITY_SCALE = 100.0
+
+# Wait time (seconds) and score of a pending order row aliased `o`
+SQL_WAIT_TIME = "ROUND((julianday('now') - julianday(o.order_time)) * 86400)"
+SQL_PRIORITY_SCORE = f"o.base_priority * (1.0 + {SQL_WAIT_TIME} / {WAIT_GROWTH_SECONDS})"
+
+
+def type_multiplier(customer_type: str) -> float:
+    return PREMIUM_MULTIPLIER if customer_type == "Premium" else STANDARD_MULTIPLIER
+
+
+def base_priority(customer_type: str, quantity: int) -> float:
+    """Time independent part of the score, stored with the order"""
+    return type_multiplier(customer_type) * (1.0 + quantity / QUANTITY_SCALE)
+
+
+def priority_score(customer_type: str, wait_time: float, quantity: int) -> float:
+    """Priority score of an order that has waited wait_time seconds, higher goes first"""
+    return base_priority(customer_type, quantity) * (1.0 + wait_time / WAIT_GROWTH_SECONDS)
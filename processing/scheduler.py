@@ -0,0 +1,195 @@
+import time
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+
+from processing.priority import WAIT_GROWTH_SECONDS
+
+
+class IndexedHeap:
+    """Binary min-heap of (priority, key) with a key -> position index
+
+    push, remove and update of any key are O(log n), peek is O(1).
+    """
+
+    def __init__(self):
+        self._heap: List[Tuple[object, Hashable]] = []
+        self._position: Dict[Hashable, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._position
+
+    def priority(self, key: Hashable):
+        return self._heap[self._position[key]][0]
+
+    def push(self, key: Hashable, priority):
+        """Insert a key, or change its priority if it is already queued"""
+        if key in self._position:
+            self.update(key, priority)
+            return
+        self._heap.append((priority, key))
+        self._position[key] = len(self._heap) - 1
+        self._sift_up(len(self._heap) - 1)
+
+    def update(self, key: Hashable, priority):
+        index = self._position[key]
+        old_priority = self._heap[index][0]
+        self._heap[index] = (priority, key)
+        if priority < old_priority:
+            self._sift_up(index)
+        else:
+            self._sift_down(index)
+
+    def remove(self, key: Hashable) -> bool:
+        index = self._position.pop(key, None)
+        if index is None:
+            return False
+        last = self._heap.pop()
+        if index < len(self._heap):
+            self._heap[index] = last
+            self._position[last[1]] = index
+            self._sift_up(index)
+            self._sift_down(index)
+        return True
+
+    def peek(self) -> Tuple[Hashable, object]:
+        priority, key = self._heap[0]
+        return key, priority
+
+    def pop(self) -> Tuple[Hashable, object]:
+        key, priority = self.peek()
+        self.remove(key)
+        return key, priority
+
+    def _swap(self, i: int, j: int):
+        heap = self._heap
+        heap[i], heap[j] = heap[j], heap[i]
+        self._position[heap[i][1]] = i
+        self._position[heap[j][1]] = j
+
+    def _sift_up(self, index: int):
+        heap = self._heap
+        while index > 0:
+            parent = (index - 1) // 2
+            if heap[index] < heap[parent]:
+                self._swap(index, parent)
+                index = parent
+            else:
+                break
+
+    def _sift_down(self, index: int):
+        heap = self._heap
+        size = len(heap)
+        while True:
+            smallest = index
+            for child in (2 * index + 1, 2 * index + 2):
+                if child < size and heap[child] < heap[smallest]:
+                    smallest = child
+            if smallest == index:
+                return
+            self._swap(index, smallest)
+            index = smallest
+
+
+class OrderScheduler:
+    """Long-lived dispatch queue of pending orders with wait time aging
+
+    Scores follow processing/priority.py: base_priority * (1 + wait / 3600).
+    Orders are grouped by base_priority; inside a group the oldest order
+    always scores highest, so each group is an IndexedHeap on enqueue time
+    that never has to be re-keyed as orders age. Scores are only evaluated
+    at dispatch, for the head of each group (lazy aging): add, remove and
+    reprioritize are O(log n), pop is O(log n + B) for B distinct base
+    priorities.
+
+    Not thread-safe; one dispatcher owns it.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.time):
+        self._clock = clock
+        self._groups: Dict[float, IndexedHeap] = {}
+        self._base: Dict[int, float] = {}  # order_id -> base_priority
+        self.last_order_id = 0  # Highest order id fed from the database
+
+    def __len__(self) -> int:
+        return len(self._base)
+
+    def __contains__(self, order_id: int) -> bool:
+        return order_id in self._base
+
+    def add(self, order_id: int, base_priority: float, enqueued_at: Optional[float] = None):
+        """Queue an order; an already queued order is moved to the new base priority"""
+        if enqueued_at is None:
+            enqueued_at = self._clock()
+        if order_id in self._base:
+            self.reprioritize(order_id, base_priority)
+            return
+        self._base[order_id] = base_priority
+        self._groups.setdefault(base_priority, IndexedHeap()).push(order_id, (enqueued_at, order_id))
+
+    def remove(self, order_id: int) -> bool:
+        base_priority = self._base.pop(order_id, None)
+        if base_priority is None:
+            return False
+        group = self._groups[base_priority]
+        group.remove(order_id)
+        if not group:
+            del self._groups[base_priority]
+        return True
+
+    def reprioritize(self, order_id: int, base_priority: float):
+        """Change the base priority of a queued order, keeping its enqueue time"""
+        old_base = self._base[order_id]
+        if old_base == base_priority:
+            return
+        enqueued_at, _ = self._groups[old_base].priority(order_id)
+        self.remove(order_id)
+        self.add(order_id, base_priority, enqueued_at)
+
+    def score(self, order_id: int, now: Optional[float] = None) -> float:
+        now = self._clock() if now is None else now
+        base_priority = self._base[order_id]
+        enqueued_at, _ = self._groups[base_priority].priority(order_id)
+        return base_priority * (1.0 + max(0.0, now - enqueued_at) / WAIT_GROWTH_SECONDS)
+
+    def peek(self, now: Optional[float] = None) -> Optional[int]:
+        """Highest scoring order right now (ties: lowest order id), None when empty"""
+        now = self._clock() if now is None else now
+        best = None
+        for base_priority, group in self._groups.items():
+            order_id, (enqueued_at, _) = group.peek()
+            rank = (-base_priority * (1.0 + max(0.0, now - enqueued_at) / WAIT_GROWTH_SECONDS), order_id)
+            if best is None or rank < best:
+                best = rank
+        return None if best is None else best[1]
+
+    def pop(self, now: Optional[float] = None) -> Optional[int]:
+        order_id = self.peek(now)
+        if order_id is not None:
+            self.remove(order_id)
+        return order_id
+
+    def pop_batch(self, count: int, now: Optional[float] = None) -> List[int]:
+        """Up to `count` orders, highest score first"""
+        now = self._clock() if now is None else now
+        batch = []
+        while len(batch) < count:
+            order_id = self.pop(now)
+            if order_id is None:
+                break
+            batch.append(order_id)
+        return batch
+
+    def sync(self, db_manager, limit: int = 10000) -> int:
+        """Queue pending orders placed since the last sync, returns how many were added"""
+        added = 0
+        while True:
+            rows = db_manager.get_pending_orders_after(self.last_order_id, limit)
+            now = self._clock()
+            for order_id, _, _, _, base_priority, wait_time in rows:
+                self.add(order_id, base_priority, now - wait_time)
+                self.last_order_id = max(self.last_order_id, order_id)
+            added += len(rows)
+            if len(rows) < limit:
+                return added
@@ -0,0 +1,145 @@
+import argparse
+import random
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from processing.policies import POLICIES, create_policy
+
+# (order_id, customer_id, customer_type, quantity, placed_at)
+Order = Tuple[int, int, str, int, float]
+
+
+def synthetic_stream(count: int, customers: int = 200, premium_share: float = 0.3,
+                     rate: float = 1.0, seed: Optional[int] = None) -> List[Order]:
+    """Poisson arrivals at `rate` orders/s; a few heavy customers place most of the orders"""
+    rng = random.Random(seed)
+    customer_types = {customer_id: "Premium" if rng.random() < premium_share else "Standard"
+                      for customer_id in range(1, customers + 1)}
+    # Zipf-like activity: customer n orders about 1/n as often as customer 1
+    weights = [1.0 / rank for rank in range(1, customers + 1)]
+    rng.shuffle(weights)
+
+    stream = []
+    placed_at = 0.0
+    for order_id, customer_id in enumerate(rng.choices(range(1, customers + 1), weights, k=count), 1):
+        placed_at += rng.expovariate(rate)
+        stream.append((order_id, customer_id, customer_types[customer_id], rng.randint(1, 20), placed_at))
+    return stream
+
+
+def _percentile(values: Sequence[float], percent: float) -> float:
+    """Nearest-rank percentile of sorted values"""
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(round(percent / 100.0 * (len(values) - 1))))]
+
+
+def simulate(policy_name: str, stream: Sequence[Order], service_time: float,
+             starvation_after: float = 3600.0) -> Dict:
+    """Replay a stream through one policy with a single settlement server
+
+    Orders arrive at their placed_at time, the server settles one order
+    every service_time seconds and asks the policy for the next one.
+    Returns wait time statistics per customer type and the policy's own
+    dispatch throughput (wall clock, add + pop).
+    """
+    stream = sorted(stream, key=lambda order: (order[4], order[0]))
+    orders = {order[0]: order for order in stream}
+    now = stream[0][4] if stream else 0.0
+    policy = create_policy(policy_name, clock=lambda: now)
+
+    waits = defaultdict(list)
+    next_arrival = 0
+    started = time.perf_counter()
+    while next_arrival < len(stream) or len(policy):
+        if not len(policy) and stream[next_arrival][4] > now:
+            now = stream[next_arrival][4]  # Server idle until the next arrival
+        while next_arrival < len(stream) and stream[next_arrival][4] <= now:
+            order_id, customer_id, customer_type, quantity, placed_at = stream[next_arrival]
+            policy.add(order_id, customer_id, customer_type, quantity, placed_at)
+            next_arrival += 1
+
+        order_id = policy.pop(now)
+        _, _, customer_type, _, placed_at = orders[order_id]
+        waits[customer_type].append(now - placed_at)
+        now += service_time
+    elapsed = time.perf_counter() - started
+
+    per_type = {}
+    for customer_type, values in sorted(waits.items()):
+        values.sort()
+        per_type[customer_type] = {
+            "orders": len(values),
+            "p50_wait": _percentile(values, 50),
+            "p99_wait": _percentile(values, 99),
+            "max_wait": values[-1],
+            "starved": sum(1 for value in values if value > starvation_after),
+        }
+    return {
+        "policy": policy_name,
+        "orders": len(stream),
+        "throughput": len(stream) / elapsed if elapsed > 0 else 0.0,
+        "per_type": per_type,
+    }
+
+
+def service_time_for_load(stream: Sequence[Order], load: float) -> float:
+    """Service time that keeps the server `load` busy over the stream's span"""
+    if len(stream) < 2:
+        return 1.0
+    span = max(order[4] for order in stream) - min(order[4] for order in stream)
+    return load * span / (len(stream) - 1) if span > 0 else 1.0
+
+
+def print_report(results: List[Dict], starvation_after: float):
+    print(f"{'policy':<14}{'type':<10}{'orders':>8}{'p50 wait':>12}{'p99 wait':>12}"
+          f"{'max wait':>12}{'starved':>9}{'dispatch/s':>12}")
+    for result in results:
+        for customer_type, stats in result["per_type"].items():
+            print(f"{result['policy']:<14}{customer_type:<10}{stats['orders']:>8}"
+                  f"{stats['p50_wait']:>11.0f}s{stats['p99_wait']:>11.0f}s{stats['max_wait']:>11.0f}s"
+                  f"{stats['starved']:>9}{result['throughput']:>12.0f}")
+    print(f"starved: waited longer than {starvation_after:.0f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay an order stream through the priority policies")
+    parser.add_argument("--policy", default="all", choices=["all"] + sorted(POLICIES),
+                        help="policy to simulate (default: all)")
+    parser.add_argument("--from-db", action="store_true",
+                        help="replay every order in the database instead of a synthetic stream")
+    parser.add_argument("--orders", type=int, default=20000, help="synthetic stream length")
+    parser.add_argument("--customers", type=int, default=200, help="synthetic customer count")
+    parser.add_argument("--premium-share", type=float, default=0.3, help="share of Premium customers")
+    parser.add_argument("--seed", type=int, default=1, help="synthetic stream seed")
+    parser.add_argument("--load", type=float, default=0.95,
+                        help="server utilization, above 1 the backlog keeps growing (default: 0.95)")
+    parser.add_argument("--service-time", type=float, default=None,
+                        help="seconds per settled order (default: derived from --load)")
+    parser.add_argument("--starvation-after", type=float, default=3600.0,
+                        help="wait in seconds that counts as starvation (default: 3600)")
+    args = parser.parse_args()
+
+    if args.from_db:
+        from database.db_manager import DatabaseManager
+        DatabaseManager.SEED_EMPTY_DB = False
+        db_manager = DatabaseManager()
+        stream = db_manager.get_order_stream()
+        db_manager.log_writer.close()
+    else:
+        stream = synthetic_stream(args.orders, customers=args.customers,
+                                  premium_share=args.premium_share, seed=args.seed)
+    if not stream:
+        print("No orders to replay")
+        return
+
+    service_time = args.service_time or service_time_for_load(stream, args.load)
+    print(f"Replaying {len(stream)} orders, {service_time:.3f}s per order")
+    policies = sorted(POLICIES) if args.policy == "all" else [args.policy]
+    print_report([simulate(name, stream, service_time, args.starvation_after) for name in policies],
+                 args.starvation_after)
+
+
+if __name__ == "__main__":
+    main()
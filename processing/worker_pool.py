@@ -0,0 +1,156 @@
+import threading
+import time
+from queue import Queue, Empty, Full
+from typing import Callable, Dict, List, Optional
+
+
+class _WorkerStats:
+    """Per-worker counters, only written by the owning worker thread"""
+    def __init__(self, name: str):
+        self.name = name
+        self.completed = 0
+        self.failed = 0
+        self.busy_time = 0.0
+        self.current_job: Optional[str] = None
+        self.last_error: Optional[str] = None
+
+
+class WorkerPool:
+    """Fixed-size worker pool with a bounded work queue"""
+
+    _STOP = object()  # Shutdown sentinel
+
+    def __init__(self, max_workers: int = 8, max_queue_size: int = 1000, name: str = "worker"):
+        self.max_workers = max_workers
+        self._queue = Queue(maxsize=max_queue_size)
+        self._lock = threading.Lock()
+        self._is_shutdown = False
+        self._cancelled = 0
+        self._workers: List[threading.Thread] = []
+        self._stats: List[_WorkerStats] = []
+
+        for i in range(max_workers):
+            stats = _WorkerStats(f"{name}-{i + 1}")
+            thread = threading.Thread(target=self._worker_loop, args=(stats,),
+                                      name=stats.name, daemon=True)
+            self._stats.append(stats)
+            self._workers.append(thread)
+            thread.start()
+
+    def submit(self, func: Callable, *args, block: bool = True,
+               timeout: Optional[float] = None, **kwargs) -> bool:
+        """Queue a job, blocking while the queue is full (back-pressure)
+
+        Returns False if the pool is shut down or the queue stayed full.
+        """
+        if self._is_shutdown:
+            return False
+        try:
+            self._queue.put((func, args, kwargs), block=block, timeout=timeout)
+            return True
+        except Full:
+            return False
+
+    def cancel_pending(self) -> int:
+        """Drop all queued (not yet started) jobs, returns how many were dropped"""
+        dropped = 0
+        while True:
+            try:
+                job = self._queue.get_nowait()
+            except Empty:
+                break
+            if job is self._STOP:
+                # Keep shutdown sentinels for the workers
+                self._queue.put_nowait(job)
+                break
+            self._queue.task_done()
+            dropped += 1
+
+        with self._lock:
+            self._cancelled += dropped
+        return dropped
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every queued job has finished"""
+        if timeout is None:
+            self._queue.join()
+            return True
+
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def shutdown(self, wait: bool = True, cancel_pending: bool = False,
+                 timeout: Optional[float] = None):
+        """Stop accepting jobs and stop the workers once the queue drains"""
+        if self._is_shutdown:
+            return
+        self._is_shutdown = True
+
+        if cancel_pending:
+            self.cancel_pending()
+
+        for _ in self._workers:
+            self._queue.put(self._STOP)
+
+        if wait:
+            for thread in self._workers:
+                thread.join(timeout=timeout)
+
+    def pending_count(self) -> int:
+        """Number of queued jobs not yet picked up by a worker"""
+        return self._queue.qsize()
+
+    def busy_count(self) -> int:
+        """Number of workers currently running a job"""
+        return sum(1 for stats in self._stats if stats.current_job is not None)
+
+    def get_stats(self) -> List[Dict]:
+        """Snapshot of per-worker statistics"""
+        return [{
+            "worker": stats.name,
+            "completed": stats.completed,
+            "failed": stats.failed,
+            "busy_time": round(stats.busy_time, 3),
+            "current_job": stats.current_job,
+            "last_error": stats.last_error
+        } for stats in self._stats]
+
+    def get_summary(self) -> Dict:
+        """Pool-wide totals"""
+        with self._lock:
+            cancelled = self._cancelled
+        return {
+            "workers": self.max_workers,
+            "busy": self.busy_count(),
+            "queued": self.pending_count(),
+            "completed": sum(stats.completed for stats in self._stats),
+            "failed": sum(stats.failed for stats in self._stats),
+            "cancelled": cancelled
+        }
+
+    def _worker_loop(self, stats: _WorkerStats):
+        """Run jobs until the shutdown sentinel arrives"""
+        while True:
+            job = self._queue.get()
+            if job is self._STOP:
+                self._queue.task_done()
+                return
+
+            func, args, kwargs = job
+            stats.current_job = getattr(func, "__name__", repr(func))
+            started = time.perf_counter()
+            try:
+                func(*args, **kwargs)
+                stats.completed += 1
+            except Exception as e:
+                print(f"Error in {stats.name}: {e}")
+                stats.failed += 1
+                stats.last_error = str(e)
+            finally:
+                stats.busy_time += time.perf_counter() - started
+                stats.current_job = None
+                self._queue.task_done()
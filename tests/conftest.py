@@ -0,0 +1,40 @@
+import os
+import sys
+
+import pytest
+
+# Tests import the top-level packages (database, processing, ...) from the repo root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.db_manager import DatabaseManager  # noqa: E402
+
+# Every test customer starts with this budget (the fixtures pick random ones)
+BUDGET = 1000.0
+
+
+@pytest.fixture
+def db_manager(tmp_path, monkeypatch):
+    """DatabaseManager on a fresh database in tmp_path
+
+    The demo products of database/fixtures.py (Product1-5, ids 1-5) and four
+    customers (ids 1-4) with a budget of BUDGET each. DatabaseManager is a
+    singleton on ./user_database.db, so every test gets its own instance.
+    """
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(DatabaseManager, "_instance", None)
+    monkeypatch.setattr(DatabaseManager, "SEED_EMPTY_DB", False)
+    db_manager = DatabaseManager()
+    db_manager.load_fixtures(customers=4)
+    db_manager.execute_transaction(lambda conn: conn.execute("UPDATE customers SET budget = ?", (BUDGET,)))
+    yield db_manager
+    db_manager.log_writer.close()
+    db_manager._connection_pool.close()
+    db_manager._read_connection_pool.close()
+
+
+@pytest.fixture
+def query(db_manager):
+    """query(sql, *params) -> all rows, read on a snapshot"""
+    def _query(sql, *params):
+        return db_manager.execute_read(lambda conn: conn.execute(sql, params).fetchall())
+    return _query
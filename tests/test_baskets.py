@@ -0,0 +1,74 @@
+def expire(db_manager, order_id: int):
+    """Let an order's stock reservations run out"""
+    db_manager.execute_transaction(lambda conn: conn.execute(
+        "UPDATE stock_reservations SET expires_at = datetime('now', '-1 seconds') WHERE order_id = ?",
+        (order_id,)))
+    db_manager.expire_reservations()
+
+
+def test_process_order_settles_every_line_at_once(db_manager, query):
+    order_id = db_manager.place_basket_order(1, [(1, 2), (3, 4), (1, 1)])
+
+    assert db_manager.process_order(order_id)
+    assert query("SELECT status FROM orders WHERE order_id = ?", order_id) == [("processed",)]
+    assert query("SELECT product_id, stock, reserved FROM products WHERE product_id IN (1, 3)") == [
+        (1, 497, 0), (3, 196, 0),
+    ]
+    assert query("SELECT budget, held, total_spent FROM customers WHERE customer_id = 1") == [(520.0, 0.0, 480.0)]
+
+
+def test_basket_with_an_unavailable_line_places_nothing(db_manager, query):
+    # Product2 has 10 in stock
+    assert db_manager.place_basket_order(1, [(1, 1), (2, 11)]) is None
+    assert db_manager.place_basket_order(1, [(1, 1), (99, 1)]) is None
+
+    assert query("SELECT COUNT(*) FROM orders") == [(0,)]
+    assert query("SELECT COUNT(*) FROM stock_reservations") == [(0,)]
+    assert query("SELECT SUM(reserved) FROM products") == [(0,)]
+
+
+def test_basket_rolls_back_when_placement_fails_midway(db_manager, query, monkeypatch):
+    def fail(*args):
+        raise RuntimeError("disk full")
+    # Header, lines and reservations are written before the budget hold
+    monkeypatch.setattr(db_manager, "_hold_budget", fail)
+
+    assert db_manager.place_basket_order(1, [(1, 1), (3, 1)]) is None
+    assert query("SELECT COUNT(*) FROM orders") == [(0,)]
+    assert query("SELECT COUNT(*) FROM order_lines") == [(0,)]
+    assert query("SELECT COUNT(*) FROM stock_reservations") == [(0,)]
+    assert query("SELECT SUM(reserved) FROM products") == [(0,)]
+
+
+def test_delete_product_is_refused_while_pending_orders_reserve_it(db_manager, query):
+    order_id = db_manager.place_basket_order(1, [(1, 1), (2, 1)])
+
+    assert not db_manager.delete_product(2)
+    assert query("SELECT COUNT(*) FROM products WHERE product_id = 2") == [(1,)]
+
+    expire(db_manager, order_id)
+    assert db_manager.delete_product(2)
+
+
+def test_process_order_fails_a_basket_whose_product_was_deleted(db_manager, query):
+    order_id = db_manager.place_basket_order(1, [(1, 1), (2, 1)])
+    expire(db_manager, order_id)
+    db_manager.delete_product(2)
+
+    assert not db_manager.process_order(order_id)
+    assert query("SELECT status FROM orders WHERE order_id = ?", order_id) == [("failed",)]
+    assert query("SELECT stock, reserved FROM products WHERE product_id = 1") == [(500, 0)]
+    assert query("SELECT budget, held, total_spent FROM customers WHERE customer_id = 1") == [(1000.0, 0.0, 0.0)]
+    assert query("SELECT status FROM budget_holds WHERE order_id = ?", order_id) == [("released",)]
+
+
+def test_settle_orders_fails_a_basket_whose_product_was_deleted(db_manager, query):
+    broken = db_manager.place_basket_order(1, [(1, 1), (2, 1)])
+    other = db_manager.place_basket_order(1, [(1, 2)])
+    expire(db_manager, broken)
+    db_manager.delete_product(2)
+
+    assert db_manager.settle_orders([broken, other]) == (1, 1)
+    assert dict(query("SELECT order_id, status FROM orders")) == {broken: "failed", other: "processed"}
+    assert query("SELECT stock, reserved FROM products WHERE product_id = 1") == [(498, 0)]
+    assert query("SELECT budget, held, total_spent FROM customers WHERE customer_id = 1") == [(800.0, 0.0, 200.0)]
@@ -0,0 +1,65 @@
+import random
+
+import numpy as np
+import pytest
+
+from processing.batch_scoring import score_batch, scoring_arrays, top_k, top_pending_orders
+from processing.priority import priority_score
+
+
+def random_rows(seed: int, count: int) -> list:
+    """(customer_type, wait_time, quantity) with few distinct values, so scores tie often"""
+    rng = random.Random(seed)
+    return [(rng.choice(["Premium", "Standard"]), float(rng.choice([0, 60, 3600, 7200])), rng.randint(1, 4))
+            for _ in range(count)]
+
+
+def scalar_top(rows: list, k: int) -> list:
+    """Indices of the k highest priority_score rows, ties: lower index first"""
+    scores = [priority_score(*row) for row in rows]
+    return sorted(range(len(rows)), key=lambda index: (-scores[index], index))[:k]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_score_batch_matches_priority_score(seed):
+    rows = random_rows(seed, 500)
+    customer_types, wait_times, quantities = zip(*rows)
+
+    expected = [priority_score(*row) for row in rows]
+    np.testing.assert_allclose(score_batch(customer_types, wait_times, quantities), expected, rtol=1e-12)
+    # is_premium booleans score the same as type names
+    np.testing.assert_allclose(score_batch(np.array(customer_types) == "Premium", wait_times, quantities),
+                               expected, rtol=1e-12)
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("k", [0, 1, 7, 100, 499, 500, 1000])
+def test_top_k_matches_scalar_sort_with_ties(seed, k):
+    rows = random_rows(seed, 500)
+    customer_types, wait_times, quantities = zip(*rows)
+
+    assert top_k(score_batch(customer_types, wait_times, quantities), k).tolist() == scalar_top(rows, k)
+
+
+def test_top_k_breaks_ties_by_index():
+    scores = np.array([1.0, 3.0, 2.0, 3.0, 3.0, 2.0])
+
+    assert top_k(scores, 2).tolist() == [1, 3]
+    assert top_k(scores, 4).tolist() == [1, 3, 4, 2]
+    assert top_k(np.array([]), 3).tolist() == []
+
+
+def test_top_pending_orders_matches_scalar_ranking_of_pending_orders(db_manager):
+    db_manager.execute_transaction(lambda conn: conn.execute(
+        "UPDATE customers SET customer_type = CASE WHEN customer_id <= 2 THEN 'Premium' ELSE 'Standard' END"))
+    # Distinct base priorities, the settled order is not ranked
+    settled = db_manager.place_basket_order(1, [(1, 9)])
+    for customer_id, quantity in [(1, 1), (2, 4), (3, 8), (4, 2), (3, 5)]:
+        db_manager.place_basket_order(customer_id, [(3, quantity)])
+    db_manager.settle_orders([settled])
+
+    pending = db_manager.get_pending_orders()
+    expected = sorted(pending, key=lambda order: -priority_score(order[2], order[7], order[5]))
+    assert top_pending_orders(db_manager, 3) == [order[0] for order in expected[:3]]
+    assert sorted(scoring_arrays(db_manager.get_pending_order_scoring_rows())[0].tolist()) == \
+        sorted(order[0] for order in pending)
@@ -0,0 +1,46 @@
+def test_place_orders_bulk_returns_one_result_per_order(db_manager, query):
+    results = db_manager.place_orders_bulk([
+        (1, 1, 2),      # accepted
+        (1, 1, 0),      # invalid quantity
+        (1, 99, 1),     # unknown product
+        (99, 1, 1),     # unknown customer
+        (2, 5, 1),      # Product5 has no stock
+        (3, 1, 11),     # 11 * 100 over the 1000 budget
+        (4, 3, 1),      # accepted
+    ])
+
+    assert [result["reason"] for result in results] == [
+        None, "Invalid quantity", "Unknown product", "Unknown customer",
+        "Insufficient stock", "Insufficient budget", None,
+    ]
+    accepted = [result["order_id"] for result in results if result["accepted"]]
+    assert all(result["order_id"] is None for result in results if not result["accepted"])
+    assert query("SELECT order_id, customer_id, product_id, quantity FROM orders ORDER BY order_id") == [
+        (accepted[0], 1, 1, 2), (accepted[1], 4, 3, 1),
+    ]
+    assert query("SELECT order_id, product_id, quantity FROM order_lines ORDER BY order_id") == [
+        (accepted[0], 1, 2), (accepted[1], 3, 1),
+    ]
+
+
+def test_later_orders_in_a_batch_only_see_what_is_left(db_manager, query):
+    # Product2: 10 in stock, 50 each; budget 1000
+    results = db_manager.place_orders_bulk([(1, 2, 6), (2, 2, 6), (2, 2, 4), (3, 1, 9), (3, 1, 1), (3, 1, 1)])
+
+    assert [result["reason"] for result in results] == [
+        None, "Insufficient stock", None, None, None, "Insufficient budget",
+    ]
+    assert query("SELECT stock, reserved FROM products WHERE product_id = 2") == [(10, 10)]
+    assert query("SELECT budget, held FROM customers WHERE customer_id = 3") == [(1000.0, 1000.0)]
+
+
+def test_place_orders_bulk_rejects_everything_when_the_transaction_fails(db_manager, query, monkeypatch):
+    def fail(*args):
+        raise RuntimeError("log sink down")
+    monkeypatch.setattr(db_manager, "_write_logs", fail)
+
+    results = db_manager.place_orders_bulk([(1, 1, 1), (2, 3, 1)])
+
+    assert [result["accepted"] for result in results] == [False, False]
+    assert query("SELECT COUNT(*) FROM orders") == [(0,)]
+    assert query("SELECT SUM(reserved) FROM products") == [(0,)]
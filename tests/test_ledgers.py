@@ -0,0 +1,119 @@
+def assert_ledgers(query):
+    """products.reserved and customers.held are the sums of the active reservations and holds"""
+    assert query('''
+        SELECT p.product_id, p.reserved, COALESCE(SUM(r.quantity), 0)
+        FROM products p
+        LEFT JOIN stock_reservations r ON r.product_id = p.product_id AND r.status = 'active'
+        GROUP BY p.product_id
+        HAVING p.reserved != COALESCE(SUM(r.quantity), 0)
+    ''') == []
+    assert query('''
+        SELECT c.customer_id, c.held, COALESCE(SUM(h.amount), 0)
+        FROM customers c
+        LEFT JOIN budget_holds h ON h.customer_id = c.customer_id AND h.status = 'active'
+        GROUP BY c.customer_id
+        HAVING ABS(c.held - COALESCE(SUM(h.amount), 0)) > 1e-9
+    ''') == []
+
+
+def expire_all(db_manager) -> int:
+    db_manager.execute_transaction(lambda conn: conn.execute(
+        "UPDATE stock_reservations SET expires_at = datetime('now', '-1 seconds') WHERE status = 'active'"))
+    return db_manager.expire_reservations()
+
+
+def test_placement_reserves_stock(db_manager, query):
+    db_manager.place_basket_order(1, [(1, 2), (3, 1), (1, 1)])
+    db_manager.place_orders_bulk([(2, 1, 4), (3, 2, 10)])
+
+    assert query("SELECT product_id, stock, reserved FROM products WHERE reserved > 0") == [
+        (1, 500, 7), (2, 10, 10), (3, 200, 1),
+    ]
+    assert_ledgers(query)
+    # Everything of Product2 is reserved
+    assert db_manager.place_basket_order(4, [(2, 1)]) is None
+
+
+def test_settlement_captures_or_releases_reservations(db_manager, query):
+    processed = db_manager.place_basket_order(1, [(1, 2), (3, 1)])
+    failed = db_manager.place_basket_order(2, [(2, 5)])
+    settled = db_manager.place_orders_bulk([(3, 1, 1), (4, 2, 5)])
+    db_manager.update_stock(2, 5)
+
+    assert db_manager.process_order(processed)
+    assert_ledgers(query)
+    assert db_manager.settle_orders([result["order_id"] for result in settled] + [failed]) == (2, 1)
+    assert_ledgers(query)
+
+    assert query("SELECT product_id, stock, reserved FROM products WHERE product_id <= 3") == [
+        (1, 497, 0), (2, 0, 0), (3, 199, 0),
+    ]
+    assert dict(query("SELECT status, COUNT(*) FROM stock_reservations GROUP BY status")) == {
+        "captured": 4, "released": 1,
+    }
+
+
+def test_expired_reservations_give_stock_back_and_orders_stay_pending(db_manager, query):
+    order_id = db_manager.place_basket_order(1, [(2, 6)])
+
+    assert expire_all(db_manager) == 1
+    assert_ledgers(query)
+    assert query("SELECT stock, reserved FROM products WHERE product_id = 2") == [(10, 0)]
+    assert query("SELECT status FROM orders WHERE order_id = ?", order_id) == [("pending",)]
+
+    # The stock is free again; the expired order is settled from unreserved stock if any is left
+    other = db_manager.place_basket_order(2, [(2, 6)])
+    assert db_manager.settle_orders([order_id, other]) == (1, 1)
+    assert_ledgers(query)
+    assert dict(query("SELECT order_id, status FROM orders")) == {order_id: "failed", other: "processed"}
+
+
+def test_unexpired_reservations_are_kept(db_manager, query):
+    db_manager.place_basket_order(1, [(2, 6)])
+
+    assert db_manager.expire_reservations() == 0
+    assert query("SELECT reserved FROM products WHERE product_id = 2") == [(6,)]
+    assert_ledgers(query)
+
+
+def test_placement_holds_budget(db_manager, query):
+    db_manager.place_basket_order(1, [(1, 2), (3, 1)])
+    db_manager.place_orders_bulk([(1, 4, 1), (2, 1, 9)])
+
+    assert query("SELECT customer_id, budget, held FROM customers WHERE held > 0") == [
+        (1, 1000.0, 320.0), (2, 1000.0, 900.0),
+    ]
+    assert_ledgers(query)
+    # Held budget is not available to new orders
+    assert db_manager.place_basket_order(2, [(1, 2)]) is None
+
+
+def test_settlement_captures_or_releases_holds(db_manager, query):
+    processed = db_manager.place_basket_order(1, [(1, 2), (3, 1)])
+    failed = db_manager.place_basket_order(2, [(2, 5)])
+    settled = db_manager.place_orders_bulk([(1, 4, 1), (3, 2, 5)])
+    db_manager.update_stock(2, 5)
+
+    assert db_manager.process_order(processed)
+    assert_ledgers(query)
+    assert db_manager.settle_orders([result["order_id"] for result in settled] + [failed]) == (2, 1)
+    assert_ledgers(query)
+
+    assert query("SELECT customer_id, budget, held, total_spent FROM customers WHERE customer_id <= 3") == [
+        (1, 680.0, 0.0, 320.0), (2, 1000.0, 0.0, 0.0), (3, 750.0, 0.0, 250.0),
+    ]
+    assert dict(query("SELECT status, COUNT(*) FROM budget_holds GROUP BY status")) == {
+        "captured": 3, "released": 1,
+    }
+
+
+def test_holds_survive_reservation_expiry(db_manager, query):
+    order_id = db_manager.place_basket_order(1, [(3, 2)])
+
+    assert expire_all(db_manager) == 1
+    assert query("SELECT held FROM customers WHERE customer_id = 1") == [(90.0,)]
+    assert_ledgers(query)
+
+    assert db_manager.process_order(order_id)
+    assert query("SELECT budget, held, total_spent FROM customers WHERE customer_id = 1") == [(910.0, 0.0, 90.0)]
+    assert_ledgers(query)
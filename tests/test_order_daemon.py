@@ -0,0 +1,62 @@
+import json
+import threading
+import time
+
+import pytest
+
+from order_daemon import OrderDaemon
+
+
+@pytest.fixture
+def daemon(db_manager, tmp_path):
+    daemon = OrderDaemon(db_manager, workers=2, batch_size=4, poll_interval=0.05,
+                         status_file=str(tmp_path / "status.json"), status_interval=0.05)
+    yield daemon
+    daemon.pool.shutdown(wait=True)
+
+
+def settle_one_batch(daemon, order_ids):
+    """Run _settle_batch the way _dispatch does, with a slot taken"""
+    daemon._slots.acquire()
+    daemon.in_flight += 1
+    daemon._settle_batch(order_ids)
+
+
+def test_daemon_drains_pending_orders_and_writes_its_status(daemon, db_manager, query, tmp_path):
+    results = db_manager.place_orders_bulk([(customer_id, 3, 1) for customer_id in range(1, 5)] * 5)
+    assert all(result["accepted"] for result in results)
+
+    runner = threading.Thread(target=daemon.run)
+    runner.start()
+    try:
+        deadline = time.monotonic() + 10.0
+        while query("SELECT COUNT(*) FROM orders WHERE status = 'pending'")[0][0] and time.monotonic() < deadline:
+            time.sleep(0.05)
+    finally:
+        daemon.stop()
+        runner.join(timeout=10.0)
+
+    assert not runner.is_alive()
+    assert query("SELECT status, COUNT(*) FROM orders GROUP BY status") == [("processed", 20)]
+    status = json.loads((tmp_path / "status.json").read_text())
+    assert (status["state"], status["settled"], status["failed"], status["batch_errors"]) == ("stopped", 20, 0, 0)
+    assert status["batches"] >= 5
+
+
+def test_failed_batch_counts_as_error_and_requests_a_resync(daemon, db_manager, monkeypatch):
+    monkeypatch.setattr(db_manager, "settle_orders", lambda order_ids: None)
+
+    settle_one_batch(daemon, [1, 2])
+
+    assert (daemon.batches, daemon.batch_errors, daemon.settled, daemon.in_flight) == (1, 1, 0, 0)
+    assert daemon._resync
+
+
+def test_already_settled_batch_is_not_an_error(daemon, db_manager):
+    order_id = db_manager.place_basket_order(1, [(1, 1)])
+    settle_one_batch(daemon, [order_id])
+    # Dispatched twice (e.g. after a resync): the second settlement finds nothing pending
+    settle_one_batch(daemon, [order_id])
+
+    assert (daemon.batches, daemon.batch_errors, daemon.settled, daemon.failed) == (2, 0, 1, 0)
+    assert not daemon._resync
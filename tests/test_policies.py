@@ -0,0 +1,112 @@
+import random
+
+import pytest
+
+from processing.policies import (DEADLINES, FAIR_SHARE_WEIGHTS, POLICIES, EarliestDeadlinePolicy,
+                                 PriorityPolicy, StrictClassPolicy, WeightedFairQueuingPolicy,
+                                 WeightedScorePolicy, create_policy)
+from processing.priority import priority_score
+
+NOW = 1_000_000.0
+
+
+def random_orders(seed: int, count: int = 300) -> list:
+    """(order_id, customer_id, customer_type, quantity, enqueued_at), customers keep their type"""
+    rng = random.Random(seed)
+    customer_types = {customer_id: rng.choice(["Premium", "Standard"]) for customer_id in range(1, 11)}
+    orders = []
+    for order_id in range(1, count + 1):
+        customer_id = rng.randint(1, 10)
+        orders.append((order_id, customer_id, customer_types[customer_id], rng.randint(1, 5),
+                       NOW - rng.choice([0, 300, 900, 3600])))
+    return orders
+
+
+def dispatch(policy: PriorityPolicy, orders: list) -> list:
+    for order in orders:
+        policy.add(*order)
+    assert len(policy) == len(orders)
+    return policy.pop_batch(len(orders) + 1, NOW)
+
+
+def test_policy_interface_is_abstract():
+    with pytest.raises(TypeError):
+        PriorityPolicy()
+
+    class Incomplete(PriorityPolicy):
+        def add(self, order_id, customer_id, customer_type, quantity, enqueued_at=None):
+            pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_create_policy_by_name():
+    assert {name: type(create_policy(name)) for name in POLICIES} == {
+        "weighted": WeightedScorePolicy, "strict-class": StrictClassPolicy,
+        "edf": EarliestDeadlinePolicy, "wfq": WeightedFairQueuingPolicy,
+    }
+    with pytest.raises(ValueError):
+        create_policy("fifo")
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_weighted_policy_follows_the_priority_score(seed):
+    orders = random_orders(seed)
+    expected = sorted(orders, key=lambda order: (-priority_score(order[2], NOW - order[4], order[3]), order[0]))
+
+    assert dispatch(WeightedScorePolicy(clock=lambda: NOW), orders) == [order[0] for order in expected]
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_strict_class_policy_serves_premium_first_oldest_first(seed):
+    orders = random_orders(seed)
+    expected = sorted(orders, key=lambda order: (order[2] != "Premium", order[4], order[0]))
+
+    assert dispatch(StrictClassPolicy(clock=lambda: NOW), orders) == [order[0] for order in expected]
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_earliest_deadline_policy_serves_earliest_deadline_first(seed):
+    orders = random_orders(seed)
+    expected = sorted(orders, key=lambda order: (order[4] + DEADLINES[order[2]], order[0]))
+
+    assert dispatch(EarliestDeadlinePolicy(clock=lambda: NOW), orders) == [order[0] for order in expected]
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_weighted_fair_queuing_policy_follows_finish_tags(seed):
+    orders = random_orders(seed)
+    # Everything is queued before the first pop: the n-th order of a customer finishes at n / weight
+    finish = {}
+    counts = {}
+    for order_id, customer_id, customer_type, _, _ in orders:
+        counts[customer_id] = counts.get(customer_id, 0) + 1
+        finish[order_id] = counts[customer_id] / FAIR_SHARE_WEIGHTS[customer_type]
+    expected = sorted(finish, key=lambda order_id: (finish[order_id], order_id))
+
+    assert dispatch(WeightedFairQueuingPolicy(clock=lambda: NOW), orders) == expected
+
+
+def test_weighted_fair_queuing_does_not_let_one_customer_crowd_out_the_others():
+    policy = WeightedFairQueuingPolicy(clock=lambda: NOW)
+    for order_id in range(1, 101):
+        policy.add(order_id, 1, "Standard", 1, NOW)
+    policy.add(101, 2, "Standard", 1, NOW)
+    policy.add(102, 3, "Premium", 1, NOW)
+
+    # The Premium customer's finish tag (0.5) comes first; the newcomer shares the first round
+    assert policy.pop_batch(3, NOW) == [102, 1, 101]
+
+
+@pytest.mark.parametrize("name", sorted(POLICIES))
+def test_remove_drops_a_queued_order(name):
+    policy = create_policy(name, clock=lambda: NOW)
+    orders = random_orders(0, 20)
+    for order in orders:
+        policy.add(*order)
+
+    assert policy.remove(5)
+    assert not policy.remove(5)
+    assert sorted(policy.pop_batch(100, NOW)) == [order[0] for order in orders if order[0] != 5]
+    assert policy.pop(NOW) is None
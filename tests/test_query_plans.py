@@ -0,0 +1,115 @@
+import os
+import random
+import re
+import sqlite3
+
+import pytest
+
+from database import queries
+from database.migrations import run_migrations
+
+# Rows in orders and logs; plans are checked after ANALYZE, so the planner
+# sees production-like statistics (about 1% of the orders pending)
+ROWS = int(os.environ.get("OMS_QUERY_PLAN_ROWS", 1000000))
+PENDING_SHARE = 0.01
+CUSTOMERS = 1000
+PRODUCTS = 50
+
+# Hot statement -> (table or alias in the plan, index it must be searched or scanned with)
+HOT_STATEMENTS = {
+    "SELECT_PENDING_ORDERS_BY_PRIORITY": ("o", "idx_orders_pending_priority"),
+    "SELECT_PRIORITIZED_PENDING_ORDER_IDS": ("o", "idx_orders_pending_priority"),
+    "SELECT_TOP_PENDING_ORDER_IDS": ("orders", "idx_orders_pending_priority"),
+    "SELECT_PENDING_ORDER_SCORING_ROWS": ("o", "idx_orders_pending_priority"),
+    "SELECT_PENDING_ORDER_PRODUCTS": ("o", "idx_orders_pending_priority"),
+    "SELECT_PENDING_ORDERS_AFTER": ("o", "idx_orders_pending_priority"),
+    "SELECT_PENDING_ORDERS_IN": ("o", "INTEGER PRIMARY KEY"),
+    "SELECT_PENDING_ORDER_HEADER": ("o", "INTEGER PRIMARY KEY"),
+    "SELECT_CUSTOMER_ORDERS": ("o", "idx_orders_customer_time"),
+    "SELECT_ORDER_LINES": ("ol", "idx_order_lines_order"),
+    "SELECT_ORDER_LINES_IN": ("ol", "idx_order_lines_order"),
+    "SELECT_ACTIVE_RESERVATIONS": ("stock_reservations", "idx_reservations_order"),
+    "SELECT_ACTIVE_RESERVATIONS_IN": ("stock_reservations", "idx_reservations_order"),
+    "SELECT_EXPIRED_RESERVATIONS": ("stock_reservations", "idx_reservations_active"),
+    "CLOSE_RESERVATIONS": ("stock_reservations", "idx_reservations_order"),
+    "SELECT_ACTIVE_HOLDS_IN": ("budget_holds", "idx_budget_holds_order"),
+    "CLOSE_BUDGET_HOLDS": ("budget_holds", "idx_budget_holds_order"),
+    "SELECT_RECENT_LOGS": ("l", "idx_logs_timestamp"),
+    "SELECT_LOGS_BEFORE": ("l", "INTEGER PRIMARY KEY"),
+    "SELECT_LOGS_AFTER": ("l", "INTEGER PRIMARY KEY"),
+}
+
+# Tables that grow with traffic, and their aliases in queries.py;
+# a SCAN of one of them without an index is a regression
+LARGE_TABLES = ("orders", "o", "order_lines", "ol", "logs", "l", "stock_reservations", "budget_holds")
+
+
+@pytest.fixture(scope="module")
+def conn(tmp_path_factory):
+    conn = sqlite3.connect(str(tmp_path_factory.mktemp("plans") / "plans.db"))
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = OFF")
+    conn.execute("BEGIN IMMEDIATE")
+    run_migrations(conn)
+    conn.commit()
+
+    rng = random.Random(1)
+    conn.executemany("INSERT INTO products (product_name, stock, price) VALUES (?, 1000, 10)",
+                     ((f"Product{i}",) for i in range(1, PRODUCTS + 1)))
+    conn.executemany("INSERT INTO customers (customer_name, budget, customer_type) VALUES (?, 1000, ?)",
+                     ((f"customer{i}", "Premium" if i % 3 == 0 else "Standard")
+                      for i in range(1, CUSTOMERS + 1)))
+
+    orders = [(rng.randint(1, CUSTOMERS), rng.randint(1, PRODUCTS), rng.randint(1, 20),
+               f"-{rng.randint(0, 10 ** 7)} seconds",
+               "pending" if rng.random() < PENDING_SHARE else "processed")
+              for _ in range(ROWS)]
+    conn.executemany('''
+        INSERT INTO orders (customer_id, product_id, quantity, base_priority, order_time, status)
+        VALUES (?, ?, ?, 1.0 + ? / 100.0, datetime('now', ?), ?)
+    ''', ((customer_id, product_id, quantity, quantity, age, status)
+          for customer_id, product_id, quantity, age, status in orders))
+    conn.execute("INSERT INTO order_lines (order_id, product_id, quantity) "
+                 "SELECT order_id, product_id, quantity FROM orders")
+    conn.execute('''
+        INSERT INTO stock_reservations (order_id, product_id, quantity, expires_at, status)
+        SELECT order_id, product_id, quantity, datetime('now', '+3600 seconds'),
+               CASE status WHEN 'pending' THEN 'active' ELSE 'captured' END
+        FROM orders
+    ''')
+    conn.execute('''
+        INSERT INTO budget_holds (order_id, customer_id, amount, status)
+        SELECT order_id, customer_id, quantity * 10,
+               CASE status WHEN 'pending' THEN 'active' ELSE 'captured' END
+        FROM orders
+    ''')
+    conn.executemany("INSERT INTO logs (customer_id, log_type, result_message, timestamp) "
+                     "VALUES (?, 'Order Processed', 'ok', datetime('now', ?))",
+                     ((rng.randint(1, CUSTOMERS), f"-{i} seconds") for i in range(ROWS)))
+    conn.commit()
+    conn.execute("ANALYZE")
+    yield conn
+    conn.close()
+
+
+def query_plan(conn: sqlite3.Connection, sql: str) -> list:
+    """EXPLAIN QUERY PLAN detail lines, with a NULL for every parameter"""
+    parameters = [None] * sql.count("?")
+    return [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, parameters)]
+
+
+@pytest.mark.parametrize("name", sorted(HOT_STATEMENTS))
+def test_hot_statement_uses_index(conn, name):
+    table, index = HOT_STATEMENTS[name]
+    plan = query_plan(conn, queries.STATEMENTS[name])
+    assert any(re.match(rf"(SEARCH|SCAN) {table} USING .*{index}", detail) for detail in plan), \
+        f"{name} does not read {table} with {index}: {plan}"
+
+    full_scans = [detail for detail in plan
+                  if re.fullmatch(rf"SCAN ({'|'.join(LARGE_TABLES)})", detail)]
+    assert not full_scans, f"{name} scans a large table: {plan}"
+
+
+def test_no_unused_pending_index(conn):
+    indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    assert "idx_orders_pending" not in indexes
@@ -0,0 +1,83 @@
+import random
+
+import pytest
+
+from processing.priority import WAIT_GROWTH_SECONDS, base_priority
+from processing.scheduler import IndexedHeap, OrderScheduler
+
+NOW = 1_000_000.0
+
+
+def brute_force_order(orders: dict, now: float) -> list:
+    """order_id -> (base_priority, enqueued_at), sorted by score at `now` (ties: lowest id)"""
+    return sorted(orders, key=lambda order_id: (
+        -orders[order_id][0] * (1.0 + max(0.0, now - orders[order_id][1]) / WAIT_GROWTH_SECONDS), order_id))
+
+
+def random_orders(rng: random.Random, count: int) -> dict:
+    # Few distinct base priorities and enqueue times, so scores tie often
+    return {order_id: (base_priority(rng.choice(["Premium", "Standard"]), rng.randint(1, 5)),
+                       NOW - rng.choice([0, 600, 1800, 3600, 7200]))
+            for order_id in rng.sample(range(1, 10 * count), count)}
+
+
+def test_indexed_heap_pops_in_priority_order():
+    rng = random.Random(1)
+    heap = IndexedHeap()
+    priorities = {key: rng.randint(0, 50) for key in range(200)}
+    for key, priority in priorities.items():
+        heap.push(key, priority)
+    for key in range(0, 200, 3):
+        priorities[key] = rng.randint(0, 50)
+        heap.update(key, priorities[key])
+    for key in range(1, 200, 7):
+        assert heap.remove(key)
+        del priorities[key]
+
+    popped = [heap.pop() for _ in range(len(heap))]
+    assert popped == sorted(((key, priority) for key, priority in priorities.items()),
+                            key=lambda item: (item[1], item[0]))
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_scheduler_matches_brute_force_sort(seed):
+    rng = random.Random(seed)
+    orders = random_orders(rng, 300)
+    scheduler = OrderScheduler(clock=lambda: NOW)
+    for order_id, (base, enqueued_at) in orders.items():
+        scheduler.add(order_id, base, enqueued_at)
+
+    assert len(scheduler) == len(orders)
+    assert scheduler.pop_batch(len(orders) + 1, NOW) == brute_force_order(orders, NOW)
+    assert scheduler.pop(NOW) is None
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_scheduler_matches_brute_force_after_remove_and_reprioritize(seed):
+    rng = random.Random(seed)
+    orders = random_orders(rng, 300)
+    scheduler = OrderScheduler(clock=lambda: NOW)
+    for order_id, (base, enqueued_at) in orders.items():
+        scheduler.add(order_id, base, enqueued_at)
+
+    for order_id in rng.sample(sorted(orders), 50):
+        assert scheduler.remove(order_id)
+        del orders[order_id]
+    for order_id in rng.sample(sorted(orders), 50):
+        base = base_priority("Premium", rng.randint(1, 5))
+        scheduler.reprioritize(order_id, base)
+        orders[order_id] = (base, orders[order_id][1])
+
+    assert not scheduler.remove(-1)
+    assert scheduler.pop_batch(len(orders), NOW) == brute_force_order(orders, NOW)
+
+
+def test_scheduler_scores_orders_when_they_are_dispatched():
+    scheduler = OrderScheduler(clock=lambda: NOW)
+    scheduler.add(1, base_priority("Premium", 1), NOW - 600)
+    scheduler.add(2, base_priority("Standard", 1), NOW - 2 * WAIT_GROWTH_SECONDS)
+
+    # The Standard order waited 2 hours: 1.01 * 3 > 2.02 * (1 + 1/6)
+    assert scheduler.peek(NOW) == 2
+    # Ten hours later the Premium order, aging twice as fast, is ahead: 2.02 * 11.17 > 1.01 * 13
+    assert scheduler.peek(NOW + 10 * WAIT_GROWTH_SECONDS) == 1
@@ -0,0 +1,54 @@
+def pending_count(query) -> int:
+    return query("SELECT COUNT(*) FROM orders WHERE status = 'pending'")[0][0]
+
+
+def test_settle_orders_returns_processed_and_failed_counts(db_manager, query):
+    processed = db_manager.place_basket_order(1, [(1, 2)])
+    failed = db_manager.place_basket_order(2, [(2, 5)])
+    # Stock taken away after placement: the reservation can no longer be delivered
+    db_manager.update_stock(2, 1)
+
+    assert db_manager.settle_orders([processed, failed]) == (1, 1)
+    assert dict(query("SELECT order_id, status FROM orders")) == {processed: "processed", failed: "failed"}
+
+
+def test_settle_orders_returns_zero_counts_when_already_settled(db_manager):
+    order_id = db_manager.place_basket_order(1, [(1, 1)])
+    assert db_manager.settle_orders([order_id]) == (1, 0)
+
+    assert db_manager.settle_orders([order_id]) == (0, 0)
+    assert db_manager.settle_orders([]) == (0, 0)
+
+
+def test_settle_orders_returns_none_and_rolls_back_on_error(db_manager, query, monkeypatch):
+    order_id = db_manager.place_basket_order(1, [(1, 1)])
+
+    def fail(*args):
+        raise RuntimeError("log sink down")
+    monkeypatch.setattr(db_manager, "_write_logs", fail)
+
+    assert db_manager.settle_orders([order_id]) is None
+    assert query("SELECT status FROM orders WHERE order_id = ?", order_id) == [("pending",)]
+    assert query("SELECT stock, reserved FROM products WHERE product_id = 1") == [(500, 1)]
+
+
+def test_settle_orders_gives_scarce_stock_to_the_earlier_order_in_the_list(db_manager, query):
+    first = db_manager.place_basket_order(1, [(2, 5)])
+    second = db_manager.place_basket_order(2, [(2, 5)])
+    db_manager.update_stock(2, 5)
+
+    # Given priority order: second before first
+    assert db_manager.settle_orders([second, first]) == (1, 1)
+    assert dict(query("SELECT order_id, status FROM orders")) == {first: "failed", second: "processed"}
+    assert query("SELECT stock, reserved FROM products WHERE product_id = 2") == [(0, 0)]
+
+
+def test_settle_pending_orders_settles_everything_in_chunks(db_manager, query):
+    for customer_id in range(1, 5):
+        for _ in range(2):
+            assert db_manager.place_basket_order(customer_id, [(1, 1), (3, 1)])
+
+    assert db_manager.settle_pending_orders(chunk_size=3) == (8, 0)
+    assert pending_count(query) == 0
+    assert query("SELECT stock FROM products WHERE product_id IN (1, 3) ORDER BY product_id") == [(492,), (192,)]
+    assert query("SELECT SUM(total_spent) FROM customers") == [(8 * 145.0,)]